@@ -1,6 +1,8 @@
 from schemdraw.elements.intcircuits import Ic, IcPin
-import schemdraw.pictorial as pictorial
+from geometry import cached_geometry
+from lazy import lazy
 
+@cached_geometry
 class AtmegaIc(Ic):
     """
     An Atmega IC representation to be used in circuit diagrams.
@@ -39,17 +41,5 @@ class AtmegaIc(Ic):
                 IcPin(name='RAW', side='right')]
         super().__init__(pins=pins, botlabel='Atmega Board')
 
-class AtmegaPictorial(pictorial.FritzingPart):
-    """
-    Fritzing part for the Atmega on a pro micro board from https://forum.fritzing.org/t/part-arduino-pro-micro-clone/10680
-    """
-    def __init__(self, **kwargs):
-        super().__init__('pro_micro.fzpz', **kwargs)
-    
-    @classmethod
-    def bb_offset(cls):
-        """
-    # The at(x, y) is a hack offset to prevent a bunch of empty space at the
-    # left of the image
-        """
-        return (-6.27, -2)
\ No newline at end of file
+# Loading the Fritzing part is only paid for by the drawings which use it
+AtmegaPictorial = lazy('atmega_pictorial', 'AtmegaPictorial')
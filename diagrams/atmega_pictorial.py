@@ -0,0 +1,20 @@
+"""
+The breadboard view of the pro micro, kept apart from ``atmega.py`` so the
+schematics do not load the Fritzing part.
+"""
+from parts import FritzingPart
+
+class AtmegaPictorial(FritzingPart):
+    """
+    Fritzing part for the Atmega on a pro micro board from https://forum.fritzing.org/t/part-arduino-pro-micro-clone/10680
+    """
+    def __init__(self, **kwargs):
+        super().__init__('pro_micro.fzpz', **kwargs)
+    
+    @classmethod
+    def bb_offset(cls):
+        """
+    # The at(x, y) is a hack offset to prevent a bunch of empty space at the
+    # left of the image
+        """
+        return (-6.27, -2)
@@ -0,0 +1,219 @@
+"""
+Benchmark rendering the diagrams in this directory.
+
+Each drawing is rendered several times in a fresh process, recording the
+median wall and CPU time of a render, the time of the first render, the peak
+resident memory of the process and the size of the SVG before and after
+optimizing. Every run is appended to ``.benchmarks/history.json`` and compared
+against ``.benchmarks/baseline.json``; anything worse than the baseline by
+more than the threshold is reported and makes the run fail.
+
+    python benchmark.py                   # benchmark everything
+    python benchmark.py 'esp32-spi*' -n 10
+    python benchmark.py --save-baseline   # make this run the new baseline
+"""
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+import svgopt
+from build import DIAGRAMS_DIR, _init_worker, find_drawings, select
+
+BENCHMARK_DIR = DIAGRAMS_DIR / '.benchmarks'
+HISTORY_FILE = BENCHMARK_DIR / 'history.json'
+BASELINE_FILE = BENCHMARK_DIR / 'baseline.json'
+
+# Relative increase over the baseline which counts as a regression.
+THRESHOLD = 0.10
+
+# Differences smaller than these are noise, no matter how large relative to
+# the baseline.
+MIN_CHANGE = {
+    'wall': 0.01,
+    'cpu': 0.01,
+    'first': 0.02,
+    'peak_rss': 2 * 1024 * 1024,
+    'bytes': 0,
+    'optimized_bytes': 0,
+}
+
+UNITS = {
+    'wall': 's',
+    'cpu': 's',
+    'first': 's',
+    'peak_rss': 'B',
+    'bytes': 'B',
+    'optimized_bytes': 'B',
+}
+
+
+def measure(module, name, repeats):
+    """
+    Render the drawing ``name`` ``repeats`` times into a temporary file and
+    return its metrics. Meant to be run in a fresh process, so the peak
+    memory is that of this drawing alone.
+    """
+    importlib.import_module(module)
+    import registry
+    walls = []
+    cpus = []
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / Path(registry.get(name).output).name
+        for _ in range(repeats):
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            registry.render(name, file=output)
+            cpus.append(time.process_time() - cpu)
+            walls.append(time.perf_counter() - wall)
+        size, optimized = svgopt.optimize_file(output)
+
+    return {
+        'wall': statistics.median(walls),
+        'cpu': statistics.median(cpus),
+        'first': walls[0],
+        # Kilobytes on Linux
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'bytes': size,
+        'optimized_bytes': optimized,
+    }
+
+
+def run(targets, repeats, directory=DIAGRAMS_DIR):
+    """
+    The metrics of each of ``targets``, by name.
+    """
+    results = {}
+    # One process per drawing so neither memory nor warm caches carry over
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1,
+                             initializer=_init_worker, initargs=(directory, {})) as pool:
+        for target in targets:
+            results[target.name] = pool.submit(measure, target.module, target.name,
+                                               repeats).result()
+            print(f'{target.name:40} {format_metrics(results[target.name])}')
+    return results
+
+
+def format_value(metric, value):
+    if UNITS[metric] == 's':
+        return f'{value * 1000:.1f}ms'
+    return f'{value / 1024:.0f}kB'
+
+
+def format_metrics(metrics):
+    return '  '.join(f'{metric} {format_value(metric, value)}'
+                     for metric, value in metrics.items())
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIAGRAMS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(results, repeats):
+    """
+    A history entry for ``results``.
+    """
+    return {
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'schemdraw': metadata.version('schemdraw'),
+        'repeats': repeats,
+        'results': results,
+    }
+
+
+def regressions(results, baseline, threshold=THRESHOLD):
+    """
+    The ``(name, metric, baseline value, value)`` of every metric in
+    ``results`` worse than in ``baseline`` by more than ``threshold``.
+    """
+    found = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, value in metrics.items():
+            before = previous.get(metric)
+            if before is None:
+                continue
+            if value - before > max(before * threshold, MIN_CHANGE[metric]):
+                found.append((name, metric, before, value))
+    return found
+
+
+def _load(path, default):
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return default
+
+
+def _save(path, data):
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(data, indent=1) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to benchmark, defaults to all')
+    parser.add_argument('-n', '--repeats', type=int, default=5,
+                        help='renders per drawing, defaults to 5')
+    parser.add_argument('-t', '--threshold', type=float, default=THRESHOLD,
+                        help='relative increase over the baseline reported as a '
+                             f'regression, defaults to {THRESHOLD}')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store this run as the baseline')
+    parser.add_argument('--no-history', action='store_true',
+                        help='do not add this run to the history')
+    args = parser.parse_args(argv)
+
+    targets = find_drawings()
+    if args.patterns:
+        targets = select(targets, args.patterns)
+        if not targets:
+            parser.error(f'no drawings match {" ".join(args.patterns)}')
+
+    entry = record(run(targets, args.repeats), args.repeats)
+    if not args.no_history:
+        history = _load(HISTORY_FILE, [])
+        history.append(entry)
+        _save(HISTORY_FILE, history)
+
+    baseline = _load(BASELINE_FILE, None)
+    if args.save_baseline or baseline is None:
+        if baseline is not None:
+            # Keep the baseline of drawings which were not benchmarked
+            entry['results'] = {**baseline['results'], **entry['results']}
+        _save(BASELINE_FILE, entry)
+        print(f'Saved the baseline to {BASELINE_FILE.relative_to(DIAGRAMS_DIR)}')
+        return 0
+
+    found = regressions(entry['results'], baseline['results'], args.threshold)
+    print(f'\nCompared with the baseline from {baseline["time"]} ({baseline["commit"]}, '
+          f'schemdraw {baseline["schemdraw"]})')
+    for name, metric, before, value in found:
+        print(f'REGRESSION  {name:40} {metric:16} {format_value(metric, before):>9} -> '
+              f'{format_value(metric, value):>9} ({value / before - 1 if before else 1:+.0%})')
+    if not found:
+        print('No regressions')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
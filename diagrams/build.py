@@ -0,0 +1,423 @@
+"""
+Render the diagrams in this directory.
+
+Drawings are declared with ``registry.drawing`` in the drawing modules. They
+are rendered across a process pool, so a full rebuild takes about as long as
+the slowest drawing instead of the sum of all of them.
+
+Drawings whose inputs have not changed since they were last rendered are
+skipped, see ``build_cache.py``.
+
+    python build.py                  # render everything that is out of date
+    python build.py three_wire_spi   # render one drawing
+    python build.py 'esp32-spi*'     # render the drawings matching a glob
+    python build.py --force          # render even if up to date
+    python build.py --list           # list the drawings
+    python build.py -j 2             # limit the number of worker processes
+    python build.py --post '*spi*'   # render the drawings of some posts
+    python build.py --changed-posts  # of the posts changed since last built
+
+Raster images are inlined as they are by default; ``--external-images`` and
+``--reencode`` change how they are embedded, see ``images.py``.
+
+Rendered SVGs are shrunk by ``svgopt.py``, reporting the size before and after
+each one; ``--precision`` sets the significant digits kept in coordinates and
+``--no-optimize`` leaves the files as schemdraw writes them.
+
+``--sprites`` draws the breadboard and Fritzing parts as ``<use>`` of symbols
+in the shared ``../assets/sprites.svg``, see ``sprites.py``.
+
+``--check-deterministic`` renders the drawings twice, in fresh processes and
+in opposite orders, and reports those whose two files differ, without
+touching ``../assets/``.
+
+``--raster`` then writes PNG and WebP versions of the drawings, see
+``raster.py``.
+
+The size of each drawing is kept in ``../_data/diagrams.json`` for the site to
+lay out pages before the SVGs load, see ``sitedata.py``.
+"""
+import argparse
+import ast
+import fnmatch
+import importlib
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import svgopt
+from build_cache import BuildCache, file_hash, input_hash
+
+DIAGRAMS_DIR = Path(__file__).resolve().parent
+
+
+class Target(NamedTuple):
+    """
+    A drawing found in one of the drawing modules.
+    """
+    name: str
+    output: str
+    module: str
+    path: Path
+    base: Optional[str] = None
+
+
+# scan by path, modification time and size of the module.
+_scanned = {}
+
+
+def scan(path):
+    """
+    The ``(name, output, base)`` of each drawing declared with
+    ``@drawing(...)`` in the module at ``path``, read from its source without
+    importing it. ``base`` is the name of the function building its base
+    layout, if it has one.
+    """
+    stat = Path(path).stat()
+    key = (Path(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _scanned:
+        _scanned[key] = _scan(path)
+    return _scanned[key]
+
+
+def _scan(path):
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'), filename=str(path))
+    found = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            func = decorator.func
+            if getattr(func, 'id', getattr(func, 'attr', None)) != 'drawing':
+                continue
+            name = node.name
+            base = None
+            for keyword in decorator.keywords:
+                if keyword.arg == 'name':
+                    name = keyword.value.value
+                elif keyword.arg == 'base':
+                    base = keyword.value.id
+            found.append((name, decorator.args[0].value, base))
+    return found
+
+
+def find_drawings(directory=DIAGRAMS_DIR):
+    """
+    Every drawing declared in the modules of ``directory``.
+    """
+    targets = []
+    for path in sorted(Path(directory).glob('*.py')):
+        for name, output, base in scan(path):
+            targets.append(Target(name, output, path.stem, path, base))
+    return targets
+
+
+def select(targets, patterns):
+    """
+    The ``targets`` whose name, or output file name, matches any of the glob
+    ``patterns``.
+    """
+    def matches(target):
+        output = Path(target.output)
+        return any(fnmatch.fnmatchcase(candidate, pattern)
+                   for pattern in patterns
+                   for candidate in (target.name, output.name, output.stem))
+    return [target for target in targets if matches(target)]
+
+
+class Result(NamedTuple):
+    """
+    The outcome of rendering one drawing.
+
+    Attributes:
+        elapsed: Seconds taken.
+        error: The formatted traceback if rendering failed.
+        sizes: The bytes before and after optimizing, if optimized.
+        symbols: The sprites first drawn by this drawing, see
+            ``sprites.take``, if it was rendered.
+    """
+    elapsed: float
+    error: Optional[str] = None
+    sizes: Optional[tuple] = None
+    symbols: Optional[dict] = None
+
+
+def _init_worker(directory, image_options, use_sprites=False):
+    # The drawings use paths relative to this directory and the modules
+    # import each other as top level modules.
+    os.chdir(directory)
+    sys.path.insert(0, str(directory))
+    import images
+    import sprites
+    images.configure(**image_options)
+    sprites.configure(enabled=use_sprites)
+
+
+def render_drawing(module, name, precision=svgopt.PRECISION, output=None):
+    """
+    Render one drawing and, unless ``precision`` is ``None``, optimize it. It
+    is saved to ``output`` rather than its own file if given.
+    """
+    start = time.perf_counter()
+    sizes = None
+    try:
+        importlib.import_module(module)
+        import registry
+        import sprites
+        registry.render(name, output)
+        if precision is not None:
+            sizes = svgopt.optimize_file(output or registry.get(name).output, precision)
+    except Exception:
+        return Result(time.perf_counter() - start, traceback.format_exc())
+    return Result(time.perf_counter() - start, None, sizes, sprites.take())
+
+
+def render_drawings(module, names, precision=svgopt.PRECISION, outputs=None):
+    """
+    ``render_drawing`` each of ``names`` in turn, so variants of a base
+    layout share it, to their ``outputs`` if given. The layout is let go of
+    after the last of them.
+    """
+    outputs = outputs or [None] * len(names)
+    results = [render_drawing(module, name, precision, output)
+               for name, output in zip(names, outputs)]
+    # The next family a worker renders has a base of its own, let go of this
+    # one so a worker holds one layout however many drawings it renders
+    import registry
+    registry.release()
+    return results
+
+
+def families(targets):
+    """
+    ``targets`` grouped so the variants of a base layout are together, the
+    other drawings on their own.
+    """
+    grouped = {}
+    for target in targets:
+        key = (target.module, target.base) if target.base else target
+        grouped.setdefault(key, []).append(target)
+    return list(grouped.values())
+
+
+def build(targets, jobs=None, directory=DIAGRAMS_DIR, image_options=None,
+          precision=svgopt.PRECISION, use_sprites=False):
+    """
+    Render ``targets`` in parallel, printing a line per drawing as it
+    finishes. ``image_options`` are passed to ``images.configure`` and
+    ``precision`` to ``render_drawing``. With ``use_sprites`` the symbols
+    drawn are added to the sprite sheet. Returns the targets which failed.
+    """
+    failures = []
+    symbols = {}
+    total = 0.0
+    before = after = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(directory, image_options or {}, use_sprites)) as pool:
+        # Variants of a base layout go to one worker, which builds it once
+        futures = {pool.submit(render_drawings, family[0].module,
+                               [target.name for target in family], precision): family
+                   for family in families(targets)}
+        results = ((target, result) for future in as_completed(futures)
+                   for target, result in zip(futures[future], future.result()))
+        for target, (elapsed, error, sizes, drawn) in results:
+            symbols.update(drawn or {})
+            total += elapsed
+            status = 'ok' if error is None else 'FAILED'
+            size = f'  {svgopt.describe(*sizes)}' if sizes else ''
+            print(f'{elapsed:7.2f}s  {status:6}  {target.name:40}{size}')
+            if sizes:
+                before += sizes[0]
+                after += sizes[1]
+            if error is not None:
+                failures.append(target)
+                print(error, file=sys.stderr)
+
+    wall = time.perf_counter() - start
+    print(f'Rendered {len(targets) - len(failures)}/{len(targets)} drawings '
+          f'in {wall:.2f}s ({total:.2f}s of rendering)')
+    if before:
+        print(f'Optimized: {svgopt.describe(before, after)}')
+    if symbols:
+        import sprites
+        sprites.update_sheet(symbols)
+        message = f'Updated {len(symbols)} sprites in {sprites.config.sheet.name}'
+        if precision is not None:
+            # The symbols are used from other documents, whose styles do not
+            # apply to them, so leave the styles on the elements.
+            sizes = svgopt.optimize_file(sprites.config.sheet, precision, classes=False)
+            message += f': {svgopt.describe(*sizes)}'
+        print(message)
+    return failures
+
+
+def check_deterministic(targets, jobs=None, directory=DIAGRAMS_DIR, image_options=None,
+                        precision=svgopt.PRECISION, use_sprites=False):
+    """
+    Render ``targets`` twice into a temporary directory, each time in a new
+    process pool and the second time in the opposite order, so what a worker
+    drew before differs. Returns the targets whose two files differ, or
+    which failed to render.
+    """
+    differing = []
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [Path(tmp) / 'first', Path(tmp) / 'second']
+        for run, order in zip(runs, (1, -1)):
+            run.mkdir()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(directory, image_options or {},
+                                               use_sprites)) as pool:
+                futures = [pool.submit(render_drawings, family[0].module,
+                                       [target.name for target in family[::order]], precision,
+                                       [str(run / f'{target.name}.svg')
+                                        for target in family[::order]])
+                           for family in families(targets)[::order]]
+                for future in futures:
+                    for result in future.result():
+                        if result.error is not None:
+                            print(result.error, file=sys.stderr)
+        for target in targets:
+            files = [run / f'{target.name}.svg' for run in runs]
+            if not all(file.is_file() for file in files) or \
+                    files[0].read_bytes() != files[1].read_bytes():
+                differing.append(target)
+    return differing
+
+
+def cache_options(image_options, precision, use_sprites):
+    """
+    The build options as folded into the input hashes of the build cache.
+    Anything which changes the output has to be part of it, including the
+    optimizer itself.
+    """
+    optimizer = file_hash(svgopt.__file__)[:16] if precision is not None else None
+    return ','.join(f'{key}={value}' for key, value in
+                    sorted({**image_options, 'precision': precision, 'svgopt': optimizer,
+                            'sprites': use_sprites}.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to render, defaults to all')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes to use, defaults to the number of cores')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='render drawings even if they are up to date')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list the drawings instead of rendering them')
+    parser.add_argument('--external-images', action='store_true',
+                        help='write raster images to ../assets/images/ and reference them '
+                             'instead of inlining them')
+    parser.add_argument('--reencode', choices=['png', 'webp'],
+                        help='re-encode raster images at the size they are drawn')
+    parser.add_argument('--precision', type=int, default=svgopt.PRECISION,
+                        help='significant digits kept in coordinates when optimizing, '
+                             f'defaults to {svgopt.PRECISION}')
+    parser.add_argument('--no-optimize', action='store_true',
+                        help='save the SVGs as schemdraw writes them')
+    parser.add_argument('--sprites', action='store_true',
+                        help='draw repeated parts as <use> of symbols in ../assets/sprites.svg')
+    parser.add_argument('--check-deterministic', action='store_true',
+                        help='render the drawings twice and report those which differ')
+    parser.add_argument('--raster', action='store_true',
+                        help='write PNG and WebP versions of the drawings to ../assets/raster')
+    parser.add_argument('--post', action='append', default=[], dest='posts',
+                        help='only render the drawings referenced by this post, a path or a '
+                             'glob of its file name, may be repeated')
+    parser.add_argument('--changed-posts', action='store_true',
+                        help='only render the drawings referenced by posts changed since '
+                             'they were last built')
+    args = parser.parse_args(argv)
+    image_options = {'external': args.external_images, 'reencode': args.reencode}
+    precision = None if args.no_optimize else args.precision
+    options = cache_options(image_options, precision, args.sprites)
+
+    cache = BuildCache()
+    targets = find_drawings()
+    posts = None
+    if args.posts or args.changed_posts:
+        import posts as post_usage
+        posts = post_usage.find_posts(args.posts)
+        if args.posts and not posts:
+            parser.error(f'no posts match {" ".join(args.posts)}')
+        if args.changed_posts:
+            posts = post_usage.changed_posts(cache, posts)
+        found = post_usage.usage(posts, targets)
+        for post, missing in found.missing.items():
+            for reference in missing:
+                print(f'{post.name} references assets/{reference}, which no drawing draws',
+                      file=sys.stderr)
+        used = {target for drawings in found.drawings.values() for target in drawings}
+        targets = [target for target in targets if target in used]
+        print(f'{len(targets)} drawings in {len(posts)} posts')
+    if args.patterns:
+        targets = select(targets, args.patterns)
+        if not targets:
+            parser.error(f'no drawings match {" ".join(args.patterns)}')
+
+    if args.list:
+        for target in targets:
+            print(f'{target.name:40} {target.module:24} {target.output}')
+        return 0
+
+    if args.check_deterministic:
+        differing = check_deterministic(targets, jobs=args.jobs, image_options=image_options,
+                                        precision=precision, use_sprites=args.sprites)
+        for target in differing:
+            print(f'{target.name} differs between two renders', file=sys.stderr)
+        print(f'{len(targets) - len(differing)}/{len(targets)} drawings rendered the same twice')
+        return 1 if differing else 0
+
+    force = args.force
+    if args.sprites:
+        import sprites
+        # The symbols of up to date drawings are only in the sheet
+        force = force or not sprites.config.sheet.exists()
+
+    inputs = {path: input_hash(path, extra=options)
+              for path in {target.path for target in targets}}
+    stale = [target for target in targets
+             if force or not cache.is_current(target.name, inputs[target.path],
+                                              [target.output])]
+
+    up_to_date = len(targets) - len(stale)
+    if up_to_date:
+        print(f'{up_to_date} drawings up to date')
+    failures = []
+    if stale:
+        failures = build(stale, jobs=args.jobs, image_options=image_options,
+                         precision=precision, use_sprites=args.sprites)
+        for target in stale:
+            if target not in failures:
+                cache.update(target.name, inputs[target.path], [target.output])
+    if posts is not None:
+        post_usage.mark_built(cache, [post for post in posts if not any(
+            target in failures for target in found.drawings[post])])
+    if stale or posts:
+        cache.save()
+
+    import sitedata
+    updated = sitedata.update([DIAGRAMS_DIR / target.output for target in targets
+                               if target not in failures])
+    if updated:
+        print(f'Updated the size of {updated} drawings in {sitedata.DATA_FILE.name}')
+
+    if args.raster:
+        import raster
+        svgs = [DIAGRAMS_DIR / target.output for target in targets if target not in failures]
+        manifest, rasterized = raster.export(svgs, jobs=args.jobs)
+        print(f'Rasterized {rasterized} drawings, {len(svgs) - rasterized} up to date')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Content hash cache used by ``build.py`` to skip drawings whose inputs have not
+changed.
+
+A script's inputs are the script itself, the sibling modules it imports
+(recursively), the part and image files any of those reference by name and
+the installed schemdraw version.
+"""
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+DIAGRAMS_DIR = Path(__file__).resolve().parent
+CACHE_FILE = DIAGRAMS_DIR / '.build-cache.json'
+
+# Functions of lazy.py importing the module named by their first argument.
+LAZY_IMPORTS = {'lazy', 'lazy_import'}
+
+
+def file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+# _references by path, modification time and size of the module, so a long
+# running process only parses modules again when they change.
+_parsed = {}
+
+
+def _references(path, directory):
+    """
+    The sibling modules and data files directly referenced by the module at
+    ``path``.
+    """
+    stat = Path(path).stat()
+    key = (Path(path), Path(directory), stat.st_mtime_ns, stat.st_size)
+    if key not in _parsed:
+        _parsed[key] = _parse_references(path, directory)
+    return _parsed[key]
+
+
+def _parse_references(path, directory):
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'), filename=str(path))
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        elif (isinstance(node, ast.Call) and getattr(node.func, 'id', None) in LAZY_IMPORTS
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            names = [node.args[0].value]
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            # Parts and images are loaded by bare file name, relative to this
+            # directory.
+            value = node.value
+            if value and len(value) < 256 and not any(c in value for c in '/\\\n'):
+                candidate = directory / value
+                if candidate.suffix != '.py' and candidate.is_file():
+                    found.add(candidate)
+            continue
+        else:
+            continue
+        for name in names:
+            module = directory / f'{name.split(".")[0]}.py'
+            if module.is_file():
+                found.add(module)
+    return found
+
+
+def dependencies(script, directory=DIAGRAMS_DIR):
+    """
+    Every file ``script`` depends on, including itself, sorted by path.
+    """
+    directory = Path(directory)
+    seen = set()
+    pending = [Path(script).resolve()]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        if path.suffix == '.py':
+            pending.extend(_references(path, directory))
+    return sorted(seen)
+
+
+def input_hash(script, directory=DIAGRAMS_DIR, extra=''):
+    """
+    Hash of everything which affects the output of ``script``. ``extra`` is
+    folded in for build options which change the output.
+    """
+    from importlib import metadata
+    directory = Path(directory)
+    digest = hashlib.sha256()
+    digest.update(f'schemdraw=={metadata.version("schemdraw")}\n'.encode())
+    digest.update(f'{extra}\n'.encode())
+    for path in dependencies(script, directory):
+        digest.update(f'{path.relative_to(directory).as_posix()}\n'.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    Persistent record of the input hash each script was last rendered from
+    and the hashes of the files it wrote. Outputs are given relative to
+    ``directory``.
+    """
+    def __init__(self, path=CACHE_FILE, directory=DIAGRAMS_DIR):
+        self.path = Path(path)
+        self.directory = Path(directory)
+        try:
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def is_current(self, key, inputs, outputs):
+        """
+        Whether ``key`` was last rendered from ``inputs`` and all of its
+        ``outputs`` are still as they were written.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry['inputs'] != inputs:
+            return False
+        if sorted(entry['outputs']) != sorted(str(output) for output in outputs):
+            return False
+        for output, digest in entry['outputs'].items():
+            path = self.directory / output
+            if not path.is_file() or file_hash(path) != digest:
+                return False
+        return True
+
+    def update(self, key, inputs, outputs):
+        self.entries[key] = {
+            'inputs': inputs,
+            'outputs': {str(output): file_hash(self.directory / output)
+                        for output in outputs},
+        }
+
+    def save(self):
+        self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True),
+                             encoding='utf-8')
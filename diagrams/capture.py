@@ -0,0 +1,245 @@
+"""
+Timing diagrams from logic analyzer captures.
+
+Logic analyzers export captures as CSV with a time column, in seconds,
+followed by one column per channel. Some write a row per sample (sigrok),
+others a row per change (Saleae), either way a row holds the levels from its
+time until the next row. ``to_wavejson`` turns a window of a capture into the
+wavejson of a ``schemdraw.logic.TimingDiagram``, sampling each channel once
+per character of the wave and writing repeated levels as ``.``:
+
+    logic.TimingDiagram(to_wavejson('scroll_wheel.csv', start=0.010, end=0.015))
+
+Without a ``period`` each character is as long as the shortest time between
+two changes in the window, so no pulse is lost. The capture is read
+``chunk_rows`` rows at a time, each chunk handled as a whole with NumPy, and
+only the rows where a channel changes are kept, so captures of millions of
+samples convert in moments and memory use does not depend on their length.
+
+It can also be run on a capture to print the wavejson:
+
+    python capture.py scroll_wheel.csv --start 0.010 --end 0.015
+"""
+import argparse
+import itertools
+import json
+import math
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+CHUNK_ROWS = 1 << 18
+
+# Longer waves would not be readable as a diagram, and are most likely a
+# period given in the wrong unit.
+MAX_SLOTS = 4096
+
+# Level of a channel before the first row of the capture.
+UNKNOWN = 255
+
+COMMENTS = ('#', ';')
+
+
+def _lines(f):
+    # Skip comments and take the channel names from the header, if there is
+    # one
+    for line in f:
+        if line.strip() and not line.startswith(COMMENTS):
+            break
+    else:
+        return None, iter(())
+    fields = [field.strip() for field in line.split(',')]
+    try:
+        [float(field) for field in fields]
+    except ValueError:
+        return fields[1:], f
+    return [f'ch{index}' for index in range(len(fields) - 1)], itertools.chain([line], f)
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    The channel names of the capture at ``path`` and an iterator of its rows
+    as ``(times, levels)`` arrays, ``chunk_rows`` rows at a time.
+    """
+    f = open(path, newline='')
+    names, lines = _lines(f)
+
+    def chunks():
+        with f:
+            while True:
+                rows = list(itertools.islice(lines, chunk_rows))
+                if not rows:
+                    return
+                block = np.loadtxt(rows, delimiter=',', comments=COMMENTS, ndmin=2)
+                if len(block):
+                    yield block[:, 0], block[:, 1:].astype(np.uint8)
+    return names or [], chunks()
+
+
+def _channel_indices(names, channels):
+    if channels is None:
+        return list(range(len(names)))
+    return [names.index(channel) if isinstance(channel, str) else channel
+            for channel in channels]
+
+
+class Window(NamedTuple):
+    """
+    The rows of a capture in a time window where any of the channels change.
+
+    Attributes:
+        names: The channel names.
+        start: Start of the window, the first row of the capture by default.
+        end: End of the window, the last row of the capture by default.
+        times: Times of the rows, the first is the row in effect at
+            ``start`` if the capture started by then.
+        levels: The levels of the rows, a column per channel.
+    """
+    names: list
+    start: float
+    end: float
+    times: np.ndarray
+    levels: np.ndarray
+
+    def at(self, times):
+        """
+        The levels at each of the increasing ``times``, ``UNKNOWN`` before
+        the capture starts.
+        """
+        rows = np.searchsorted(self.times, times, 'right') - 1
+        levels = np.full((len(rows), len(self.names)), UNKNOWN, dtype=np.uint8)
+        known = rows >= 0
+        levels[known] = self.levels[rows[known]]
+        return levels
+
+    def edges(self):
+        """
+        The times of the rows inside the window.
+        """
+        return self.times[self.times > self.start]
+
+    def slots(self, period=None, max_slots=MAX_SLOTS):
+        """
+        ``(origin, period, count)`` of the wave characters covering the
+        window, each ``period`` seconds long and the first starting at
+        ``origin``. Without a ``period`` a character is as long as the
+        shortest time between changes.
+        """
+        if self.end <= self.start:
+            raise ValueError(f'The window {self.start} to {self.end} is empty')
+        origin = self.start
+        if period is None:
+            edges = self.edges()
+            if len(edges) > 1:
+                period = float(np.min(np.diff(edges)))
+                # Start a character at an edge, so every character is sampled
+                # in the middle of a pulse rather than next to an edge
+                origin = edges[0] - math.floor((edges[0] - self.start) / period) * period
+            else:
+                # No pulses, any length shows the levels
+                period = (self.end - self.start) / 8
+
+        count = math.ceil((self.end - origin) / period - 1e-9)
+        if count > max_slots:
+            raise ValueError(f'{count} wave characters of {period}s is too many for a diagram, '
+                             'pass a longer period or a shorter window')
+        return origin, period, count
+
+
+def window(path, start=None, end=None, channels=None, chunk_rows=CHUNK_ROWS,
+           limit=MAX_SLOTS * 16):
+    """
+    The ``Window`` of ``channels``, names or column indices and all channels by
+    default, of the capture at ``path`` between the times ``start`` and
+    ``end``. Reading stops at ``end``, and raises ``ValueError`` if the window
+    has more than ``limit`` changes.
+    """
+    names, chunks = read_chunks(path, chunk_rows)
+    indices = _channel_indices(names, channels)
+    kept_times = []
+    kept_levels = []
+    kept = 0
+    first = last = previous = None
+    for times, levels in chunks:
+        levels = levels[:, indices]
+        if first is None:
+            first = times[0]
+        last = times[-1]
+        changed = np.empty(len(times), dtype=bool)
+        changed[0] = previous is None or bool(np.any(levels[0] != previous))
+        changed[1:] = np.any(levels[1:] != levels[:-1], axis=1)
+        previous = levels[-1]
+        if end is not None:
+            changed &= times <= end
+        if start is not None:
+            # Of the changes before the window only the last one matters
+            before = np.flatnonzero(changed & (times <= start))
+            if len(before):
+                kept_times = [times[before[-1:]]]
+                kept_levels = [levels[before[-1:]]]
+                kept = 1
+                changed[before] = False
+        if changed.any():
+            kept_times.append(times[changed])
+            kept_levels.append(levels[changed])
+            kept += len(kept_times[-1])
+            if kept > limit:
+                raise ValueError(f'{path} changes more than {limit} times in the window, '
+                                 'pass a shorter window')
+        if end is not None and last >= end:
+            break
+    if first is None:
+        raise ValueError(f'{path} has no samples')
+    if not kept_times:
+        kept_times, kept_levels = [np.empty(0)], [np.empty((0, len(indices)), np.uint8)]
+    return Window([names[index] for index in indices],
+                  first if start is None else start, last if end is None else end,
+                  np.concatenate(kept_times), np.concatenate(kept_levels))
+
+
+def wave(levels):
+    """
+    The wavejson ``wave`` of a column of levels, repeated levels written as
+    ``.``.
+    """
+    codes = np.full(len(levels), ord('x'), dtype=np.uint8)
+    codes[levels == 0] = ord('0')
+    codes[levels == 1] = ord('1')
+    repeated = np.zeros(len(codes), dtype=bool)
+    repeated[1:] = codes[1:] == codes[:-1]
+    codes[repeated] = ord('.')
+    return codes.tobytes().decode('ascii')
+
+
+def to_wavejson(path, period=None, start=None, end=None, channels=None,
+                chunk_rows=CHUNK_ROWS, max_slots=MAX_SLOTS):
+    """
+    The wavejson of ``channels``, names or column indices and all channels by
+    default, of the capture at ``path`` between the times ``start`` and
+    ``end``, with a wave character per ``period`` seconds.
+    """
+    captured = window(path, start, end, channels, chunk_rows, max_slots * 16)
+    origin, period, slots = captured.slots(period, max_slots)
+    levels = captured.at(origin + (np.arange(slots) + 0.5) * period)
+    return {'signal': [{'name': name, 'wave': wave(levels[:, column])}
+                       for column, name in enumerate(captured.names)]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help='CSV file exported by a logic analyzer')
+    parser.add_argument('-p', '--period', type=float,
+                        help='seconds per wave character, defaults to the shortest pulse')
+    parser.add_argument('-s', '--start', type=float, help='start of the window in seconds')
+    parser.add_argument('-e', '--end', type=float, help='end of the window in seconds')
+    parser.add_argument('-c', '--channels', help='comma separated channel names')
+    args = parser.parse_args(argv)
+    channels = args.channels.split(',') if args.channels else None
+    wavejson = to_wavejson(args.capture, args.period, args.start, args.end, channels)
+    print(json.dumps(wavejson, indent=1))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
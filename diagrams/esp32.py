@@ -1,6 +1,8 @@
 from schemdraw.elements.intcircuits import Ic, IcPin
-import schemdraw.pictorial as pictorial
+from geometry import cached_geometry
+from lazy import lazy
 
+@cached_geometry
 class Esp32c6Ic(Ic):
     """
     An ESP32-C6 IC representation to be used in circuit diagrams.
@@ -23,19 +25,5 @@ class Esp32c6Ic(Ic):
                 IcPin(name='5V', side='right')]
         super().__init__(pins=pins, botlabel='ESP32C6')
 
-class Esp32c6Pictorial(pictorial.FritzingPart):
-    """
-    Fritzing part for the esp32c6 from
-    https://github.com/Seeed-Studio/fritzing_parts/blob/master/XIAO%20Boards/Seeed%20Studio%20XIAO%20ESP32C6.fzpz
-    """
-    def __init__(self, **kwargs):
-        super().__init__('seeed-studio-xiao-esp32c6.fzpz', **kwargs)
-    
-    @classmethod
-    def bb_offset(cls):
-        """
-        # The at(x, y) is a hack offset to prevent a bunch of empty space at the
-        # left of the image
-        """
-        # return (-6.27, -2)
-        return (0, 0)
\ No newline at end of file
+# Loading the Fritzing part is only paid for by the drawings which use it
+Esp32c6Pictorial = lazy('esp32_pictorial', 'Esp32c6Pictorial')
@@ -0,0 +1,22 @@
+"""
+The breadboard view of the XIAO ESP32C6, kept apart from ``esp32.py`` so the
+schematics do not load the Fritzing part.
+"""
+from parts import FritzingPart
+
+class Esp32c6Pictorial(FritzingPart):
+    """
+    Fritzing part for the esp32c6 from
+    https://github.com/Seeed-Studio/fritzing_parts/blob/master/XIAO%20Boards/Seeed%20Studio%20XIAO%20ESP32C6.fzpz
+    """
+    def __init__(self, **kwargs):
+        super().__init__('seeed-studio-xiao-esp32c6.fzpz', **kwargs)
+    
+    @classmethod
+    def bb_offset(cls):
+        """
+        # The at(x, y) is a hack offset to prevent a bunch of empty space at the
+        # left of the image
+        """
+        # return (-6.27, -2)
+        return (0, 0)
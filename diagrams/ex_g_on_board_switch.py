@@ -1,19 +1,22 @@
 
-import schemdraw
 import schemdraw.elements as elm
-import schemdraw.pictorial as pictorial
 from esp32 import Esp32c6Pictorial
 from schemdraw.util import Point
+from registry import drawing, render_all
+from lazy import lazy
+Breadboard = lazy('parts', 'Breadboard')
+FritzingPart = lazy('parts', 'FritzingPart')
 
 
-with schemdraw.Drawing(show=False, file='../assets/ex_g_on_board_switch.svg') as d:
-    bb = pictorial.Breadboard().up()
+@drawing('../assets/ex_g_on_board_switch.svg')
+def ex_g_on_board_switch(d):
+    bb = Breadboard().up()
     d += bb
 
     esp32 = Esp32c6Pictorial().at(bb.C1).anchor('D0')
     d += esp32
 
-    button = pictorial.FritzingPart('push_button.fzpz').at(bb.L1_4 + Point((0, -1))).anchor('Pin 3')
+    button = FritzingPart('push_button.fzpz').at(bb.L1_4 + Point((0, -1))).anchor('Pin 3')
     d += button
 
     d += elm.Wire('|-').at(bb.A5).to(button.absanchors['Pin 3']).color('blue')
@@ -22,4 +25,8 @@ with schemdraw.Drawing(show=False, file='../assets/ex_g_on_board_switch.svg') as
     d += elm.Ground().at(gnd.end)
     d += elm.Line().at(bb.I2).right().to(bb.I10).color('black')
     d += elm.Line().down().toy(gnd.end).color('black')
-    d += elm.Ground()
\ No newline at end of file
+    d += elm.Ground()
+
+
+if __name__ == '__main__':
+    render_all(__name__)
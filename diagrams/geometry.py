@@ -0,0 +1,117 @@
+"""
+Elements built once per process and copied.
+
+The boards and SPI devices of the schematics are ``Ic``\\s whose pins are all
+given to the constructor, so every ``AtmegaIc()`` lays out the same box, pins
+and anchors. ``cached_geometry`` builds and lays out each distinct
+construction once, ``Controller(cs_count=3)`` separately from
+``Controller()``, and every instance is a copy of that:
+
+    @cached_geometry
+    class AtmegaIc(Ic):
+        ...
+
+Instances are placed, labelled, coloured, flipped and reversed as usual, but
+pins must not be added after construction.
+"""
+import copy
+import functools
+
+from schemdraw import drawing_stack
+from schemdraw.elements import Element
+
+
+def build_template(cls, init, *args, **kwargs):
+    """
+    An instance of ``cls`` set up by calling ``init`` with ``args`` and
+    ``kwargs``, kept off of any drawing being built.
+    """
+    template = cls.__new__(cls)
+    paused = drawing_stack.pause
+    drawing_stack.pause = True
+    try:
+        init(template, *args, **kwargs)
+    finally:
+        drawing_stack.pause = paused
+    return template
+
+
+def copy_element(template, element):
+    """
+    Set up ``element`` as a copy of the unplaced ``template``, instead of
+    running its ``__init__``. The segments are shared until the copy is
+    flipped or reversed, everything else the copy may change is its own.
+    """
+    for name, value in template.__dict__.items():
+        if name == 'params':
+            continue
+        if name in ('_userparams', 'elmparams', '_dwgparams'):
+            # params chains these, so update them rather than replace them
+            getattr(element, name).clear()
+            getattr(element, name).update(value)
+        elif isinstance(value, (dict, list)):
+            setattr(element, name, type(value)(value))
+        else:
+            setattr(element, name, value)
+    drawing_stack.push_element(element)
+
+
+def own_segments(element):
+    """
+    Give ``element``, a copy, segments of its own before it is flipped or
+    reversed, which changes them in place.
+    """
+    if element._userparams.get('flip') or element._userparams.get('reverse'):
+        element.segments = copy.deepcopy(element.segments)
+
+
+def _lay_out(ic):
+    # What Ic._place adds to the element before placing it
+    ic._icbox = ic._drawbox()
+    ic._drawpins()
+    ic.elmparams['lblloc'] = 'center'
+    ic.anchors['center'] = (ic._icbox.w / 2, ic._icbox.h / 2)
+    ic._laid_out = True
+
+
+def cached_geometry(cls):
+    """
+    Class decorator for an ``Ic`` subclass whose layout only depends on the
+    arguments of its constructor. Each distinct set of arguments is built and
+    laid out once per process, instances are copies of it.
+    """
+    init = cls.__init__
+    place = cls._place
+    flipreverse = cls._flipreverse
+    templates = {}
+
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        if type(self) is not cls:
+            # A subclass lays itself out
+            init(self, *args, **kwargs)
+            return
+        key = args, repr(sorted(kwargs.items()))
+        template = templates.get(key)
+        if template is None:
+            template = build_template(cls, init, *args, **kwargs)
+            _lay_out(template)
+            templates[key] = template
+        copy_element(template, self)
+        self.pins = {side: list(pins) for side, pins in template.pins.items()}
+
+    def _place(self, dwgxy, dwgtheta, **dwgparams):
+        if not vars(self).get('_laid_out'):
+            return place(self, dwgxy, dwgtheta, **dwgparams)
+        return Element._place(self, dwgxy, dwgtheta, **dwgparams)
+
+    def _flipreverse(self):
+        if vars(self).get('_laid_out'):
+            own_segments(self)
+        flipreverse(self)
+
+    cls.__init__ = __init__
+    cls._place = _place
+    cls._flipreverse = _flipreverse
+    cls._templates = templates
+    return cls
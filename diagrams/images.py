@@ -0,0 +1,192 @@
+"""
+Raster images for drawings, embedded once per build.
+
+schemdraw base64 inlines a raster ``ElementImage`` into every SVG which uses
+it. ``RasterImage`` draws the same ``<image>`` but can instead reference the
+image as a separate, cacheable file and can re-encode it first:
+
+    configure(external=True)    # write ../assets/images/<name>-<hash>.png once
+    configure(reencode='webp')  # right sized WebP, inline or external
+    configure(reencode='png')   # right sized, palette reduced PNG
+
+Browsers do not load external resources for an SVG shown with ``<img>``, so
+external images are only for SVGs embedded with ``<object>`` or inline.
+
+The encoded bytes, and the ``data:`` URL of inlined images, are cached per
+process, so an image used by several drawings is read and encoded only once.
+"""
+import base64
+import io
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from schemdraw.elements import ElementImage
+from schemdraw.segments import SegmentImage
+
+DIAGRAMS_DIR = Path(__file__).resolve().parent
+
+# How many image pixels to keep per rendered point when re-encoding, so the
+# image stays sharp on high density screens.
+PIXELS_PER_POINT = 2
+
+
+class Config:
+    """
+    How ``RasterImage`` embeds its image.
+
+    Attributes:
+        external: Write the image to ``image_dir`` and reference it as
+            ``href_prefix`` + file name instead of inlining it.
+        reencode: ``None`` to keep the original file, or ``'png'`` or
+            ``'webp'`` to re-encode it at the size it is drawn.
+        image_dir: Where external images are written.
+        href_prefix: URL external images are referenced under.
+    """
+    external = False
+    reencode = None
+    image_dir = DIAGRAMS_DIR.parent / 'assets' / 'images'
+    href_prefix = '/assets/images/'
+
+
+config = Config()
+
+# Default of the ``configure`` arguments for which ``None`` is a setting.
+_UNCHANGED = object()
+
+
+def configure(external=None, reencode=_UNCHANGED, image_dir=None, href_prefix=None):
+    """
+    Set how raster images are embedded, see ``Config``. What is not given
+    is left as it was.
+    """
+    if external is not None:
+        config.external = external
+    if reencode is not _UNCHANGED:
+        if reencode not in (None, 'png', 'webp'):
+            raise ValueError(f'Unknown image encoding {reencode}')
+        config.reencode = reencode
+    if image_dir is not None:
+        config.image_dir = Path(image_dir)
+    if href_prefix is not None:
+        config.href_prefix = href_prefix
+
+
+_encoded = {}
+_inlined = {}
+_written = set()
+
+
+def _reencode(data, fmt, width):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError('Re-encoding images requires Pillow, install the '
+                           '"images" extra') from None
+    image = Image.open(io.BytesIO(data))
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    if fmt == 'webp':
+        image.save(out, 'webp', quality=90, method=6)
+    else:
+        image = image.convert('RGBA').quantize(256, method=Image.Quantize.FASTOCTREE)
+        image.save(out, 'png', optimize=True)
+    return out.getvalue()
+
+
+def encode(path, width_pt):
+    """
+    The ``(bytes, format)`` of the image at ``path`` as it should be embedded
+    when drawn ``width_pt`` wide.
+    """
+    path = Path(path).resolve()
+    width = round(width_pt * PIXELS_PER_POINT) if config.reencode else None
+    key = (path, path.stat().st_mtime_ns, config.reencode, width)
+    if key not in _encoded:
+        data = path.read_bytes()
+        fmt = path.suffix[1:]
+        if config.reencode:
+            data = _reencode(data, config.reencode, width)
+            fmt = config.reencode
+        _encoded[key] = data, fmt
+    return _encoded[key]
+
+
+def href(path, width_pt):
+    """
+    The ``href`` an ``<image>`` of ``path`` drawn ``width_pt`` wide should
+    use, writing the external file the first time it is needed.
+    """
+    data, fmt = encode(path, width_pt)
+    if not config.external:
+        # One string shared by every drawing of the image, rather than a copy
+        # of it each
+        if (data, fmt) not in _inlined:
+            _inlined[data, fmt] = f'data:image/{fmt};base64,{base64.encodebytes(data).decode()}'
+        return _inlined[data, fmt]
+
+    import hashlib
+
+    # Name the file after its contents so browsers can cache it forever.
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    name = f'{Path(path).stem}-{digest}.{fmt}'
+    target = Path(config.image_dir) / name
+    if target not in _written:
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+        _written.add(target)
+    return config.href_prefix + name
+
+
+class SegmentRasterImage(SegmentImage):
+    """
+    A raster image segment which is embedded according to ``config``.
+    """
+    @classmethod
+    def from_segment(cls, segment):
+        return cls(segment.image, segment.xy, width=segment.width,
+                   height=segment.height, rotate=segment.rotate,
+                   imgfmt=segment.imgfmt, zorder=segment.zorder)
+
+    def xform(self, transform, **style):
+        return self.from_segment(super().xform(transform, **style))
+
+    def draw(self, fig, transform, **style):
+        if not hasattr(fig, 'svgelements'):
+            # Matplotlib draws the image itself
+            return super().draw(fig, transform, **style)
+        if not self.visible:
+            return
+
+        xy = transform.transform(self.xy)
+        width = self.width * transform.zoom[0] * fig.scale
+        height = self.height * transform.zoom[1] * fig.scale
+        rotate = self.rotate + transform.theta
+        zorder = self.zorder if self.zorder is not None else style.get('zorder', 1)
+        x0, y0 = fig.xform(*xy)
+        y0 -= height
+
+        # Same element and attribute order as schemdraw's SVG backend
+        et = ET.Element('image')
+        et.set('xlink:href', href(self.image, width))
+        fig._need_xlink = True
+        et.set('x', str(x0))
+        et.set('y', str(y0))
+        et.set('width', str(width))
+        et.set('height', str(height))
+        if rotate:
+            et.set('transform', f'rotate({-rotate} {x0} {y0+height})')
+        fig.svgelements.append((zorder, et))
+
+
+class RasterImage(ElementImage):
+    """
+    ``ElementImage`` for a PNG or JPEG file which is embedded according to
+    ``config``.
+    """
+    def __init__(self, image, width, height, xy=(0, 0), **kwargs):
+        super().__init__(image, width=width, height=height, xy=xy, **kwargs)
+        self.segments[0] = SegmentRasterImage.from_segment(self.segments[0])
@@ -0,0 +1,158 @@
+"""
+Base layouts shared by variants of a drawing.
+
+Several drawings are the same breadboard, board and parts with a wire or a
+resistor more or less. A layout is built and drawn once, and each variant
+forks it and only adds, or replaces, what differs:
+
+    def mouse_click_board(d):
+        bb = Breadboard().up()
+        d += bb
+        ...
+        return bb
+
+    @drawing('../assets/mouse_click_bb.svg', base=mouse_click_board)
+    def mouse_click_bb(d, bb):
+        d += elm.Line().at(bb.B16).to(bb.B12).color('blue')
+
+The fork shares the placed elements of the layout, and the SVG drawn for each
+of them is reused as is, so a variant costs what its own elements cost. This
+works because schemdraw draws SVG coordinates independently of the bounding
+box of the drawing. Variants must not change the elements of the layout,
+``replace`` one instead.
+"""
+from typing import NamedTuple
+
+import schemdraw
+from schemdraw import drawing_stack
+from schemdraw.backends.svg import Figure
+from schemdraw.segments import BBox
+
+
+class Drawn(NamedTuple):
+    """
+    What drawing an element added to an SVG figure.
+    """
+    svgelements: list
+    svgdefs: list
+    gradients: dict
+    clips: dict
+    xlink: bool
+
+
+class Layout(NamedTuple):
+    """
+    A drawing built and drawn once to be forked.
+
+    Attributes:
+        parts: What the function building the layout returned.
+        elements: The placed elements.
+        drawn: The ``Drawn`` of each element, by ``id`` of the element.
+        anchors: The anchors of the drawing.
+        svgdefs: The SVG definitions of the drawing.
+        dwgparams: The parameters of the drawing.
+        here: Where the next element is placed.
+        theta: The angle the next element is placed at.
+        total_clips: ``Figure.total_clips`` after drawing the layout, clip
+            paths of the forks are numbered from it.
+    """
+    parts: object
+    elements: tuple
+    drawn: dict
+    anchors: dict
+    svgdefs: tuple
+    dwgparams: dict
+    here: tuple
+    theta: float
+    total_clips: int
+
+
+def _draw(element, fig):
+    elements, defs = len(fig.svgelements), len(fig.svgdefs)
+    gradients, clips = set(fig.gradients), set(fig.clips)
+    element._draw(fig)
+    return Drawn(fig.svgelements[elements:], fig.svgdefs[defs:],
+                 {key: value for key, value in fig.gradients.items() if key not in gradients},
+                 {key: value for key, value in fig.clips.items() if key not in clips},
+                 fig._need_xlink)
+
+
+def populate(d, build, *args):
+    """
+    Add the elements of ``build(d, *args)`` to ``d`` as the drawing's own
+    ``with`` would, without drawing it on the way out. Returns what ``build``
+    returned.
+    """
+    drawing_stack.push_drawing(d)
+    try:
+        result = build(d, *args)
+        drawing_stack.push_element(None)
+    finally:
+        drawing_stack.pop_drawing(d)
+    return result
+
+
+def snapshot(build, **kwargs):
+    """
+    Build a drawing with ``build(d)``, draw it and return it as a ``Layout``.
+    ``kwargs`` go to ``schemdraw.Drawing``.
+    """
+    d = schemdraw.Drawing(show=False, **kwargs)
+    parts = populate(d, build)
+    fig = Figure(BBox(0, 0, 1, 1), inches_per_unit=d.dwgparams.get('inches_per_unit'))
+    drawn = {}
+    for element in d.elements:
+        drawn[id(element)] = _draw(element, fig)
+        fig._need_xlink = False
+    return Layout(parts, tuple(d.elements), drawn, dict(d.anchors), tuple(d.svgdefs),
+                  dict(d.dwgparams), d._here, d._theta, Figure.total_clips)
+
+
+class Fork(schemdraw.Drawing):
+    """
+    A drawing starting with the elements of ``layout``, which are not drawn
+    again.
+    """
+    def __init__(self, layout, **kwargs):
+        super().__init__(**kwargs)
+        self.layout = layout
+        self.elements.extend(layout.elements)
+        self.anchors.update(layout.anchors)
+        self.svgdefs.extend(layout.svgdefs)
+        self.dwgparams.update(layout.dwgparams)
+        self._here, self._theta = layout.here, layout.theta
+
+    def _drawelements(self):
+        if not isinstance(self.fig, Figure):
+            super()._drawelements()
+            return
+        Figure.total_clips = max(Figure.total_clips, self.layout.total_clips)
+        for element in self.elements:
+            drawn = self.layout.drawn.get(id(element))
+            if drawn is None:
+                element._draw(self.fig)
+                continue
+            self.fig.svgelements.extend(drawn.svgelements)
+            self.fig.svgdefs.extend(drawn.svgdefs)
+            self.fig.gradients.update(drawn.gradients)
+            self.fig.clips.update(drawn.clips)
+            self.fig._need_xlink |= drawn.xlink
+
+
+def fork(layout, **kwargs):
+    """
+    A ``Fork`` of ``layout``, ``kwargs`` go to ``schemdraw.Drawing``.
+    """
+    return Fork(layout, **kwargs)
+
+
+def replace(d, old, new):
+    """
+    Put the element ``new`` in the place of ``old``, an element of the layout
+    ``d`` was forked from, so it is drawn in the same order. Returns ``new``.
+    """
+    index = d.elements.index(old)
+    d.elements.remove(old)
+    d.add(new)
+    d.elements.insert(index, d.elements.pop())
+    return new
@@ -0,0 +1,77 @@
+"""
+Modules, and names from them, imported when they are first used.
+
+A drawing module holds the schematic, the breadboard view and the timing
+diagrams of a post side by side, but a build worker only renders one of
+them. Importing the pictorial parts, the Fritzing machinery and the timing
+diagrams eagerly would make every worker pay for all of them, so drawing
+modules import them lazily:
+
+    pictorial = lazy_import('schemdraw.pictorial')
+    Breadboard = lazy('parts', 'Breadboard')
+
+The module is imported the first time an attribute of it is read, or the
+first time the name is called or one of its attributes is read, so nothing
+changes in how they are used. ``build_cache`` counts both as imports of the
+module.
+"""
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    The module ``name``, executed when one of its attributes is first read.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def is_loaded(name):
+    """
+    Whether the module ``name`` has been imported and executed.
+    """
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
+
+
+class lazy:
+    """
+    The attribute ``name`` of the module ``module``, which is imported the
+    first time the attribute is called or one of its attributes is read.
+    Use it for classes and functions, not for names subclassed at import.
+    """
+    def __init__(self, module, name):
+        self._module = module
+        self._name = name
+        self._value = None
+
+    def _load(self):
+        if self._value is None:
+            self._value = getattr(importlib.import_module(self._module), self._name)
+        return self._value
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        return f'<lazy {self._module}.{self._name}>'
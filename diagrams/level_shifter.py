@@ -1,9 +1,13 @@
-import schemdraw
 import schemdraw.elements as elm
 from schemdraw.elements.intcircuits import Ic, IcPin
-import schemdraw.pictorial as pictorial
+from images import RasterImage
+from registry import drawing, render_all
+from lazy import lazy, lazy_import
+pictorial = lazy_import('schemdraw.pictorial')
+Breadboard = lazy('parts', 'Breadboard')
 
-with schemdraw.Drawing(show=False, file='../assets/level_shifter.svg') as d:
+@drawing('../assets/level_shifter.svg')
+def level_shifter(d):
     sensor = Ic(
         pins = [
             IcPin(name='GND', side='right'),
@@ -47,7 +51,7 @@ with schemdraw.Drawing(show=False, file='../assets/level_shifter.svg') as d:
     d += elm.lines.Wire('-|').at(r_pullup.end).to(bjt.collector)
 
 # Copied from https://schemdraw.readthedocs.io/en/stable/elements/pictorial.html#example
-class ArduinoUno(elm.ElementImage):
+class ArduinoUno(RasterImage):
     ''' Arduino Element '''
     def __init__(self):
         width = 10.3  # Set the width to scale properly for 0.1 inch pin spacing on headers
@@ -72,10 +76,11 @@ class ArduinoUno(elm.ElementImage):
             self.anchors[pinname] = (botx + i*pinspace, bot)
 
 
-with schemdraw.Drawing(show=False, file='../assets/level_shifter_bb.svg') as d:
+@drawing('../assets/level_shifter_bb.svg')
+def level_shifter_bb(d):
     ard = ArduinoUno()
     d += ard
-    bb = pictorial.Breadboard().at((0, 9)).up()
+    bb = Breadboard().at((0, 9)).up()
     d += bb
     
     transistor = pictorial.TO92().at(bb.J19)
@@ -94,4 +99,8 @@ with schemdraw.Drawing(show=False, file='../assets/level_shifter_bb.svg') as d:
     d += resistor_1k.label('1kΩ', loc='top', ofst=0.2)
 
     d += elm.Line().at(bb.H30).right().label('SDIO', loc='right')
-    d += elm.Line().at(bb.L2_29).right().label('Sensor GND', loc='right')
\ No newline at end of file
+    d += elm.Line().at(bb.L2_29).right().label('Sensor GND', loc='right')
+
+
+if __name__ == '__main__':
+    render_all(__name__)
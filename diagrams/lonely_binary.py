@@ -3,10 +3,13 @@
 
 import schemdraw
 import schemdraw.elements as elm
-import schemdraw.pictorial as pictorial
+from images import RasterImage
+from lazy import lazy, lazy_import
+pictorial = lazy_import('schemdraw.pictorial')
+Breadboard = lazy('parts', 'Breadboard')
 
 
-class LonelyBinary(elm.ElementImage):
+class LonelyBinary(RasterImage):
     WIDTH = 726
     HEIGHT = 421
     GROUND_OFFSET = (39, 152)
@@ -29,7 +32,7 @@ class LonelyBinary(elm.ElementImage):
 
 if __name__ == '__main__':
     with schemdraw.Drawing() as d:
-        bb = pictorial.Breadboard().up()
+        bb = Breadboard().up()
         d += bb
 
         lb = LonelyBinary().at(bb.F30).anchor('0_top')
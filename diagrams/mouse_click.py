@@ -1,9 +1,13 @@
-import schemdraw
 import schemdraw.elements as elm
-import schemdraw.pictorial as pictorial
 from atmega import AtmegaIc, AtmegaPictorial
+from registry import drawing, render_all
+from lazy import lazy, lazy_import
+pictorial = lazy_import('schemdraw.pictorial')
+Breadboard = lazy('parts', 'Breadboard')
+FritzingPart = lazy('parts', 'FritzingPart')
 
-with schemdraw.Drawing(show=False, file='../assets/mouse_click_diagram.svg') as d:
+@drawing('../assets/mouse_click_diagram.svg')
+def mouse_click_diagram(d):
     button = elm.Button().label('Push Button')
     d += button
     atmega = AtmegaIc().at(button.end).anchor('9')
@@ -16,7 +20,8 @@ with schemdraw.Drawing(show=False, file='../assets/mouse_click_diagram.svg') as
     d += elm.Line().left().tox(button.start)
     d += elm.Line().up().toy(button.start)
 
-with schemdraw.Drawing(show=False, file='../assets/mouse_click_pull_down_diagram.svg') as d:
+@drawing('../assets/mouse_click_pull_down_diagram.svg')
+def mouse_click_pull_down_diagram(d):
     button = elm.Button().label('Push Button')
     d += button
     d += elm.Line().right(d.unit * 0.5)
@@ -33,8 +38,8 @@ with schemdraw.Drawing(show=False, file='../assets/mouse_click_pull_down_diagram
     d += elm.Line().up().toy(atmega.GND1)
     d += elm.Line().right().to(atmega.GND1)
 
-with schemdraw.Drawing(show=False, file='../assets/mouse_click_bb.svg') as d:
-    bb = pictorial.Breadboard().up().at(AtmegaPictorial.bb_offset())
+def mouse_click_board(d):
+    bb = Breadboard().up().at(AtmegaPictorial.bb_offset())
     d += bb
 
     atmega = AtmegaPictorial().up().at(bb.D1).anchor('TXO')
@@ -43,39 +48,23 @@ with schemdraw.Drawing(show=False, file='../assets/mouse_click_bb.svg') as d:
     d += elm.Line().at(bb.J4).to(bb.R1_3).color('red')
     d += elm.Line().at(bb.R1_15).to(bb.J16).color('red')
 
-    button = pictorial.FritzingPart('push_button.fzpz').at(bb.E16).anchor('Pin 4')
+    button = FritzingPart('push_button.fzpz').at(bb.E16).anchor('Pin 4')
     d += button
-    
-    d += elm.Line().at(bb.B16).to(bb.B12).color('blue')
-
-with schemdraw.Drawing(show=False, file='../assets/mouse_click_pull_down_bb.svg') as d:
-    bb = pictorial.Breadboard().up().at(AtmegaPictorial.bb_offset())
-    d += bb
-
-    atmega = AtmegaPictorial().up().at(bb.D1).anchor('TXO')
-    d += atmega
+    return bb
 
-    d += elm.Line().at(bb.J4).to(bb.R1_3).color('red')
-    d += elm.Line().at(bb.R1_15).to(bb.J16).color('red')
+@drawing('../assets/mouse_click_bb.svg', base=mouse_click_board)
+def mouse_click_bb(d, bb):
+    d += elm.Line().at(bb.B16).to(bb.B12).color('blue')
 
-    button = pictorial.FritzingPart('push_button.fzpz').at(bb.E16).anchor('Pin 4')
-    d += button
-    
+@drawing('../assets/mouse_click_pull_down_bb.svg', base=mouse_click_board)
+def mouse_click_pull_down_bb(d, bb):
     d += elm.Line().at(bb.B16).to(bb.B12).color('blue')
     pictorial.Resistor(10000).at(bb.A4).to(bb.A12)
 
-with schemdraw.Drawing(show=False, file='../assets/mouse_click_pull_down_bb_working.svg') as d:
-    bb = pictorial.Breadboard().up().at(AtmegaPictorial.bb_offset())
-    d += bb
-
-    atmega = AtmegaPictorial().up().at(bb.D1).anchor('TXO')
-    d += atmega
-
-    d += elm.Line().at(bb.J4).to(bb.R1_3).color('red')
-    d += elm.Line().at(bb.R1_15).to(bb.J16).color('red')
-
-    button = pictorial.FritzingPart('push_button.fzpz').at(bb.E16).anchor('Pin 4')
-    d += button
-    
+@drawing('../assets/mouse_click_pull_down_bb_working.svg', base=mouse_click_board)
+def mouse_click_pull_down_bb_working(d, bb):
     d += elm.Line().at(bb.B18).to(bb.B12).color('blue')
     pictorial.Resistor(10000).at(bb.A4).to(bb.A12)
+
+if __name__ == '__main__':
+    render_all(__name__)
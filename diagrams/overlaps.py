@@ -0,0 +1,346 @@
+"""
+Check the drawings for labels, wires and parts drawn over each other.
+
+Each drawing is built, without being drawn, and the boxes of what it places
+go into an R-tree (``spatial.py``), so the pairs overlapping are found in
+about ``n log n`` rather than by comparing everything with everything:
+
+    python overlaps.py               # check every drawing
+    python overlaps.py 'esp32*'      # check the drawings matching a glob
+
+It exits with 1 if anything overlaps, as a check before publishing. What is
+reported:
+
+* labels overlapping other labels, wires or parts,
+* wires running through a part they do not connect to,
+* elements added twice, which are drawn over themselves.
+
+Wires crossing each other other than where one of them ends are listed as
+well, but do not fail the check, as schematics cross wires without joining
+them.
+
+Parts holding the middle of other parts, like a breadboard, are where the
+rest is laid out and are left out along with their labels. So are a part's
+own labels, and wires going into the part they end at, or crossing the leads
+of a resistor.
+
+Text is measured as schemdraw estimates it for the bounding box of a drawing,
+which is close but not exact.
+"""
+import argparse
+import importlib
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Optional
+
+from build import DIAGRAMS_DIR, _init_worker, families, find_drawings, select
+
+# How far, in drawing units, boxes must reach into each other to count. The
+# images of Fritzing parts leave a little room around what they draw.
+TOLERANCE = 0.05
+
+
+class Shape(NamedTuple):
+    """
+    Something an element of a drawing places.
+
+    Attributes:
+        kind: ``'label'``, ``'wire'`` for a straight piece of one, or
+            ``'part'``.
+        element: The index of the element in the drawing.
+        box: The ``(xmin, ymin, xmax, ymax)`` it covers.
+        name: What to call it in reports.
+        ends: The two ends of the wire a piece is of.
+        piece: The two ends of a piece of a wire, left empty for the leads of
+            a part, which wires may cross.
+    """
+    kind: str
+    element: int
+    box: tuple
+    name: str
+    ends: tuple = ()
+    piece: tuple = ()
+
+
+class Overlap(NamedTuple):
+    """
+    Two shapes of a drawing in each other's way, or two wires ``crossing``.
+    """
+    first: str
+    second: str
+    box: tuple
+    crossing: bool = False
+
+    def __str__(self):
+        xmin, ymin, xmax, ymax = self.box
+        verb = 'crosses' if self.crossing else 'overlaps'
+        return f'{self.first} {verb} {self.second} at ({xmin:.2f}, {ymin:.2f})'
+
+
+class Result(NamedTuple):
+    """
+    The outcome of checking one drawing.
+    """
+    elapsed: float
+    overlaps: tuple = ()
+    error: Optional[str] = None
+
+
+def _box(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))
+
+
+def _body(element):
+    # The segments of element without the leads a two terminal element is
+    # extended by to reach its ends, and those leads
+    from schemdraw.elements import Element2Term
+    from schemdraw.segments import Segment
+
+    segments = list(element.segments)
+    if not isinstance(element, Element2Term) or not segments or \
+            not isinstance(segments[0], Segment):
+        return segments, []
+    path = segments[0].path
+    inner = element.anchors.get('istart')
+    if len(path) < 4 or inner is None or \
+            abs(path[1][0] - inner[0]) > 1e-9 or abs(path[1][1] - inner[1]) > 1e-9:
+        return segments, []
+    segments[0] = Segment(path[1:-1])
+    return segments, [path[:2], path[-2:]]
+
+
+def shapes(d):
+    """
+    The ``Shape``\\s of the elements of the built drawing ``d``.
+    """
+    from schemdraw.elements.lines import Line, Wire
+    from schemdraw.segments import Segment, SegmentText
+
+    from router import Route, segment_bbox
+
+    found = []
+    seen = set()
+    for index, element in enumerate(d.elements):
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        name = type(element).__name__
+        wire = isinstance(element, (Line, Wire, Route))
+        segments, leads = ([], []) if wire else _body(element)
+        if wire:
+            segments = element.segments
+        paths = [(False, [element.transform.transform(point) for point in lead])
+                 for lead in leads]
+        part = None
+        for segment in segments:
+            if getattr(segment, 'visible', True) is False:
+                continue
+            segment = segment.xform(element.transform, **element.params)
+            if isinstance(segment, SegmentText):
+                text = str(segment.text).strip()
+                if text:
+                    found.append(Shape('label', index, tuple(segment.get_bbox()),
+                                       f'label {text!r} of {name}'))
+            elif wire:
+                if isinstance(segment, Segment) and segment.color != 'none':
+                    paths.append((True, [tuple(point) for point in segment.path]))
+            else:
+                box = segment_bbox(segment)
+                part = box if part is None else (min(part[0], box[0]), min(part[1], box[1]),
+                                                 max(part[2], box[2]), max(part[3], box[3]))
+        for whole, path in paths:
+            for a, b in zip(path, path[1:]):
+                box = _box(a, b)
+                if box[:2] != box[2:]:
+                    found.append(Shape('wire', index, box, name,
+                                       (tuple(path[0]), tuple(path[-1])),
+                                       (tuple(a), tuple(b)) if whole else ()))
+        if part is not None and all(abs(value) < float('inf') for value in part) \
+                and part[:2] != part[2:]:
+            found.append(Shape('part', index, part, name))
+    return found
+
+
+def _overlap(a, b):
+    # The box a covers of b, less TOLERANCE on each side of b, if any
+    box = (max(a[0], b[0] + TOLERANCE), max(a[1], b[1] + TOLERANCE),
+           min(a[2], b[2] - TOLERANCE), min(a[3], b[3] - TOLERANCE))
+    if box[0] > box[2] or box[1] > box[3]:
+        return None
+    return box
+
+
+def _crossing(a, b):
+    # The point the pieces of wire a and b cross at, if any, other than the
+    # ends of either wire
+    if not a.piece or not b.piece:
+        return None
+    (x1, y1), (x2, y2) = a.piece
+    (x3, y3), (x4, y4) = b.piece
+    denominator = (x2 - x1) * (y4 - y3) - (y2 - y1) * (x4 - x3)
+    if abs(denominator) < 1e-12:
+        return None
+    t = ((x3 - x1) * (y4 - y3) - (y3 - y1) * (x4 - x3)) / denominator
+    u = ((x3 - x1) * (y2 - y1) - (y3 - y1) * (x2 - x1)) / denominator
+    if not (0 <= t <= 1 and 0 <= u <= 1):
+        return None
+    point = (x1 + t * (x2 - x1), y1 + t * (y2 - y1))
+    if any(abs(point[0] - end[0]) <= TOLERANCE and abs(point[1] - end[1]) <= TOLERANCE
+           for end in a.ends + b.ends):
+        return None
+    return point
+
+
+def _inside(point, box):
+    return box[0] - TOLERANCE <= point[0] <= box[2] + TOLERANCE and \
+        box[1] - TOLERANCE <= point[1] <= box[3] + TOLERANCE
+
+
+def _holds(outer, inner):
+    # Whether the middle of inner, at most half the size, is on outer
+    middle = ((inner[0] + inner[2]) / 2, (inner[1] + inner[3]) / 2)
+    return outer[0] <= middle[0] <= outer[2] and outer[1] <= middle[1] <= outer[3] and \
+        2 * (inner[2] - inner[0]) * (inner[3] - inner[1]) <= \
+        (outer[2] - outer[0]) * (outer[3] - outer[1])
+
+
+def repeated(d):
+    """
+    An ``Overlap`` of each element added to the built drawing ``d`` more than
+    once, which is drawn over itself.
+    """
+    overlaps = []
+    counted = set()
+    for element in d.elements:
+        if id(element) not in counted and d.elements.count(element) > 1:
+            counted.add(id(element))
+            name = type(element).__name__
+            overlaps.append(Overlap(name, f'{name} added again',
+                                    tuple(element.get_bbox(transform=True))))
+    return overlaps
+
+
+def find_overlaps(found):
+    """
+    The ``Overlap``\\s among the ``Shape``\\s ``found``.
+    """
+    from spatial import RTree
+
+    tree = RTree([shape.box for shape in found])
+    parts = [index for index, shape in enumerate(found) if shape.kind == 'part']
+    # Parts other parts are laid out on
+    boards = {found[index].element for index in parts
+              if any(found[other].element != found[index].element
+                     and _holds(found[index].box, found[other].box)
+                     for other in tree.search(found[index].box)
+                     if found[other].kind == 'part')}
+    overlaps = []
+    crossed = set()
+    for index, shape in enumerate(found):
+        if shape.element in boards:
+            continue
+        for other in tree.search(shape.box):
+            second = found[other]
+            if other <= index or second.element == shape.element or second.element in boards:
+                continue
+            pair = {shape.kind, second.kind}
+            if pair == {'wire'}:
+                point = _crossing(shape, second)
+                # Where pieces meet, each piece either side finds the crossing
+                key = (shape.element, second.element, *(round(value, 6) for value in point or ()))
+                if point is not None and key not in crossed:
+                    crossed.add(key)
+                    overlaps.append(Overlap(shape.name, second.name, point + point, True))
+                continue
+            if pair == {'part'}:
+                continue
+            if pair == {'wire', 'part'}:
+                wire, part = (shape, second) if shape.kind == 'wire' else (second, shape)
+                if any(_inside(end, part.box) for end in wire.ends):
+                    continue
+            # Wires have no width, they have to reach into the other box
+            if shape.kind == 'wire':
+                box = _overlap(shape.box, second.box)
+            else:
+                box = _overlap(second.box, shape.box)
+            if box is not None:
+                overlaps.append(Overlap(shape.name, second.name, box))
+    return overlaps
+
+
+def check_drawing(module, name):
+    """
+    Build one drawing and find its ``Overlap``\\s.
+    """
+    start = time.perf_counter()
+    try:
+        importlib.import_module(module)
+        import registry
+        d = registry.build(name)
+        overlaps = repeated(d) + find_overlaps(shapes(d))
+    except Exception:
+        return Result(time.perf_counter() - start, error=traceback.format_exc())
+    return Result(time.perf_counter() - start, tuple(overlaps))
+
+
+def check_drawings(module, names):
+    """
+    ``check_drawing`` each of ``names`` in turn, so variants of a base
+    layout share it.
+    """
+    return [check_drawing(module, name) for name in names]
+
+
+def check(targets, jobs=None, directory=DIAGRAMS_DIR):
+    """
+    Check ``targets`` in parallel, printing the overlaps of each drawing as it
+    finishes. Returns the targets with overlaps or which failed.
+    """
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(directory, {})) as pool:
+        futures = {pool.submit(check_drawings, family[0].module,
+                               [target.name for target in family]): family
+                   for family in families(targets)}
+        results = ((target, result) for future in as_completed(futures)
+                   for target, result in zip(futures[future], future.result()))
+        for target, (elapsed, overlaps, error) in results:
+            crossings = sum(overlap.crossing for overlap in overlaps)
+            overlapping = len(overlaps) - crossings
+            status = 'FAILED' if error else f'{overlapping} overlapping' if overlapping else 'ok'
+            if crossings:
+                status += f', {crossings} crossing'
+            print(f'{elapsed:7.2f}s  {target.name:40}  {status}')
+            for overlap in overlaps:
+                print(f'           {overlap}')
+            if error is not None:
+                print(error, file=sys.stderr)
+            if error is not None or overlapping:
+                failures.append(target)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to check, defaults to all')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes to use, defaults to the number of cores')
+    args = parser.parse_args(argv)
+
+    targets = find_drawings()
+    if args.patterns:
+        targets = select(targets, args.patterns)
+        if not targets:
+            parser.error(f'no drawings match {" ".join(args.patterns)}')
+    start = time.perf_counter()
+    failures = check(targets, args.jobs)
+    print(f'Checked {len(targets)} drawings in {time.perf_counter() - start:.2f}s, '
+          f'{len(failures)} with overlaps')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Fritzing parts which are parsed once and then cached.
+
+``schemdraw.pictorial.FritzingPart`` unzips and parses the ``.fzpz`` archive
+every time a part is created. The ``FritzingPart`` here keeps the parsed
+breadboard view in memory for the life of the process and, compressed, in
+``.part-cache/`` between runs. Cache entries are keyed on the hash of the
+archive, so editing or replacing a part invalidates them.
+
+Only the breadboard view is kept, and slimmed with ``svgopt.slim`` before it
+is cached: editor metadata, hidden layers and unused ids are dropped and
+coordinates are rounded to ``PART_TOLERANCE`` of the size of the part. The
+parts are drawn in every breadboard diagram, so this is paid for once rather
+than by each diagram; the breadboard view of the Seeed Studio XIAO is down
+from 280 kB to 70 kB. The view is also parsed into an element tree once per
+process, which every drawing of the part shares, see ``SegmentPart``.
+"""
+import hashlib
+import json
+import math
+import os
+import zlib
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+from xml.etree import ElementTree as ET
+
+from schemdraw import drawing_stack
+from schemdraw.backends.svgunits import parse_size_to_px
+from schemdraw.elements import ElementImage
+from schemdraw.segments import SegmentImage
+from schemdraw.util import Point
+import schemdraw.pictorial as pictorial
+from schemdraw.pictorial.fritz import FritzingInfo
+
+import svgopt
+from geometry import build_template, copy_element, own_segments
+from sprites import sprite
+
+DIAGRAMS_DIR = Path(__file__).resolve().parent
+PART_CACHE_DIR = DIAGRAMS_DIR / '.part-cache'
+
+# Bump when the layout of the cached data, or how it is slimmed, changes.
+CACHE_VERSION = 2
+
+# Coordinates of a part are rounded to this fraction of its larger side, a
+# tenth of a pixel for a part drawn 200 pixels wide.
+PART_TOLERANCE = 1 / 2000
+
+
+class PartData(NamedTuple):
+    """
+    The parts of a parsed Fritzing archive needed to draw it, at a scale of 1.
+    """
+    svg: bytes
+    width: float
+    height: float
+    view_scale: float
+    anchors: dict
+    info: FritzingInfo
+
+
+_loaded = {}
+
+# The parsed breadboard view of each part, by its SVG, shared by every
+# drawing of the process which draws the part.
+_trees = {}
+
+
+def _parse(fname, partname, partidx):
+    # Let schemdraw do the parsing so the anchors are identical, but keep the
+    # throw away element off of any drawing which is being built.
+    paused = drawing_stack.pause
+    drawing_stack.pause = True
+    try:
+        part = pictorial.FritzingPart(fname, partname=partname, partidx=partidx)
+    finally:
+        drawing_stack.pause = paused
+    return PartData(
+        svg=_slim(part.segments[0].image.getvalue()),
+        width=part.width_units,
+        height=part.height_units,
+        view_scale=part._scale,
+        anchors={name: (float(x), float(y)) for name, (x, y) in part.anchors.items()},
+        info=part.info,
+    )
+
+
+def _slim(svg):
+    text = svg.decode('utf-8')
+    view_box = [float(value) for value in
+                ET.fromstring(text).get('viewBox', '').replace(',', ' ').split()]
+    if len(view_box) != 4 or max(view_box[2:]) <= 0:
+        return svg
+    tolerance = max(view_box[2:]) * PART_TOLERANCE
+    decimals = max(0, math.ceil(-math.log10(tolerance)))
+    return svgopt.slim(text, decimals).encode('utf-8')
+
+
+def _cache_key(archive, partname, partidx):
+    # importlib.metadata alone takes longer to import than the rest of this
+    # module, only pay for it when a part is first loaded
+    from importlib import metadata
+    from build_cache import file_hash
+    digest = hashlib.sha256(archive)
+    # The parts are slimmed by svgopt, as build.cache_options has it
+    digest.update(f'\n{CACHE_VERSION}\n{metadata.version("schemdraw")}\n'
+                  f'{file_hash(svgopt.__file__)[:16]}\n{partname}\n{partidx}'.encode())
+    return digest.hexdigest()
+
+
+def _read_cache(path):
+    try:
+        entry = json.loads(zlib.decompress(path.read_bytes()))
+    except (FileNotFoundError, zlib.error, json.JSONDecodeError):
+        return None
+    return PartData(
+        svg=entry['svg'].encode('utf-8'),
+        width=entry['width'],
+        height=entry['height'],
+        view_scale=entry['view_scale'],
+        anchors={name: tuple(xy) for name, xy in entry['anchors'].items()},
+        info=FritzingInfo(*entry['info']),
+    )
+
+
+def _write_cache(path, data):
+    entry = data._asdict()
+    entry['svg'] = data.svg.decode('utf-8')
+    path.parent.mkdir(exist_ok=True)
+    # Several build workers may load the same part at once, write to a
+    # temporary file so readers never see a partial entry.
+    import tempfile
+    handle, temp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(handle, 'wb') as f:
+        f.write(zlib.compress(json.dumps(entry, separators=(',', ':')).encode('utf-8')))
+    os.replace(temp, path)
+
+
+def load_part(fname, partname=None, partidx=None, cache_dir=PART_CACHE_DIR):
+    """
+    The parsed breadboard view of the Fritzing archive ``fname``.
+    """
+    path = Path(fname).resolve()
+    stat = path.stat()
+    memo_key = (path, stat.st_mtime_ns, stat.st_size, partname, partidx)
+    data = _loaded.get(memo_key)
+    if data is not None:
+        return data
+
+    key = _cache_key(path.read_bytes(), partname, partidx)
+    cached = Path(cache_dir) / f'{path.stem}-{key[:16]}.json.z'
+    data = _read_cache(cached)
+    if data is None:
+        data = _parse(path, partname, partidx)
+        _write_cache(cached, data)
+
+    _loaded[memo_key] = data
+    return data
+
+
+def _tree(svg):
+    tree = _trees.get(svg)
+    if tree is None:
+        tree = _trees[svg] = ET.fromstring(svg.decode('utf-8'))
+    return tree
+
+
+class SegmentPart(SegmentImage):
+    """
+    The SVG image ``svg`` of a part, drawn as schemdraw's SVG backend draws
+    it but from a tree parsed once per process rather than once per drawing.
+    The tree is shared by the figures it is drawn on, which must not change
+    it.
+    """
+    @classmethod
+    def from_segment(cls, segment, svg):
+        part = cls(segment.image, segment.xy, width=segment.width,
+                   height=segment.height, rotate=segment.rotate,
+                   imgfmt=segment.imgfmt, zorder=segment.zorder)
+        part.svg = svg
+        return part
+
+    def xform(self, transform, **style):
+        return self.from_segment(super().xform(transform, **style), self.svg)
+
+    def draw(self, fig, transform, **style):
+        if not hasattr(fig, 'svgelements'):
+            # Matplotlib draws the image itself
+            return super().draw(fig, transform, **style)
+        if not self.visible:
+            return
+
+        xy = transform.transform(self.xy)
+        width = self.width * transform.zoom[0] * fig.scale
+        height = self.height * transform.zoom[1] * fig.scale
+        rotate = self.rotate + transform.theta
+        zorder = self.zorder if self.zorder is not None else style.get('zorder', 1)
+        x0, y0 = fig.xform(*xy)
+        y0 -= height
+
+        tree = _tree(self.svg)
+        # Same element and attribute order as schemdraw's SVG backend
+        et = ET.Element('g')
+        scale = width / parse_size_to_px(tree.get('width', '0'))
+        xform = f'translate({x0}, {y0}) scale({scale})'
+        if rotate:
+            xform = f'rotate({-rotate} {x0} {y0+height}) ' + xform
+        et.set('transform', xform)
+        et.append(tree)
+        fig.svgelements.append((zorder, et))
+
+
+class FritzingPart(pictorial.FritzingPart):
+    """
+    Drop in replacement for ``schemdraw.pictorial.FritzingPart`` which is
+    built from the cached part data. ``kwargs`` go to ``ElementImage``.
+    """
+    def __init__(self, fname, partname=None, partidx=None, scale=1.0, **kwargs):
+        part = load_part(fname, partname, partidx)
+        self.fname = fname
+        self.info = part.info
+        self.width_units = part.width * scale
+        self.height_units = part.height * scale
+        self._scale = part.view_scale * scale
+        ElementImage.__init__(self, image=BytesIO(part.svg), imgfmt='svg',
+                              width=self.width_units, height=self.height_units, **kwargs)
+        self.segments[0] = SegmentPart.from_segment(self.segments[0], part.svg)
+        for name, (x, y) in part.anchors.items():
+            self.anchors[name] = Point((x * scale, y * scale))
+        sprite(self, Path(fname).stem)
+
+
+class Breadboard(pictorial.Breadboard):
+    """
+    ``schemdraw.pictorial.Breadboard`` whose hundreds of holes and anchors are
+    built once per process, each breadboard is a copy of that. It is drawn as
+    a sprite when sprites are enabled.
+    """
+    _templates = {}
+
+    def __init__(self, **kwargs):
+        key = type(self), repr(sorted(kwargs.items()))
+        template = self._templates.get(key)
+        if template is None:
+            template = build_template(type(self), pictorial.Breadboard.__init__, **kwargs)
+            self._templates[key] = template
+        copy_element(template, self)
+        sprite(self, 'breadboard')
+
+    def _flipreverse(self):
+        own_segments(self)
+        super()._flipreverse()
@@ -1,6 +1,9 @@
 
-import schemdraw 
 from schemdraw.elements.intcircuits import Ic, IcPin
+from geometry import cached_geometry
+from registry import drawing, render_all
+
+@cached_geometry
 class PMW3320DB(Ic):
     """
     An PMW3320DB IC representation to be used in circuit diagrams.
@@ -18,7 +21,11 @@ class PMW3320DB(Ic):
                 IcPin(name='NCS', side='right', pin="4")]
         super().__init__(pins=pins, botlabel='PMW3320DB-TYDU')
 
+@drawing('../assets/pmw3320db-tydu.svg')
+def pmw3320db_tydu(d):
+    pmw = PMW3320DB()
+    d += pmw
+
+
 if __name__ == '__main__':
-    with schemdraw.Drawing(show=False, file='../assets/pmw3320db-tydu.svg') as d:
-        pmw = PMW3320DB()
-        d += pmw
\ No newline at end of file
+    render_all(__name__)
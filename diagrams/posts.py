@@ -0,0 +1,152 @@
+"""
+Which posts use which drawings.
+
+Posts reference the rendered SVGs as ``/assets/<name>.svg``, in markdown
+links or HTML. Mapping each reference back to the drawing whose output it is
+lets a build render only the drawings of some posts:
+
+    python build.py --post 2026-01-19-debugging-3-wire-spi-controller.markdown
+    python build.py --post '*spi*'
+    python build.py --changed-posts
+
+``--changed-posts`` picks the posts whose content changed since they were last
+built, their hashes are kept in the build cache.
+
+Run directly it lists the drawings of each post, the orphaned drawings no post
+uses and the references to SVGs which are neither drawn nor in ``assets/``,
+exiting with 1 if there are any of the latter:
+
+    python posts.py
+"""
+import argparse
+import fnmatch
+import re
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+from build import DIAGRAMS_DIR, find_drawings
+from build_cache import file_hash
+
+POSTS_DIR = DIAGRAMS_DIR.parent / '_posts'
+ASSETS_DIR = DIAGRAMS_DIR.parent / 'assets'
+POST_GLOB = '*.markdown'
+
+# ``/assets/x.svg``, ``{{ site.baseurl }}/assets/x.svg`` or ``assets/x.svg``
+# in a link, an image or an HTML attribute.
+_REFERENCE = re.compile(r'''(?:^|[\s("'=/}])assets/([\w./-]+?\.svg)\b''')
+
+
+def references(post):
+    """
+    The SVGs the post at ``post`` references, as paths in ``assets/``, in the
+    order they first appear.
+    """
+    text = Path(post).read_text(encoding='utf-8')
+    return list(dict.fromkeys(_REFERENCE.findall(text)))
+
+
+def find_posts(patterns=(), directory=POSTS_DIR):
+    """
+    The posts in ``directory``, or those matching any of ``patterns``, paths
+    or globs of their file names.
+    """
+    posts = sorted(Path(directory).glob(POST_GLOB))
+    if not patterns:
+        return posts
+    wanted = [Path(pattern).name for pattern in patterns]
+    return [post for post in posts
+            if any(fnmatch.fnmatchcase(post.name, pattern) for pattern in wanted)]
+
+
+def _asset(target):
+    # The output of a drawing as a path in assets/
+    output = (DIAGRAMS_DIR / target.output).resolve()
+    try:
+        return output.relative_to(ASSETS_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+class Usage(NamedTuple):
+    """
+    How the posts use the drawings.
+
+    Attributes:
+        drawings: The ``Target``\\s referenced by each post.
+        orphans: The ``Target``\\s no post references.
+        missing: The references of each post to SVGs which are neither drawn
+            nor in ``assets/``.
+    """
+    drawings: dict
+    orphans: list
+    missing: dict
+
+
+def usage(posts=None, targets=None):
+    """
+    The ``Usage`` of ``targets``, all drawings by default, by ``posts``, all
+    posts by default. Orphans are only meaningful for all posts.
+    """
+    posts = find_posts() if posts is None else posts
+    targets = find_drawings() if targets is None else targets
+    by_asset = {}
+    for target in targets:
+        by_asset.setdefault(_asset(target), []).append(target)
+    drawings = {}
+    missing = {}
+    used = set()
+    for post in posts:
+        drawn = []
+        for reference in references(post):
+            if reference in by_asset:
+                drawn.extend(by_asset[reference])
+                used.add(reference)
+            elif not (ASSETS_DIR / reference).is_file():
+                missing.setdefault(post, []).append(reference)
+        drawings[post] = drawn
+    orphans = [target for target in targets if _asset(target) not in used]
+    return Usage(drawings, orphans, missing)
+
+
+def changed_posts(cache, posts=None):
+    """
+    The ``posts``, all posts by default, whose content changed since
+    ``mark_built`` last recorded them in the build cache ``cache``.
+    """
+    posts = find_posts() if posts is None else posts
+    return [post for post in posts
+            if not cache.is_current(f'post:{post.name}', file_hash(post), [])]
+
+
+def mark_built(cache, posts):
+    """
+    Record in ``cache`` that the drawings of ``posts`` were built.
+    """
+    for post in posts:
+        cache.update(f'post:{post.name}', file_hash(post), [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('posts', nargs='*', metavar='POST',
+                        help='paths or globs of the posts to list, defaults to all')
+    args = parser.parse_args(argv)
+
+    posts = find_posts(args.posts)
+    found = usage(posts)
+    for post, drawings in found.drawings.items():
+        if drawings:
+            print(f'{post.name}: {" ".join(target.name for target in drawings)}')
+    if not args.posts:
+        for target in found.orphans:
+            print(f'orphaned: {target.name} ({target.output}) is in no post')
+    for post, missing in found.missing.items():
+        for reference in missing:
+            print(f'missing: {post.name} references assets/{reference}, which no drawing '
+                  'draws', file=sys.stderr)
+    return 1 if found.missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
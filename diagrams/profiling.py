@@ -0,0 +1,274 @@
+"""
+Profile where the time and memory of rendering a drawing go.
+
+While a ``Profile`` is active, schemdraw is instrumented so that constructing
+an element, adding it to the drawing, drawing it onto the figure, building
+the figure's SVG tree and writing it out are each timed and their memory
+traced, per element type where there is one. Nested phases, such as the elements a drawing adds while another
+element is being constructed, are kept apart, so each phase is charged only
+its own time.
+
+    python profiling.py                     # profile every drawing
+    python profiling.py mouse_click_bb -n 3
+
+prints the most expensive phases of each drawing and writes
+``.profiles/<drawing>.folded``, one ``stack;of;phases microseconds`` line per
+stack, which ``flamegraph.pl`` and speedscope read directly.
+
+Tracing allocations with ``tracemalloc`` makes rendering several times
+slower, pass ``--no-memory`` for times closer to a normal build.
+"""
+import argparse
+import functools
+import importlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from build import DIAGRAMS_DIR, _init_worker, find_drawings, select
+
+PROFILE_DIR = DIAGRAMS_DIR / '.profiles'
+
+
+class _Frame:
+    __slots__ = ('label', 'start', 'child_time', 'memory_start', 'peak')
+
+    def __init__(self, label, memory):
+        self.label = label
+        self.child_time = 0.0
+        self.memory_start = self.peak = memory
+        self.start = time.perf_counter()
+
+
+class Profile:
+    """
+    Time and peak memory of each phase of rendering, by stack of phases.
+    Memory is traced while the profile is entered as a context manager.
+
+    Attributes:
+        stacks: ``{stack: [calls, self seconds, total seconds, peak bytes]}``
+            where ``stack`` is the tuple of phase labels from the outermost
+            in. Peak bytes are the most memory allocated at once while the
+            phase ran, above what was allocated when it started.
+    """
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stacks = defaultdict(lambda: [0, 0.0, 0.0, 0])
+        self._frames = []
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.memory:
+            tracemalloc.stop()
+
+    def _traced(self):
+        if not self.memory:
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            self._frames[-1].peak = max(self._frames[-1].peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def span(self, label):
+        """
+        Charge the time and memory of the ``with`` block to ``label``.
+        """
+        frame = _Frame(label, self._traced())
+        self._frames.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame.start
+            self._traced()
+            self._frames.pop()
+            if self._frames:
+                self._frames[-1].child_time += elapsed
+            stack = tuple(f.label for f in self._frames) + (label,)
+            entry = self.stacks[stack]
+            entry[0] += 1
+            entry[1] += elapsed - frame.child_time
+            entry[2] += elapsed
+            entry[3] = max(entry[3], frame.peak - frame.memory_start)
+            if self._frames and self.memory:
+                # The peak of a phase includes the peaks of the phases in it
+                self._frames[-1].peak = max(self._frames[-1].peak, frame.peak)
+
+    def folded(self):
+        """
+        The profile in the folded stack format of flame graph tools, with
+        self time in microseconds.
+        """
+        return [f'{";".join(stack)} {round(entry[1] * 1e6)}'
+                for stack, entry in sorted(self.stacks.items())
+                if round(entry[1] * 1e6)]
+
+    def summary(self):
+        """
+        ``(phase, calls, self seconds, total seconds, peak bytes)`` per phase,
+        summed over the stacks it appears in, most expensive first.
+        """
+        phases = defaultdict(lambda: [0, 0.0, 0.0, 0])
+        for stack, (calls, own, total, peak) in self.stacks.items():
+            phase = phases[stack[-1]]
+            phase[0] += calls
+            phase[1] += own
+            # Recursive phases would otherwise be counted more than once
+            if stack[-1] not in stack[:-1]:
+                phase[2] += total
+            phase[3] = max(phase[3], peak)
+        return sorted(((label, *values) for label, values in phases.items()),
+                      key=lambda row: row[2], reverse=True)
+
+    @contextmanager
+    def instrument(self):
+        """
+        Instrument schemdraw for the duration of the ``with`` block. Only
+        element classes defined by then are instrumented.
+        """
+        from xml.etree import ElementTree as ET
+
+        from schemdraw import Drawing
+        from schemdraw.backends.svg import Figure
+        from schemdraw.elements import Element
+
+        patched = []
+
+        def patch(owner, name, wrapper):
+            original = owner.__dict__[name]
+            patched.append((owner, name, original))
+            setattr(owner, name, functools.wraps(original)(wrapper(original)))
+
+        constructing = set()
+
+        def construct(original):
+            def __init__(element, *args, **kwargs):
+                # Only the outermost __init__ of an element, not those it
+                # calls through super()
+                if id(element) in constructing:
+                    return original(element, *args, **kwargs)
+                constructing.add(id(element))
+                try:
+                    with self.span(f'construct:{type(element).__name__}'):
+                        return original(element, *args, **kwargs)
+                finally:
+                    constructing.discard(id(element))
+            return __init__
+
+        def per_element(phase):
+            def wrapper(original):
+                def method(owner, element, *args, **kwargs):
+                    with self.span(f'{phase}:{type(element).__name__}'):
+                        return original(owner, element, *args, **kwargs)
+                return method
+            return wrapper
+
+        def drawn(original):
+            def _draw(element, *args, **kwargs):
+                with self.span(f'draw:{type(element).__name__}'):
+                    return original(element, *args, **kwargs)
+            return _draw
+
+        def phase(label):
+            def wrapper(original):
+                def method(*args, **kwargs):
+                    with self.span(label):
+                        return original(*args, **kwargs)
+                return method
+            return wrapper
+
+        classes = [Element]
+        for cls in classes:
+            classes.extend(sub for sub in cls.__subclasses__() if sub not in classes)
+            if '__init__' in cls.__dict__:
+                patch(cls, '__init__', construct)
+        patch(Element, '_draw', drawn)
+        patch(Drawing, 'add', per_element('add'))
+        patch(Drawing, 'draw', phase('draw'))
+        # registry.render builds the tree and writes it itself, rather than
+        # through Drawing.save and Figure.save, which other backends use
+        patch(Figure, 'getsvg', phase('svg'))
+        patch(ET.ElementTree, 'write', phase('write'))
+        patch(Drawing, 'save', phase('save'))
+        patch(Figure, 'save', phase('write'))
+        try:
+            yield self
+        finally:
+            for owner, name, original in reversed(patched):
+                setattr(owner, name, original)
+
+
+def profile_drawing(module, name, repeats=1, memory=True):
+    """
+    Profile importing the module of the drawing ``name`` and rendering it
+    ``repeats`` times into a temporary file. Returns the ``Profile``'s
+    ``stacks``.
+    """
+    profile = Profile(memory)
+    with profile, profile.span(name):
+        with profile.span('import'):
+            importlib.import_module(module)
+        import registry
+        with tempfile.TemporaryDirectory() as directory, profile.instrument():
+            output = Path(directory) / Path(registry.get(name).output).name
+            for _ in range(repeats):
+                with profile.span('render'):
+                    registry.render(name, file=output)
+    return dict(profile.stacks)
+
+
+def _format_bytes(size):
+    return f'{size / 1024:.0f}kB' if size else '-'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to profile, defaults to all')
+    parser.add_argument('-n', '--repeats', type=int, default=1,
+                        help='renders per drawing, defaults to 1')
+    parser.add_argument('--top', type=int, default=10,
+                        help='phases to print per drawing, defaults to 10')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='only measure time, which is much faster')
+    args = parser.parse_args(argv)
+
+    targets = find_drawings()
+    if args.patterns:
+        targets = select(targets, args.patterns)
+        if not targets:
+            parser.error(f'no drawings match {" ".join(args.patterns)}')
+
+    PROFILE_DIR.mkdir(exist_ok=True)
+    # A fresh process per drawing, so each pays for its own imports and
+    # part loading
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1,
+                             initializer=_init_worker, initargs=(DIAGRAMS_DIR, {})) as pool:
+        for target in targets:
+            profile = Profile()
+            profile.stacks.update(pool.submit(profile_drawing, target.module, target.name,
+                                              args.repeats, not args.no_memory).result())
+            path = PROFILE_DIR / f'{target.name}.folded'
+            path.write_text('\n'.join(profile.folded()) + '\n')
+
+            print(f'{target.name}  ({path.relative_to(DIAGRAMS_DIR)})')
+            print(f'    {"phase":40} {"calls":>6} {"self":>9} {"total":>9} {"peak":>8}')
+            for label, calls, own, total, peak in profile.summary()[:args.top]:
+                print(f'    {label:40} {calls:6} {own * 1000:7.1f}ms {total * 1000:7.1f}ms '
+                      f'{_format_bytes(peak):>8}')
+            print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Decode the A and B lines of a quadrature rotary encoder, such as the
+``WheelEncoder`` of the scroll wheel, and find illegal transitions.
+
+A turning encoder steps through the states ``a,b`` 0,0 -> 0,1 -> 1,1 -> 1,0 and
+back to 0,0, as in ``rotary_encoder_signal.svg``, or the reverse when turned
+the other way. Only one line changes at a time, so both changing between two
+samples is an illegal transition. It is how a bad ground shows up, see
+``rotary_encoder_bad_ground_signal.svg``, and means counts were missed.
+
+``decode`` looks every change of state up in a transition table, a whole
+array of samples at a time, for the step, +1, -1 or none, and whether it was
+illegal. ``check_file`` streams a capture through it, so captures of millions
+of samples are checked in seconds, and ``timing_diagram`` draws the window
+around an illegal transition:
+
+    summary = check_file('scroll_wheel.csv')
+    d += timing_diagram('scroll_wheel.csv', *summary.window(0))
+
+Run directly on a capture it prints the summary, and can save the diagram of
+an illegal transition:
+
+    python quadrature.py scroll_wheel.csv --svg glitch.svg
+"""
+import argparse
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+import capture
+
+# The states a,b as ``a << 1 | b``, in the order of a positive turn.
+_ORDER = (0b00, 0b01, 0b11, 0b10)
+
+
+def _tables():
+    steps = np.zeros(16, dtype=np.int8)
+    illegal = np.zeros(16, dtype=bool)
+    for index, previous in enumerate(_ORDER):
+        for offset, state in enumerate(_ORDER[index:] + _ORDER[:index]):
+            steps[previous << 2 | state] = {1: 1, 3: -1}.get(offset, 0)
+            illegal[previous << 2 | state] = offset == 2
+    return steps, illegal
+
+
+# Step and whether it is illegal, by ``previous << 2 | state``.
+STEPS, ILLEGAL = _tables()
+
+
+class Transitions(NamedTuple):
+    """
+    The changes of state found by ``decode``.
+
+    Attributes:
+        times: Time of each change.
+        steps: +1 or -1 for a legal step, 0 for an illegal transition.
+        illegal: Whether each change was illegal.
+        state: The last state, ``a << 1 | b``, to continue decoding from.
+    """
+    times: np.ndarray
+    steps: np.ndarray
+    illegal: np.ndarray
+    state: int
+
+    def positions(self, start=0):
+        """
+        The position after each change, counting from ``start``.
+        """
+        return start + np.cumsum(self.steps, dtype=np.int64)
+
+
+def decode(times, a, b, state=None):
+    """
+    The ``Transitions`` of the samples taken at ``times`` of the lines ``a``
+    and ``b``, continuing from ``state`` if given.
+    """
+    states = np.asarray(a, dtype=np.uint8) << 1 | np.asarray(b, dtype=np.uint8)
+    times = np.asarray(times, dtype=float)
+    if state is not None:
+        states = np.concatenate(([state], states))
+        times = np.concatenate(([np.nan], times))
+    changed = np.flatnonzero(states[1:] != states[:-1]) + 1
+    codes = states[changed - 1] << 2 | states[changed]
+    return Transitions(times[changed], STEPS[codes], ILLEGAL[codes],
+                       int(states[-1]) if len(states) else state)
+
+
+class Summary(NamedTuple):
+    """
+    What ``check_file`` found in a capture.
+
+    Attributes:
+        position: The position at the end, counting one per step from 0.
+        forward: The number of positive steps.
+        backward: The number of negative steps.
+        illegal: The number of illegal transitions.
+        illegal_times: Times of the first illegal transitions.
+        interval: The typical time between changes of state.
+    """
+    position: int
+    forward: int
+    backward: int
+    illegal: int
+    illegal_times: list
+    interval: float
+
+    def window(self, index=0, context=4):
+        """
+        ``(start, end)`` of the window around the illegal transition
+        ``index``, ``context`` typical changes to either side.
+        """
+        time = self.illegal_times[index]
+        return time - context * self.interval, time + context * self.interval
+
+
+def check_file(path, a='a', b='b', chunk_rows=capture.CHUNK_ROWS, limit=1000):
+    """
+    The ``Summary`` of the lines ``a`` and ``b``, given by channel name, of
+    the capture at ``path``. Only the times of the first ``limit`` illegal
+    transitions are kept.
+    """
+    names, chunks = capture.read_chunks(path, chunk_rows)
+    columns = [names.index(a), names.index(b)]
+    state = None
+    forward = backward = illegal = 0
+    illegal_times = []
+    interval = np.nan
+    for times, levels in chunks:
+        transitions = decode(times, levels[:, columns[0]], levels[:, columns[1]], state)
+        state = transitions.state
+        forward += int(np.count_nonzero(transitions.steps > 0))
+        backward += int(np.count_nonzero(transitions.steps < 0))
+        illegal += int(np.count_nonzero(transitions.illegal))
+        if len(illegal_times) < limit:
+            illegal_times.extend(transitions.times[transitions.illegal][:limit - len(illegal_times)]
+                                 .tolist())
+        if np.isnan(interval) and len(transitions.times) > 2:
+            interval = float(np.median(np.diff(transitions.times)))
+    return Summary(forward - backward, forward, backward, illegal, illegal_times, interval)
+
+
+def timing_diagram(path, start, end, a='a', b='b', **kwargs):
+    """
+    A ``logic.TimingDiagram`` of the lines ``a`` and ``b`` of the capture at
+    ``path`` between ``start`` and ``end``, labelled with the state of each
+    character and with illegal transitions marked in red. Other keyword
+    arguments go to ``TimingDiagram``.
+    """
+    from schemdraw import logic
+
+    captured = capture.window(path, start, end, [a, b])
+    origin, period, count = captured.slots()
+    levels = captured.at(origin + (np.arange(count) + 0.5) * period)
+    edges = [f'[0^:{slot + 0.5}]-[0^:{slot + 0.5}]{{none,:}} {level_a},{level_b}'
+             for slot, (level_a, level_b) in enumerate(levels.tolist())
+             if capture.UNKNOWN not in (level_a, level_b)]
+    transitions = decode(captured.times, captured.levels[:, 0], captured.levels[:, 1])
+    for time in transitions.times[transitions.illegal]:
+        slot = round((time - origin) / period, 3)
+        edges.append(f'[0^:{slot}]-[1v:{slot}]{{red}}')
+    signals = [{'name': name, 'wave': capture.wave(levels[:, column])}
+               for column, name in enumerate(captured.names)]
+    return logic.TimingDiagram({'signal': signals, 'edge': edges},
+                               **{'risetime': 0, 'grid': False, **kwargs})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help='CSV file exported by a logic analyzer')
+    parser.add_argument('-a', default='a', help='channel of the A line, defaults to a')
+    parser.add_argument('-b', default='b', help='channel of the B line, defaults to b')
+    parser.add_argument('--svg', help='save the diagram of an illegal transition to this file')
+    parser.add_argument('-i', '--index', type=int, default=0,
+                        help='index of the illegal transition drawn with --svg, defaults to 0')
+    parser.add_argument('--context', type=int, default=4,
+                        help='changes to draw to either side of the illegal transition, '
+                             'defaults to 4')
+    args = parser.parse_args(argv)
+
+    summary = check_file(args.capture, args.a, args.b)
+    print(f'position {summary.position}, {summary.forward} steps forward, '
+          f'{summary.backward} backward, {summary.illegal} illegal transitions')
+    for time in summary.illegal_times[:10]:
+        print(f'    illegal transition at {time:.9f}s')
+
+    if args.svg:
+        if args.index >= len(summary.illegal_times):
+            parser.error(f'the capture has no illegal transition {args.index}')
+        import schemdraw
+        import svgopt
+        with schemdraw.Drawing(show=False, file=args.svg) as d:
+            d += timing_diagram(args.capture, *summary.window(args.index, args.context),
+                                args.a, args.b)
+        svgopt.optimize_file(args.svg)
+    return 1 if summary.illegal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
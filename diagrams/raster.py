@@ -0,0 +1,253 @@
+"""
+Raster versions of the drawings, for feeds, social previews and the post
+index.
+
+Each drawing's SVG is rendered by resvg, locally and without a browser, at
+every width in ``WIDTHS`` and saved as PNG and WebP in ``../assets/raster/``:
+
+    python raster.py                       # every drawing
+    python raster.py 'esp32-spi*'          # the drawings matching a glob
+    python raster.py -w 600 -f webp        # other widths and formats
+
+Drawings are rasterized in parallel, and only when their SVG or the options
+changed since they were last rasterized, using the build cache. The files
+written are listed in ``../assets/raster/manifest.json``, with their size in
+pixels and bytes. ``build.py --raster`` runs this after rendering.
+
+Text is set in the DejaVu Sans bundled in ``fonts/`` rather than in the fonts
+of the machine, so the files are the same wherever they are built. schemdraw
+asks for ``sans``, which resvg does not know as a generic family, and the
+Fritzing parts for fonts such as OCRA which are not installed, so families
+are mapped to ``sans-serif`` or fall back to it.
+
+Needs the ``raster`` extra, resvg-py and, for WebP, Pillow.
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from build import DIAGRAMS_DIR, find_drawings, select
+from build_cache import BuildCache
+
+RASTER_DIR = DIAGRAMS_DIR.parent / 'assets' / 'raster'
+MANIFEST = 'manifest.json'
+
+# Open graph previews are 1200 pixels wide, the post index shows thumbnails.
+WIDTHS = (1200, 400)
+FORMATS = ('png', 'webp')
+
+# Feeds and social sites show transparent images on whatever background
+# they use, often a dark one.
+BACKGROUND = '#ffffff'
+
+# The font all text is set in, see fonts/LICENSE.
+FONT = DIAGRAMS_DIR / 'fonts' / 'DejaVuSans.ttf'
+FONT_FAMILY = 'DejaVu Sans'
+
+_ROOT = re.compile(r'<svg\b[^>]*>')
+_SIZE = re.compile(r'\b(width|height)="([\d.]+)pt"')
+_FAMILY = re.compile(r'(font-family(?::|="))([^;"}<]+)')
+_GENERIC = ('serif', 'sans-serif', 'monospace', 'cursive', 'fantasy')
+
+
+class Raster(NamedTuple):
+    """
+    A raster file written for a drawing.
+
+    Attributes:
+        file: The file, relative to the raster directory.
+        format: ``'png'`` or ``'webp'``.
+        width: Width in pixels.
+        height: Height in pixels.
+        size: Size in bytes.
+    """
+    file: str
+    format: str
+    width: int
+    height: int
+    size: int
+
+
+def _resvg():
+    try:
+        import resvg_py
+    except ImportError:
+        raise RuntimeError('Rasterizing requires resvg-py, install the "raster" '
+                           'extra') from None
+    return resvg_py
+
+
+def _image():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError('Writing WebP requires Pillow, install the "raster" '
+                           'extra') from None
+    return Image
+
+
+def _without_units(svg):
+    # schemdraw sizes drawings in points, which resvg does not accept on the
+    # root element. Only the aspect ratio matters at a given width.
+    root = _ROOT.search(svg)
+    return svg[:root.start()] + _SIZE.sub(r'\1="\2"', root.group()) + svg[root.end():]
+
+
+def _family(match):
+    families = match.group(2).strip()
+    if families == 'sans':
+        families = 'sans-serif'
+    elif families.rsplit(',', 1)[-1].strip() not in _GENERIC:
+        families += ', sans-serif'
+    return match.group(1) + families
+
+
+def _prepare(svg):
+    # The SVG text as resvg can render it
+    return _FAMILY.sub(_family, _without_units(svg))
+
+
+def to_png(svg, width, background=BACKGROUND):
+    """
+    The PNG of the SVG document ``svg`` rendered ``width`` pixels wide, with
+    the bundled font.
+    """
+    return bytes(_resvg().svg_to_bytes(svg_string=_prepare(svg), width=width,
+                                       background=background, skip_system_fonts=True,
+                                       font_files=[str(FONT)],
+                                       sans_serif_family=FONT_FAMILY))
+
+
+def rasterize(svg, widths=WIDTHS, formats=FORMATS, background=BACKGROUND,
+              directory=RASTER_DIR):
+    """
+    Render the SVG file ``svg`` at each of ``widths`` in each of ``formats``
+    into ``directory``, named ``<svg name>-<width>.<format>``. Returns the
+    ``Raster`` of each file.
+    """
+    svg = Path(svg)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    source = svg.read_text(encoding='utf-8')
+    written = []
+    for width in widths:
+        png = to_png(source, width, background)
+        # The height from the IHDR chunk
+        height = int.from_bytes(png[20:24], 'big')
+        for fmt in formats:
+            if fmt == 'png':
+                data = png
+            else:
+                out = io.BytesIO()
+                _image().open(io.BytesIO(png)).save(out, fmt, quality=90, method=6)
+                data = out.getvalue()
+            name = f'{svg.stem}-{width}.{fmt}'
+            (directory / name).write_bytes(data)
+            written.append(Raster(name, fmt, width, height, len(data)))
+    return written
+
+
+def _options(widths, formats, background):
+    from importlib import metadata
+    font = hashlib.sha256(FONT.read_bytes()).hexdigest()[:16]
+    return (f'resvg-py=={metadata.version("resvg-py")},widths={sorted(widths)},'
+            f'formats={sorted(formats)},background={background},font={font}')
+
+
+def _inputs(svg, options):
+    digest = hashlib.sha256(Path(svg).read_bytes())
+    digest.update(options.encode())
+    return digest.hexdigest()
+
+
+def export(svgs, widths=WIDTHS, formats=FORMATS, background=BACKGROUND,
+           directory=RASTER_DIR, jobs=None, force=False):
+    """
+    Rasterize the SVG files ``svgs`` which changed since they were last
+    rasterized, or all of them with ``force``, in parallel, and write the
+    manifest of ``directory``: the ``Raster``\\s of each SVG, by its file
+    name. Returns the manifest and the number of SVGs rasterized.
+    """
+    directory = Path(directory)
+    manifest_path = directory / MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+    options = _options(widths, formats, background)
+    cache = BuildCache()
+
+    def outputs(svg):
+        return [os.path.relpath(directory / f'{Path(svg).stem}-{width}.{fmt}', cache.directory)
+                for width in widths for fmt in formats]
+
+    # Drawings left out of this export keep their entries
+    manifest = dict(previous)
+    stale = []
+    inputs = {}
+    for svg in svgs:
+        name = Path(svg).name
+        inputs[svg] = _inputs(svg, options)
+        if (force or name not in previous
+                or not cache.is_current(f'raster:{name}', inputs[svg], outputs(svg))):
+            stale.append(svg)
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(functools.partial(rasterize, widths=widths, formats=formats,
+                                                 background=background, directory=directory),
+                               stale)
+            for svg, rasters in zip(stale, results):
+                manifest[Path(svg).name] = [raster._asdict() for raster in rasters]
+                cache.update(f'raster:{Path(svg).name}', inputs[svg], outputs(svg))
+        cache.save()
+
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(dict(sorted(manifest.items())), indent=1),
+                             encoding='utf-8')
+    return manifest, len(stale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to rasterize, defaults to all')
+    parser.add_argument('-w', '--width', type=int, action='append', dest='widths',
+                        help=f'width in pixels, may be repeated, defaults to '
+                             f'{", ".join(map(str, WIDTHS))}')
+    parser.add_argument('-f', '--format', choices=['png', 'webp'], action='append',
+                        dest='formats', help='format, may be repeated, defaults to both')
+    parser.add_argument('--background', default=BACKGROUND,
+                        help=f'background color, defaults to {BACKGROUND}')
+    parser.add_argument('-o', '--output', type=Path, default=RASTER_DIR,
+                        help='directory to write to, defaults to ../assets/raster')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes to use, defaults to the number of cores')
+    parser.add_argument('--force', action='store_true',
+                        help='rasterize drawings even if they are up to date')
+    args = parser.parse_args(argv)
+
+    targets = find_drawings()
+    if args.patterns:
+        targets = select(targets, args.patterns)
+        if not targets:
+            parser.error(f'no drawings match {" ".join(args.patterns)}')
+    svgs = [DIAGRAMS_DIR / target.output for target in targets
+            if (DIAGRAMS_DIR / target.output).is_file()]
+    manifest, rasterized = export(svgs, args.widths or WIDTHS, args.formats or FORMATS,
+                                  args.background, args.output, args.jobs, args.force)
+    print(f'Rasterized {rasterized} drawings, {len(svgs) - rasterized} up to date, '
+          f'{sum(len(files) for files in manifest.values())} files in {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
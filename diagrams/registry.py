@@ -0,0 +1,142 @@
+"""
+Registry of the drawings in this directory.
+
+Drawing modules declare each drawing as a function which adds its elements to
+a ``schemdraw.Drawing``, along with the file it is saved to:
+
+    @drawing('../assets/three_wire_spi.svg')
+    def three_wire_spi(d):
+        d += Controller()
+        ...
+
+Importing a module only registers its drawings; nothing is rendered until
+``render`` is called with the drawing's name. Output paths are relative to
+this directory, which is also where the part files are loaded from.
+
+Variants of a drawing name the function building their shared ``base``,
+which is built once per process and forked for each of them, see
+``layouts.py``. The variant gets what the base returned:
+
+    @drawing('../assets/esp32-spi.svg', base=esp32_spi_board)
+    def esp32_spi(d, board):
+        ...
+"""
+from typing import Callable, NamedTuple, Optional
+from xml.etree import ElementTree as ET
+
+import schemdraw
+from schemdraw.backends.svg import Figure
+
+import layouts
+
+
+class Entry(NamedTuple):
+    """
+    A registered drawing.
+    """
+    name: str
+    output: str
+    module: str
+    func: Callable
+    base: Optional[Callable] = None
+
+
+_drawings = {}
+
+# The ``layouts.Layout`` of each base, by function.
+_layouts = {}
+
+
+def drawing(output, name=None, base=None):
+    """
+    Decorator registering the decorated function as the drawing saved to
+    ``output``. The drawing is named after the function unless ``name`` is
+    given. With a ``base`` the function is called with a fork of the drawing
+    ``base`` builds and what ``base`` returned.
+    """
+    def register(func):
+        entry = Entry(name or func.__name__, output, func.__module__, func, base)
+        _drawings[entry.name] = entry
+        return func
+    return register
+
+
+def drawings(module=None):
+    """
+    The registered drawings, optionally only those defined in ``module``.
+    """
+    return [entry for entry in _drawings.values()
+            if module is None or entry.module == module]
+
+
+def forget(module):
+    """
+    Unregister the drawings defined in ``module``, before it is reloaded.
+    """
+    for entry in drawings(module):
+        del _drawings[entry.name]
+    release(module)
+
+
+def get(name):
+    return _drawings[name]
+
+
+def build(name):
+    """
+    Build the drawing ``name``, placing its elements without drawing them.
+    Returns the ``schemdraw.Drawing``.
+    """
+    entry = _drawings[name]
+    # Clip path ids are numbered per process, reset them so a drawing is the
+    # same no matter what was rendered before it.
+    Figure.total_clips = 0
+    if entry.base is None:
+        d = schemdraw.Drawing(show=False)
+        layouts.populate(d, entry.func)
+    else:
+        if entry.base not in _layouts:
+            _layouts[entry.base] = layouts.snapshot(entry.base)
+        layout = _layouts[entry.base]
+        d = layouts.fork(layout, show=False)
+        layouts.populate(d, entry.func, layout.parts)
+    return d
+
+
+def render(name, file=None):
+    """
+    Build the drawing ``name`` and save it to its output, or to ``file``.
+    The drawing is let go of once written.
+    """
+    d = build(name)
+    file = str(file or _drawings[name].output)
+    d.draw(show=False)
+    if isinstance(d.fig, Figure):
+        # The same bytes as ``d.save`` writes, from the element tree, which
+        # is still built whole, but without also holding the document as
+        # text and as bytes
+        ET.ElementTree(d.fig.getsvg()).write(file, encoding='utf-8')
+    else:
+        d.save(file, **d.saveopts)
+    d.fig = None
+    d.elements.clear()
+
+
+def release(module=None):
+    """
+    Let go of the base layouts, which are otherwise kept for the life of the
+    process for the next variant of each to fork, or only of the bases
+    defined in ``module``.
+    """
+    for base in [base for base in _layouts if module is None or base.__module__ == module]:
+        del _layouts[base]
+
+
+def render_all(module=None):
+    """
+    Render every registered drawing, optionally only those in ``module``.
+    Drawing modules call this with ``__name__`` so they can be run as
+    scripts.
+    """
+    for entry in drawings(module):
+        render(entry.name)
@@ -0,0 +1,548 @@
+"""
+Orthogonal wires routed around the parts of a drawing.
+
+Instead of shaping each wire by hand, ``elm.Wire('n', k=2.3)``, and tuning
+it again whenever a part moves, a ``Router`` finds a short path from one
+anchor to another, with few bends, which stays clear of the parts it is given
+and of the wires already routed in the drawing:
+
+    router = Router([pmw3320db, esp32, resistor])
+    d += router.wire(d, bb.J2, pmw3320db.pin2).color('red')
+
+The search is A* over a grid with a line every ``pitch`` through both ends.
+Which parts cover a point of the grid comes from an R-tree of their bounding
+boxes, see ``spatial.py``. A wire leaving a pin inside a part's box goes
+straight out of the nearest side of the box, and comes in to one the same
+way.
+
+Given the ``board`` the parts are plugged into, wires keep off of its holes
+other than the two they end at, which would read as connections. The grid
+has a line between each row and column of holes as well, so wires run
+between them, and never across a strip of connected holes something is
+plugged into other than their own:
+
+    router = Router([pmw3320db, esp32, resistor], board=bb)
+
+Wires are kept from running along each other, or the lines already drawn,
+and never pass through the ends of other wires or the way out of the pins
+those end at. Crossing a wire costs more than a detour of a few holes, so
+wires only cross where there is no other way. The router only reads the
+drawing, so variants of a base layout can route from a router the base made.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right
+
+from schemdraw import drawing_stack
+from schemdraw.elements import Element
+from schemdraw.elements.lines import Line, Wire
+from schemdraw.segments import Segment
+from schemdraw.util import Point
+
+from spatial import RTree
+
+# The spacing of the holes of a breadboard
+PITCH = 0.35
+# Space kept between a wire and the box of a part
+CLEARANCE = 0.1
+# Lengths a bend, crossing another wire and running along one cost
+BEND = 0.5
+CROSSING = 5
+OVERLAP = 10
+# How near to a hole of a board counts as on it
+HOLE = 0.05
+# Times the nets are routed again in another order to cross fewer wires
+REORDERS = 1
+
+# +x, -x, +y, -y
+_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+# The directions a wire can go on in after each, as it does not turn back,
+# and from the start
+_TURNS = tuple(tuple(turn for turn in range(4) if turn != heading ^ 1) for heading in range(4)) + \
+    ((0, 1, 2, 3),)
+_EPSILON = 1e-6
+_NOTHING = frozenset()
+# The anchors of a breadboard which are holes, the inner ones and the rails
+_HOLE_NAME = re.compile(r'([A-J])(\d+)$|([LR][12])_\d+$')
+
+
+def segment_bbox(segment):
+    """
+    The ``(xmin, ymin, xmax, ymax)`` of the placed ``segment``. An image, or
+    any segment with a ``rotate``, is turned about its corner, as it is
+    drawn, where ``SegmentImage.get_bbox`` turns it about the origin. A
+    ``sprites.SegmentSprite`` is the box of the segments it draws.
+    """
+    if hasattr(segment, 'segments'):
+        boxes = [segment_bbox(inner) for inner in segment.segments]
+        return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                max(box[2] for box in boxes), max(box[3] for box in boxes))
+    if getattr(segment, 'rotate', 0) % 360 == 0:
+        return tuple(segment.get_bbox())
+    corners = [segment.xy + Point(corner).rotate(segment.rotate)
+               for corner in ((0, 0), (segment.width, 0),
+                              (segment.width, segment.height), (0, segment.height))]
+    return (min(x for x, _ in corners), min(y for _, y in corners),
+            max(x for x, _ in corners), max(y for _, y in corners))
+
+
+def bbox(part):
+    """
+    The ``(xmin, ymin, xmax, ymax)`` of ``part``, a placed element or a box,
+    in drawing coordinates.
+    """
+    if not isinstance(part, Element):
+        return tuple(part)
+    boxes = [segment_bbox(segment.xform(part.transform, **part.params))
+             for segment in part.segments]
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+class Route(Element):
+    """
+    A wire through ``points``, as routed by ``Router.route``.
+
+    Anchors:
+        * start
+        * end
+    """
+    def __init__(self, points, **kwargs):
+        super().__init__(**kwargs)
+        start = Point(points[0])
+        path = [Point(point) - start for point in points]
+        self.segments.append(Segment(path))
+        self.points = [Point(point) for point in points]
+        self.anchors['start'] = path[0]
+        self.anchors['end'] = path[-1]
+        self.elmparams['theta'] = 0
+        self.elmparams['drop'] = 'end'
+        self.at(start)
+
+
+def _lines(origin, end, low, high, pitch):
+    # Grid lines every pitch through origin, from low to high, and one
+    # through end, rounded as the runs of _Wires are
+    first = math.ceil((low - origin) / pitch - _EPSILON)
+    last = math.floor((high - origin) / pitch + _EPSILON)
+    lines = {round(origin + k * pitch, 6) for k in range(first, last + 1)}
+    lines.add(round(end, 6))
+    return sorted(lines)
+
+
+def _escape(point, box):
+    # The direction of the side of box nearest to point
+    distances = (box[2] - point[0], point[0] - box[0], box[3] - point[1], point[1] - box[1])
+    return distances.index(min(distances))
+
+
+def _block(blocked, xs, ys, box):
+    # Adds the steps between the lines xs and ys that touch box to blocked,
+    # as the column and row they start from and their axis
+    left, right = bisect_left(xs, box[0]), bisect_right(xs, box[2])
+    bottom, top = bisect_left(ys, box[1]), bisect_right(ys, box[3])
+    for j in range(bottom, top):
+        for i in range(max(left - 1, 0), min(right, len(xs) - 1)):
+            blocked.add((i, j, 0))
+    for i in range(left, right):
+        for j in range(max(bottom - 1, 0), min(top, len(ys) - 1)):
+            blocked.add((i, j, 1))
+
+
+class _Wires:
+    # The horizontal and vertical runs of routed wires, by their y and x,
+    # and their ends along with those of wires still to be routed, all
+    # rounded to 6 places as the points they are looked up with must be
+    def __init__(self, routes, ends=()):
+        self.runs = ({}, {})
+        self.keys = ([], [])
+        self.ends = {(round(x, 6), round(y, 6)) for x, y in ends}
+        for points in routes:
+            self.ends.update((round(x, 6), round(y, 6)) for x, y in (points[0], points[-1]))
+            for a, b in zip(points, points[1:]):
+                axis = 0 if abs(a[1] - b[1]) < _EPSILON else 1
+                if axis == 1 and abs(a[0] - b[0]) > _EPSILON:
+                    continue
+                across = round(a[1 - axis], 6)
+                low, high = sorted((a[axis], b[axis]))
+                self.runs[axis].setdefault(across, []).append((low, high))
+        self.keys = tuple(sorted(runs) for runs in self.runs)
+
+    def overlap(self, axis, across, low, high):
+        # Length of [low, high] on the line which wires already run along
+        return sum(max(0.0, min(high, run_high) - max(low, run_low))
+                   for run_low, run_high in self.runs[axis].get(across, ()))
+
+    def crossings(self, axis, across, start, stop, last=True):
+        # Number of wires crossed going from start to stop along axis on the
+        # line at across, those at start left out as they were counted on the
+        # way there, and those at stop unless last
+        keys = self.keys[1 - axis]
+        if start < stop:
+            first = bisect_right(keys, start)
+            end = bisect_right(keys, stop) if last else bisect_left(keys, stop)
+        else:
+            first = bisect_left(keys, stop) if last else bisect_right(keys, stop)
+            end = bisect_left(keys, start)
+        return sum(any(low - _EPSILON <= across <= high + _EPSILON
+                       for low, high in self.runs[1 - axis][key])
+                   for key in keys[first:end])
+
+    def crossed(self, points):
+        # Number of wires the wire through points crosses between its ends
+        count = 0
+        for index, (a, b) in enumerate(zip(points, points[1:])):
+            axis = 0 if abs(a[1] - b[1]) < _EPSILON else 1
+            count += self.crossings(axis, round(a[1 - axis], 6), round(a[axis], 6),
+                                    round(b[axis], 6), index < len(points) - 2)
+        return count
+
+
+class Router:
+    """
+    Routes wires around ``parts``, placed elements or ``(xmin, ymin, xmax,
+    ymax)`` boxes, on a grid of ``pitch``, keeping ``clearance`` from them,
+    and off of the holes of the breadboard ``board`` if given. ``wires`` tries
+    up to ``reorders`` other orders of the nets to cross fewer wires.
+    """
+    def __init__(self, parts, pitch=PITCH, clearance=CLEARANCE, bend=BEND,
+                 crossing=CROSSING, overlap=OVERLAP, board=None, reorders=REORDERS):
+        self.pitch = pitch
+        self.reorders = reorders
+        self.bend = bend
+        self.crossing = crossing
+        self.overlap = overlap
+        self.boxes = []
+        for part in parts:
+            xmin, ymin, xmax, ymax = bbox(part)
+            self.boxes.append((xmin - clearance, ymin - clearance,
+                               xmax + clearance, ymax + clearance))
+        self.tree = RTree(self.boxes)
+        self.holes = self.strips = None
+        self.plugged = set()
+        if board is not None:
+            self._board(board, parts)
+
+    def _board(self, board, parts):
+        # The holes of board, the boxes of its strips of connected holes and
+        # the strips the parts are plugged into
+        strips = {}
+        for name, (x, y) in board.absanchors.items():
+            found = _HOLE_NAME.match(name)
+            if found is None:
+                continue
+            # A column of five holes either side of the middle, or a rail
+            key = found.group(3) or (found.group(1) <= 'E', found.group(2))
+            strips.setdefault(key, []).append((x, y))
+        points = [point for holes in strips.values() for point in holes]
+        self.holes = RTree([(x - HOLE, y - HOLE, x + HOLE, y + HOLE) for x, y in points])
+        # Reaching a quarter of the way to the next row or column, so the
+        # lines between holes pass by a strip but not across it
+        margin = self.pitch / 4
+        self.strips = RTree([(min(x for x, _ in holes) - margin, min(y for _, y in holes) - margin,
+                              max(x for x, _ in holes) + margin, max(y for _, y in holes) + margin)
+                             for holes in strips.values()])
+        for part in parts:
+            if isinstance(part, Element):
+                for point in part.absanchors.values():
+                    self.plugged.update(self._strips(point))
+
+    def _strips(self, point):
+        # The strips of connected holes point is a hole of
+        if self.holes is None or not self.holes.at(*point):
+            return set()
+        return set(self.strips.at(*point))
+
+    def _ends(self, point):
+        # The box a wire must leave point through, and the direction, if any
+        inside = self.tree.at(*point)
+        if not inside:
+            return None, None
+        # The smallest box is the part the pin belongs to
+        box = min((self.boxes[index] for index in inside),
+                  key=lambda box: (box[2] - box[0]) * (box[3] - box[1]))
+        return box, _escape(point, box)
+
+    def route(self, start, end, wires=(), avoid=()):
+        """
+        The corners of a wire from ``start`` to ``end``, both included. It
+        is kept from running along ``wires``, lists of the corners of other
+        wires, and from passing through their ends or the points ``avoid``.
+        Raises ``ValueError`` if there is no way through.
+        """
+        start, end = Point(start), Point(end)
+        pitch = self.pitch
+        # With a board, a line between each row and column of holes as well
+        spacing = pitch if self.holes is None else pitch / 2
+        start_box, start_out = self._ends(start)
+        end_box, end_out = self._ends(end)
+        # Wires leave and arrive along the longer side of the box between
+        # the ends, rather than over the holes next to them, where they can
+        # choose
+        toward = _toward(start, end)
+        leave = toward if start_out is None else start_out
+        arrive = toward if end_out is None else end_out ^ 1
+
+        others = _Wires(wires, avoid)
+        # The strips of holes other wires end at or parts are plugged into,
+        # other than those of the wire's own ends
+        own = self._strips(start) | self._strips(end)
+        occupied = set(self.plugged)
+        for point in others.ends:
+            occupied.update(self._strips(point))
+        occupied -= own
+        own_holes = set()
+        if self.holes is not None:
+            own_holes.update(self.holes.at(*start), self.holes.at(*end))
+
+        # Search the box around both ends, grown by the parts in the way.
+        # Strips are short enough to go around within the margin, and the
+        # rails would grow it to the whole board.
+        area = (min(start[0], end[0]), min(start[1], end[1]),
+                max(start[0], end[0]), max(start[1], end[1]))
+        grown = None
+        while grown != area:
+            grown = area
+            for box in (self.boxes[index] for index in self.tree.search(grown)):
+                area = (min(area[0], box[0]), min(area[1], box[1]),
+                        max(area[2], box[2]), max(area[3], box[3]))
+        # Wide enough for any detour cheaper than crossing a wire
+        margin = max(2 * pitch, self.crossing / 2)
+        xs = _lines(start[0], end[0], area[0] - margin, area[2] + margin, spacing)
+        ys = _lines(start[1], end[1], area[1] - margin, area[3] + margin, spacing)
+        source = (xs.index(round(start[0], 6)), ys.index(round(start[1], 6)))
+        target = (xs.index(round(end[0], 6)), ys.index(round(end[1], 6)))
+
+        # The parts over each point of the grid
+        window = (xs[0], ys[0], xs[-1], ys[-1])
+        covered = {}
+        for index in self.tree.search(window):
+            box = self.boxes[index]
+            for i in range(bisect_left(xs, box[0]), bisect_right(xs, box[2])):
+                for j in range(bisect_left(ys, box[1]), bisect_right(ys, box[3])):
+                    covered.setdefault((i, j), set()).add(index)
+
+        def cover(node):
+            return covered.get(node, _NOTHING)
+
+        start_parts = cover(source)
+        end_parts = cover(target)
+        # The points other wires end at, and the way they leave the pins
+        # there up to a pitch out of the part, are kept clear for them
+        columns = {x: i for i, x in enumerate(xs)}
+        rows = {y: j for j, y in enumerate(ys)}
+        closed = set()
+        for point in others.ends:
+            node = columns.get(point[0]), rows.get(point[1])
+            if None not in node and node != target:
+                closed.add(node)
+            box, out = self._ends(point)
+            if box is None or _distance(point, start) < _EPSILON or _distance(point, end) < _EPSILON:
+                continue
+            axis = out // 2
+            edge = box[2 + axis] + pitch if out % 2 == 0 else box[axis] - pitch
+            low, high = sorted((point[axis], edge))
+            if axis == 0 and point[1] in rows:
+                closed.update((i, rows[point[1]])
+                              for i in range(bisect_left(xs, low), bisect_right(xs, high)))
+            elif axis == 1 and point[0] in columns:
+                closed.update((columns[point[0]], j)
+                              for j in range(bisect_left(ys, low), bisect_right(ys, high)))
+
+        # The steps over a hole other than its own, between the grid lines
+        # as well, or across a strip something else is plugged into
+        blocked = set()
+        if self.holes is not None:
+            for index in self.holes.search(window):
+                if index not in own_holes:
+                    _block(blocked, xs, ys, self.holes.boxes[index])
+            for index in occupied:
+                _block(blocked, xs, ys, self.strips.boxes[index])
+
+        def allowed(node, current, direction):
+            if node in closed:
+                return False
+            if blocked and (min(node[0], current[0]), min(node[1], current[1]),
+                            direction // 2) in blocked:
+                return False
+            parts = cover(node)
+            if not parts:
+                return True
+            # Straight out of the part the wire starts in
+            if start_box is not None and parts <= start_parts and direction == start_out \
+                    and (current == source or cover(current) and cover(current) <= start_parts):
+                return True
+            # Straight in to the part it ends in
+            if end_box is not None and parts <= end_parts and direction == end_out ^ 1:
+                along = 1 if direction < 2 else 0
+                return node[along] == target[along]
+            return False
+
+        # What is left to go from each line, at least
+        left_x = [abs(x - end[0]) for x in xs]
+        left_y = [abs(y - end[1]) for y in ys]
+        width, height = len(xs), len(ys)
+        bend = self.bend
+
+        # (estimate, cost, tie, node, direction); direction 4 is none yet
+        queue = [(left_x[source[0]] + left_y[source[1]], 0.0, 0, source, 4)]
+        best = {(source, 4): 0.0}
+        came_from = {}
+        steps = {}
+        tie = 0
+        while queue:
+            _, cost, _, node, heading = heapq.heappop(queue)
+            if node == target:
+                break
+            if best.get((node, heading), math.inf) < cost:
+                continue
+            for direction in _TURNS[heading]:
+                di, dj = _DIRECTIONS[direction]
+                i, j = node[0] + di, node[1] + dj
+                if not (0 <= i < width and 0 <= j < height):
+                    continue
+                step = (i, j)
+                state = (step, direction)
+                # Which steps are allowed and what they cost besides bends
+                # does not depend on the way to them, so each is found once
+                if state in steps:
+                    added = steps[state]
+                else:
+                    added = steps[state] = self._step(others, xs, ys, node, step, direction,
+                                                      target) \
+                        if allowed(step, node, direction) else None
+                if added is None:
+                    continue
+                if heading != 4 and direction != heading:
+                    added += bend
+                if (heading == 4 and direction != leave) or (step == target and direction != arrive):
+                    added += bend
+                new = cost + added
+                if new < best.get(state, math.inf) - _EPSILON:
+                    best[state] = new
+                    came_from[state] = (node, heading)
+                    tie += 1
+                    estimate = new + left_x[i] + left_y[j]
+                    if i != target[0] and j != target[1]:
+                        # Still to turn at least once
+                        estimate += bend
+                    heapq.heappush(queue, (estimate, new, tie, step, direction))
+        else:
+            raise ValueError(f'no route from {tuple(start)} to {tuple(end)}')
+
+        nodes = [node]
+        state = (node, heading)
+        while state in came_from:
+            state = came_from[state]
+            nodes.append(state[0])
+        nodes.reverse()
+        points = [Point((xs[i], ys[j])) for i, j in nodes]
+        points[0], points[-1] = start, end
+        return _corners(points)
+
+    def _step(self, others, xs, ys, node, step, direction, target):
+        # The length of the step from node, with what running along and
+        # crossing other wires costs
+        axis = direction // 2
+        if axis == 0:
+            across, a, b = ys[node[1]], xs[node[0]], xs[step[0]]
+        else:
+            across, a, b = xs[node[0]], ys[node[1]], ys[step[1]]
+        low, high = (a, b) if a < b else (b, a)
+        cost = high - low
+        if across in others.runs[axis]:
+            cost += self.overlap * others.overlap(axis, across, low, high)
+        return cost + self.crossing * others.crossings(axis, across, a, b, step != target)
+
+    def wire(self, d, start, end):
+        """
+        A ``Route`` from ``start`` to ``end``, kept from running along the
+        routes, lines and wires already in the drawing ``d``. It still has to
+        be added to ``d``.
+        """
+        return self.wires(d, [(start, end)])[0]
+
+    def wires(self, d, nets):
+        """
+        A ``Route`` for each ``(start, end)`` of ``nets``, kept from running
+        along each other and the routes, lines and wires already in the
+        drawing ``d``, and from passing through the ends of any of them. The
+        shortest nets are routed first, and a net that has to cross the others
+        is tried first instead. They still have to be added to ``d``.
+        """
+        drawn = _drawn(d)
+        ends = [point for net in nets for point in net]
+        order = sorted(range(len(nets)), key=lambda index: (_distance(*nets[index]), index))
+        best = None
+        # A net routed late may have to cross the nets routed before it where
+        # routing it first lets them all go around each other, so a net which
+        # crosses is moved to the front and all are routed again, for as long
+        # as that leaves fewer crossings
+        for _ in range(self.reorders + 1):
+            routes = list(drawn)
+            found = {}
+            crossing = None
+            crossings = 0
+            for index in order:
+                start, end = nets[index]
+                found[index] = self.route(start, end, routes, ends)
+                crossed = _Wires(routes).crossed(found[index])
+                if crossed and crossing is None:
+                    crossing = index
+                crossings += crossed
+                routes.append(found[index])
+            if best is not None and crossings >= best[0]:
+                break
+            best = crossings, found
+            if crossing is None or crossing == order[0]:
+                break
+            order.remove(crossing)
+            order.insert(0, crossing)
+        found = best[1]
+        # Made in the order of nets, and off of the drawing until added to it,
+        # so each is added once
+        paused = drawing_stack.pause
+        drawing_stack.pause = True
+        try:
+            return [Route(found[index]) for index in range(len(nets))]
+        finally:
+            drawing_stack.pause = paused
+
+
+def _drawn(d):
+    # The corners of the routes, lines and wires in d
+    drawn = []
+    for element in d.elements:
+        if isinstance(element, Route):
+            drawn.append(element.points)
+        elif isinstance(element, (Line, Wire)):
+            drawn.extend([element.transform.transform(point) for point in segment.path]
+                         for segment in element.segments if isinstance(segment, Segment))
+    return drawn
+
+
+def _toward(start, end):
+    # The direction from start to end along the longer axis
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    if abs(dx) >= abs(dy):
+        return 0 if dx >= 0 else 1
+    return 2 if dy >= 0 else 3
+
+
+def _distance(start, end):
+    return abs(start[0] - end[0]) + abs(start[1] - end[1])
+
+
+def _corners(points):
+    # Drop the points in the middle of straight runs
+    corners = [points[0]]
+    for previous, point, following in zip(points, points[1:], points[2:]):
+        straight = (abs(previous[0] - point[0]) < _EPSILON and
+                    abs(point[0] - following[0]) < _EPSILON) or \
+                   (abs(previous[1] - point[1]) < _EPSILON and
+                    abs(point[1] - following[1]) < _EPSILON)
+        if not straight:
+            corners.append(point)
+    corners.append(points[-1])
+    return corners
@@ -1,12 +1,16 @@
-import schemdraw
 import schemdraw.elements as elm
-import schemdraw.pictorial as pictorial
 from schemdraw.elements.intcircuits import Ic, IcPin
 from schemdraw.util import Point
 from atmega import AtmegaIc, AtmegaPictorial
-import schemdraw.logic as logic
 from esp32 import Esp32c6Pictorial
-
+from geometry import cached_geometry
+from registry import drawing, render_all
+from lazy import lazy, lazy_import
+Breadboard = lazy('parts', 'Breadboard')
+FritzingPart = lazy('parts', 'FritzingPart')
+logic = lazy_import('schemdraw.logic')
+
+@cached_geometry
 class WheelEncoder(Ic):
     """
     A scroll wheel rotary encoder.
@@ -25,7 +29,8 @@ class WheelEncoder(Ic):
         ]
         super().__init__(pins=pins, botlabel='Scroll Wheel')
 
-with schemdraw.Drawing(show=False, file='../assets/scroll_wheel.svg') as d:
+@drawing('../assets/scroll_wheel.svg')
+def scroll_wheel(d):
     enc = WheelEncoder()
     d += enc
     line = elm.Line().right().at(enc.COM)
@@ -37,15 +42,16 @@ with schemdraw.Drawing(show=False, file='../assets/scroll_wheel.svg') as d:
     d += elm.lines.Wire('-|').at(enc.CLK).to(getattr(atmega, '3'))
     d += elm.lines.Wire('-|').at(enc.DT).to(getattr(atmega, '2'))
 
-with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_bb.svg') as d:
-    bb = pictorial.Breadboard().up().at(AtmegaPictorial.bb_offset())
+@drawing('../assets/scroll_wheel_bb.svg')
+def scroll_wheel_bb(d):
+    bb = Breadboard().up().at(AtmegaPictorial.bb_offset())
     d += bb
 
     atmega = AtmegaPictorial().up().at(bb.D1).anchor('TXO')
     d += atmega
 
 
-    enc = pictorial.FritzingPart('rotary_encoder.fzpz').left().at(bb.A5 + Point((0, -3))).anchor('EncoderPinC')
+    enc = FritzingPart('rotary_encoder.fzpz').left().at(bb.A5 + Point((0, -3))).anchor('EncoderPinC')
     d += enc
 
     d += elm.Line().at(enc.EncoderPinB).to(bb.A4).color('black')
@@ -55,7 +61,8 @@ with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_bb.svg') as d:
     # Hack bbox expansion to keep the encoder visible
     d += elm.Line().at(bb.A5 + Point((0, -5))).to(bb.A5 + Point((0, -5))).color(None)
 
-with schemdraw.Drawing(show=False, file='../assets/rotary_encoder_signal.svg') as d:
+@drawing('../assets/rotary_encoder_signal.svg')
+def rotary_encoder_signal(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'a', 'wave': '0.1.0.1.'},  
@@ -68,13 +75,16 @@ with schemdraw.Drawing(show=False, file='../assets/rotary_encoder_signal.svg') a
 
          ]}, risetime=0, grid=False)
 
-with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_esp32_bb.svg') as d:
-    bb = pictorial.Breadboard().up()
+def scroll_wheel_esp32_board(d):
+    bb = Breadboard().up()
     d += bb
     esp32 = Esp32c6Pictorial().at(bb.C2).anchor('D1')
     d += esp32
+    return bb
 
-    enc = pictorial.FritzingPart('rotary_encoder.fzpz').left().at(bb.A2 + Point((0, -3))).anchor('EncoderPinC')
+@drawing('../assets/scroll_wheel_esp32_bb.svg', base=scroll_wheel_esp32_board)
+def scroll_wheel_esp32_bb(d, bb):
+    enc = FritzingPart('rotary_encoder.fzpz').left().at(bb.A2 + Point((0, -3))).anchor('EncoderPinC')
     d += enc
 
     d += elm.Line().at(enc.EncoderPinB).to(bb.A1).color('lightgrey')
@@ -87,13 +97,9 @@ with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_esp32_bb.svg') a
     # Hack bbox expansion to keep the encoder visible
     d += elm.Line().at(bb.A5 + Point((0, -5))).to(bb.A5 + Point((0, -5))).color(None)
 
-with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_esp32_wired_correct_bb.svg') as d:
-    bb = pictorial.Breadboard().up()
-    d += bb
-    esp32 = Esp32c6Pictorial().at(bb.C2).anchor('D1')
-    d += esp32
-
-    enc = pictorial.FritzingPart('rotary_encoder.fzpz').left().at(bb.A1 + Point((0, -3))).anchor('EncoderPinC')
+@drawing('../assets/scroll_wheel_esp32_wired_correct_bb.svg', base=scroll_wheel_esp32_board)
+def scroll_wheel_esp32_wired_correct_bb(d, bb):
+    enc = FritzingPart('rotary_encoder.fzpz').left().at(bb.A1 + Point((0, -3))).anchor('EncoderPinC')
     d += enc
 
     lead = elm.Line().at(enc.EncoderPinB).up(2.5).color('lightgrey')
@@ -106,8 +112,8 @@ with schemdraw.Drawing(show=False, file='../assets/scroll_wheel_esp32_wired_corr
     # Hack bbox expansion to keep the encoder visible
     d += elm.Line().at(bb.A5 + Point((0, -5))).to(bb.A5 + Point((0, -5))).color(None)
 
-
-with schemdraw.Drawing(show=False, file='../assets/rotary_encoder_bad_ground_signal.svg') as d:
+@drawing('../assets/rotary_encoder_bad_ground_signal.svg')
+def rotary_encoder_bad_ground_signal(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'a', 'wave': '0.1.0.1.'},  
@@ -118,4 +124,8 @@ with schemdraw.Drawing(show=False, file='../assets/rotary_encoder_bad_ground_sig
             '[0^:2.5]-[0^:2.5]{none,:} 1,1',
             '[0^:3.5]-[0^:3.5]{none,:} 1,1'
 
-         ]}, risetime=0, grid=False)
\ No newline at end of file
+         ]}, risetime=0, grid=False)
+
+
+if __name__ == '__main__':
+    render_all(__name__)
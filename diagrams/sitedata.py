@@ -0,0 +1,142 @@
+"""
+Size and placeholder of each drawing, for the site to lay out pages before
+the SVGs download.
+
+``build.py`` keeps ``../_data/diagrams.json`` up to date with an entry per
+drawing, keyed by its URL:
+
+    "/assets/three_wire_spi.svg": {
+     "width": 347, "height": 185, "aspect_ratio": 1.8757, "bytes": 10457,
+     "sha256": "...", "placeholder": "data:image/png;base64,..."
+    }
+
+``width`` and ``height`` are the intrinsic size in CSS pixels. The
+placeholder is the drawing rendered ``PLACEHOLDER_WIDTH`` pixels wide, which
+needs resvg-py from the ``raster`` extra; without it entries have none.
+``_includes/diagram.html`` uses the entries to give each ``<img>`` its size,
+so the browser reserves the space, and to load it lazily:
+
+    {% include diagram.html src="/assets/three_wire_spi.svg" alt="Three wire SPI" %}
+
+Entries are only computed again when the SVG changes. Run directly it updates
+the entries of every drawing:
+
+    python sitedata.py
+"""
+import argparse
+import base64
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from build import DIAGRAMS_DIR, find_drawings
+
+DATA_FILE = DIAGRAMS_DIR.parent / '_data' / 'diagrams.json'
+ASSETS_DIR = DIAGRAMS_DIR.parent / 'assets'
+ASSETS_URL = '/assets/'
+
+PLACEHOLDER_WIDTH = 16
+
+# CSS pixels per point
+_PX_PER_PT = 96 / 72
+_SIZE = re.compile(r'<svg\b[^>]*>')
+_LENGTH = re.compile(r'\b(width|height)="([\d.]+)(pt|px)?"')
+
+
+def url(svg):
+    """
+    The URL the site serves the file ``svg`` under, ``None`` if it is not in
+    ``assets/``.
+    """
+    try:
+        return ASSETS_URL + Path(svg).resolve().relative_to(ASSETS_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def size(svg_text):
+    """
+    The ``(width, height)`` in CSS pixels of the SVG document ``svg_text``.
+    """
+    lengths = {name: float(value) * (_PX_PER_PT if unit == 'pt' else 1)
+               for name, value, unit in _LENGTH.findall(_SIZE.search(svg_text).group())}
+    return lengths['width'], lengths['height']
+
+
+def placeholder(svg_text, width=PLACEHOLDER_WIDTH):
+    """
+    A ``data:`` URL of the SVG document ``svg_text`` rendered ``width``
+    pixels wide, ``None`` without resvg-py.
+    """
+    try:
+        import raster
+        png = raster.to_png(svg_text, width)
+    except RuntimeError:
+        return None
+    return 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+
+def entry(svg):
+    """
+    The data of the SVG file ``svg``.
+    """
+    data = Path(svg).read_bytes()
+    text = data.decode('utf-8')
+    width, height = size(text)
+    found = {
+        'width': round(width),
+        'height': round(height),
+        'aspect_ratio': round(width / height, 4),
+        'bytes': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+    image = placeholder(text)
+    if image is not None:
+        found['placeholder'] = image
+    return found
+
+
+def update(svgs, path=DATA_FILE):
+    """
+    Update the entries of the SVG files ``svgs`` in the data file ``path``,
+    and drop those of SVGs which no longer exist. SVGs outside ``assets/``
+    or not written yet are skipped. Returns the number of entries computed
+    again.
+    """
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    updated = 0
+    for svg in svgs:
+        key = url(svg)
+        if key is None or not Path(svg).is_file():
+            continue
+        digest = hashlib.sha256(Path(svg).read_bytes()).hexdigest()
+        if data.get(key, {}).get('sha256') != digest:
+            data[key] = entry(svg)
+            updated += 1
+    data = {key: value for key, value in sorted(data.items())
+            if (ASSETS_DIR / key[len(ASSETS_URL):]).is_file()}
+    text = json.dumps(data, indent=1) + '\n'
+    if not path.is_file() or path.read_text(encoding='utf-8') != text:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args(argv)
+
+    svgs = [DIAGRAMS_DIR / target.output for target in find_drawings()]
+    updated = update(svgs)
+    print(f'Updated {updated} of {len(svgs)} drawings in {DATA_FILE}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
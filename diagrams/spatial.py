@@ -0,0 +1,88 @@
+"""
+A static R-tree of boxes, for finding what is at, or near, a point quickly.
+
+The tree is bulk loaded with Sort-Tile-Recursive packing: the boxes are
+sorted into vertical slices by the x of their centres, each slice is cut into
+nodes by y, and the nodes are packed the same way until one is left. The
+boxes never change after that, which is all the router needs:
+
+    tree = RTree([(0, 0, 1, 1), (2, 0, 3, 1)])
+    tree.at(2.5, 0.5)              # [1]
+    tree.search((0.5, 0, 2.5, 1))  # [0, 1]
+
+Boxes are ``(xmin, ymin, xmax, ymax)``, edges included.
+"""
+import math
+
+# Children per node
+CAPACITY = 8
+
+
+def _intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _union(boxes):
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def _pack(entries, capacity):
+    # One level of STR packing, each entry is (box, child), returns the
+    # (box, children) of the nodes holding them.
+    count = math.ceil(len(entries) / capacity)
+    slices = math.ceil(math.sqrt(count))
+    per_slice = slices * capacity
+    entries = sorted(entries, key=lambda entry: (entry[0][0] + entry[0][2], entry[0][1]))
+    nodes = []
+    for start in range(0, len(entries), per_slice):
+        column = sorted(entries[start:start + per_slice],
+                        key=lambda entry: (entry[0][1] + entry[0][3], entry[0][0]))
+        for offset in range(0, len(column), capacity):
+            children = column[offset:offset + capacity]
+            nodes.append((_union([box for box, _ in children]), children))
+    return nodes
+
+
+class RTree:
+    """
+    The boxes ``boxes`` packed into a tree with ``capacity`` children per
+    node. Searches return the indices of boxes in ``boxes``.
+    """
+    def __init__(self, boxes, capacity=CAPACITY):
+        self.boxes = [tuple(box) for box in boxes]
+        # Every node, the root included, is a list of (box, child). The
+        # children of the nodes ``depth`` levels down are box indices.
+        level = [(box, index) for index, box in enumerate(self.boxes)]
+        depth = 0
+        while len(level) > capacity:
+            level = _pack(level, capacity)
+            depth += 1
+        self.root = level
+        self.depth = depth
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def search(self, box):
+        """
+        The indices of the boxes intersecting ``box``, in index order.
+        """
+        found = []
+        stack = [(self.root, self.depth)]
+        while stack:
+            node, depth = stack.pop()
+            for child_box, child in node:
+                if not _intersects(child_box, box):
+                    continue
+                if depth:
+                    stack.append((child, depth - 1))
+                else:
+                    found.append(child)
+        return sorted(found)
+
+    def at(self, x, y):
+        """
+        The indices of the boxes containing the point ``(x, y)``.
+        """
+        return self.search((x, y, x, y))
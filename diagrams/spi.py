@@ -0,0 +1,275 @@
+"""
+Decode SPI transfers from sampled clock, data and chip select lines.
+
+``decode`` takes the levels of the lines, one sample per row as read by
+``capture.read_chunks``, and finds every sampling edge of the clock for the
+SPI ``mode``, the bits on each data line at those edges and, from the chip
+select, or from pauses in the clock without one, the transactions they belong
+to. Bits are packed into bytes a whole capture at a time with NumPy, with no
+loop over samples or bits, so tens of millions of samples decode in a second.
+
+Mode is ``CPOL * 2 + CPHA`` as in ``clock_polarity.svg`` and
+``low_polarity_cpha0.svg``: the clock idles at CPOL, and data is sampled on
+the first clock edge of each bit when CPHA is 0, on the second when it is 1.
+A three wire bus has one data line carrying both directions, a four wire bus
+two, decoded side by side:
+
+    for transaction in decode_file('spi.csv', 'clk', ('mosi', 'miso'), 'cs', mode=3):
+        print(transaction.data[0].hex(), transaction.data[1].hex())
+
+``timing_diagram`` draws a transaction as a ``logic.TimingDiagram`` with the
+value of each byte written on the data lines. Run directly, this module lists
+the transactions of a capture and can save the diagram of one of them:
+
+    python spi.py spi.csv --data mosi,miso --mode 3 --svg transaction.svg
+"""
+import argparse
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+import capture
+
+
+class Transaction(NamedTuple):
+    """
+    An SPI transaction.
+
+    Attributes:
+        start: Time the chip select was asserted, or of the first sampling
+            edge without a chip select.
+        end: Time the chip select was released, or of the last sampling edge.
+        data: The bytes read from each data line.
+        bits: The number of bits clocked, more than ``8 * len(data[0])`` if
+            the transaction ended part way through a byte.
+    """
+    start: float
+    end: float
+    data: tuple
+    bits: int
+
+
+class Decoded(NamedTuple):
+    """
+    Everything ``decode`` found, as arrays.
+
+    Attributes:
+        starts: Start time of each transaction.
+        ends: End time of each transaction.
+        bits: Number of bits clocked in each transaction.
+        words: The bytes, a row per byte and a column per data line.
+        word_transactions: Index of the transaction of each byte.
+        word_starts: Time of the first sampling edge of each byte.
+        complete: Whether the last transaction ended within the samples.
+        pending: Index of the first sample of the last transaction if it had
+            not ended.
+        gap: The gap which separated transactions, ``None`` with a chip
+            select.
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    bits: np.ndarray
+    words: np.ndarray
+    word_transactions: np.ndarray
+    word_starts: np.ndarray
+    complete: bool
+    pending: int
+    gap: float
+
+    def transactions(self):
+        """
+        The ``Transaction`` of each complete transaction.
+        """
+        count = len(self.starts) - (0 if self.complete else 1)
+        # Row in words of the first byte of each transaction
+        firsts = np.searchsorted(self.word_transactions, np.arange(count + 1))
+        return [Transaction(float(self.starts[index]), float(self.ends[index]),
+                            tuple(self.words[firsts[index]:firsts[index + 1], line].tobytes()
+                                  for line in range(self.words.shape[1])),
+                            int(self.bits[index]))
+                for index in range(count)]
+
+
+def sampling_level(mode):
+    """
+    The clock level right after the edges data is sampled on in ``mode``.
+    """
+    cpol, cpha = divmod(mode, 2)
+    # Mode 0 and 3 sample on the rising edge, 1 and 2 on the falling edge
+    return 1 if cpol == cpha else 0
+
+
+def decode(times, clk, data, cs=None, mode=0, cs_active=0, lsb_first=False, gap=None):
+    """
+    Decode the samples taken at ``times`` of the clock ``clk``, the data lines
+    ``data``, an array with a column per line, and the chip select ``cs``.
+
+    Without a chip select, transactions are separated by ``gap`` seconds
+    without a sampling edge, by default eight times the typical bit period.
+    """
+    times = np.asarray(times, dtype=float)
+    clk = np.asarray(clk)
+    data = np.asarray(data, dtype=np.uint8).reshape(len(times), -1)
+    level = sampling_level(mode)
+    edges = np.flatnonzero((clk[1:] == level) & (clk[:-1] != level)) + 1
+
+    if cs is not None:
+        active = np.asarray(cs) == cs_active
+        edges = edges[active[edges]]
+        asserted = np.flatnonzero(active[1:] & ~active[:-1]) + 1
+        if len(active) and active[0]:
+            asserted = np.concatenate(([0], asserted))
+        released = np.flatnonzero(~active[1:] & active[:-1]) + 1
+        complete = len(released) == len(asserted)
+        ids = np.searchsorted(asserted, edges, 'right') - 1
+        # Transactions without a sampling edge are glitches on the chip
+        # select, unless the last one is still to be clocked
+        clocked = np.bincount(ids, minlength=len(asserted)) > 0
+        if not complete:
+            clocked[-1] = True
+        ids = (np.cumsum(clocked) - 1)[ids]
+        starts = times[asserted[clocked]]
+        ends = np.append(times[released], times[-1:])[:len(asserted)][clocked]
+        # The sample before the assertion, so it is seen again
+        pending = None if complete else max(int(asserted[-1]) - 1, 0)
+    else:
+        intervals = np.diff(times[edges])
+        if gap is None:
+            gap = 8 * float(np.median(intervals)) if len(intervals) else np.inf
+        breaks = np.flatnonzero(intervals > gap) + 1
+        ids = np.zeros(len(edges), dtype=np.intp)
+        ids[breaks] = 1
+        ids = np.cumsum(ids)
+        starts = times[edges[np.concatenate(([0], breaks))]] if len(edges) else times[:0]
+        ends = times[edges[np.concatenate((breaks - 1, [-1]))]] if len(edges) else times[:0]
+        complete = not len(edges) or times[-1] - ends[-1] > gap
+        # The sample before the first edge of the last transaction
+        pending = None if complete else int(edges[breaks[-1] if len(breaks) else 0]) - 1
+
+    bits = np.bincount(ids, minlength=len(starts))
+    # Position of each bit in its transaction, and whether its byte is whole
+    offsets = np.concatenate(([0], np.cumsum(bits)[:-1]))
+    positions = np.arange(len(edges)) - offsets[ids]
+    whole = positions < (bits // 8 * 8)[ids]
+    sampled = edges[whole]
+    words = np.packbits(data[sampled].reshape(-1, 8, data.shape[1]), axis=1,
+                        bitorder='little' if lsb_first else 'big').reshape(-1, data.shape[1])
+    return Decoded(starts, ends, bits, words, ids[whole][::8], times[sampled][::8],
+                   complete, pending, gap)
+
+
+def decode_file(path, clk='clk', data=('data',), cs='cs', mode=0, cs_active=0,
+                lsb_first=False, gap=None, chunk_rows=capture.CHUNK_ROWS):
+    """
+    Yield the ``Transaction``\\s of the capture at ``path``, with the clock,
+    data and chip select lines given by channel name. ``cs`` may be
+    ``None``, see ``decode``. The capture is read in chunks, holding on only
+    to the samples of a transaction which had not ended by the end of a chunk.
+    """
+    names, chunks = capture.read_chunks(path, chunk_rows)
+    columns = [names.index(clk), *(names.index(line) for line in data)]
+    if cs is not None:
+        columns.append(names.index(cs))
+    carried = None
+    for times, levels in chunks:
+        levels = levels[:, columns]
+        if carried is not None:
+            times = np.concatenate((carried[0], times))
+            levels = np.concatenate((carried[1], levels))
+        decoded = decode(times, levels[:, 0], levels[:, 1:len(data) + 1],
+                         levels[:, -1] if cs is not None else None,
+                         mode, cs_active, lsb_first, gap)
+        if np.isfinite(decoded.gap or np.inf):
+            # Keep the first estimate so transactions split the same way in
+            # every chunk
+            gap = decoded.gap
+        yield from decoded.transactions()
+        if decoded.complete:
+            # Keep the last sample, the edges right after it depend on it
+            carried = times[-1:], levels[-1:]
+        else:
+            carried = times[decoded.pending:], levels[decoded.pending:]
+    if carried is not None and len(carried[0]) > 1:
+        decoded = decode(carried[0], carried[1][:, 0], carried[1][:, 1:len(data) + 1],
+                         carried[1][:, -1] if cs is not None else None,
+                         mode, cs_active, lsb_first, gap)
+        yield from decoded._replace(complete=True).transactions()
+
+
+def timing_diagram(transaction, mode=0, names=('data',), cs='cs', cs_active=0,
+                   max_bytes=None, **kwargs):
+    """
+    A ``logic.TimingDiagram`` of ``transaction``, with the data lines called
+    ``names`` and a chip select called ``cs`` unless it is ``None``. Only the
+    first ``max_bytes`` bytes are drawn if given. Other keyword arguments go
+    to ``TimingDiagram``.
+    """
+    from schemdraw import logic
+
+    data = [line[:max_bytes] for line in transaction.data]
+    bits = transaction.bits if max_bytes is None else min(transaction.bits,
+                                                          8 * len(data[0]))
+    cpol, cpha = divmod(mode, 2)
+    # A clock followed by 0 or 1 is drawn with a spike at the last edge
+    clock = {'name': 'clk', 'wave': str(cpol) + 'pn'[cpol] + '.' * (bits - 1) + 'lh'[cpol]}
+    # Bits change half a clock before their first edge with CPHA 0, and on
+    # it with CPHA 1
+    phase = 0.5 if cpha == 0 else 0
+    signals = [clock]
+    for name, line in zip(names, data):
+        wave = 'x' + '=.......' * len(line) + 'x' * (bits - 8 * len(line) + 1)
+        signals.append({'name': name, 'wave': wave, 'phase': phase,
+                        'data': [f'{byte:02x}' for byte in line]})
+    if cs is not None:
+        inactive = str(1 - cs_active)
+        signals.append({'name': cs, 'wave': inactive + str(cs_active) + '.' * bits + inactive,
+                        'phase': 0.5})
+    return logic.TimingDiagram({'signal': signals}, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help='CSV file exported by a logic analyzer')
+    parser.add_argument('--clk', default='clk', help='clock channel, defaults to clk')
+    parser.add_argument('--data', default='data',
+                        help='comma separated data channels, defaults to data')
+    parser.add_argument('--cs', default='cs',
+                        help='chip select channel, defaults to cs, empty for none')
+    parser.add_argument('--cs-high', action='store_true', help='the chip select is active high')
+    parser.add_argument('-m', '--mode', type=int, choices=range(4), default=0,
+                        help='SPI mode, defaults to 0')
+    parser.add_argument('--lsb-first', action='store_true', help='bytes are sent LSB first')
+    parser.add_argument('--gap', type=float,
+                        help='seconds without a clock edge ending a transaction without '
+                             'a chip select')
+    parser.add_argument('--svg', help='save the diagram of a transaction to this file')
+    parser.add_argument('-t', '--transaction', type=int, default=0,
+                        help='index of the transaction drawn with --svg, defaults to 0')
+    args = parser.parse_args(argv)
+
+    data = args.data.split(',')
+    cs = args.cs or None
+    cs_active = 1 if args.cs_high else 0
+    drawn = None
+    for index, transaction in enumerate(decode_file(args.capture, args.clk, data, cs,
+                                                    args.mode, cs_active, args.lsb_first,
+                                                    args.gap)):
+        print(f'{index:5} {transaction.start:12.9f} {transaction.end:12.9f}  '
+              + '  '.join(line.hex(' ') for line in transaction.data))
+        if index == args.transaction:
+            drawn = transaction
+
+    if args.svg:
+        if drawn is None:
+            parser.error(f'the capture has no transaction {args.transaction}')
+        import schemdraw
+        import svgopt
+        with schemdraw.Drawing(show=False, file=args.svg) as d:
+            d += timing_diagram(drawn, args.mode, data, cs, cs_active)
+        svgopt.optimize_file(args.svg)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Shared ``<symbol>`` sprites for the parts repeated across drawings.
+
+Most of the breadboard drawings carry the same breadboard and the same
+Fritzing boards, each copy adding hundreds of kilobytes to its SVG. With
+sprites enabled, ``sprite`` replaces the geometry of such an element with a
+single ``<use>`` of a ``<symbol>`` in a shared sprite sheet, so the geometry is
+downloaded once per site visit instead of once per image:
+
+    configure(enabled=True)
+    d += sprite(pictorial.Breadboard(), 'breadboard')
+
+Symbols are named after the element and the hash of their content, so
+variants such as a flipped or recoloured part get their own symbol. Each
+process collects the symbols it drew, see ``take``, and ``update_sheet``
+writes them to the sheet.
+
+Browsers do not load external resources for an SVG shown with ``<img>``, so
+sprites are only for SVGs embedded with ``<object>`` or inline.
+"""
+import hashlib
+import math
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from schemdraw.backends.svg import Figure
+from schemdraw.segments import BBox
+from schemdraw.transform import Transform
+
+DIAGRAMS_DIR = Path(__file__).resolve().parent
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+
+class Config:
+    """
+    Whether, and from where, elements are drawn as sprites.
+
+    Attributes:
+        enabled: Replace elements passed to ``sprite`` with a ``<use>``.
+        sheet: The sprite sheet file.
+        href: URL the sprite sheet is referenced under.
+    """
+    enabled = False
+    sheet = DIAGRAMS_DIR.parent / 'assets' / 'sprites.svg'
+    href = '/assets/sprites.svg'
+
+
+config = Config()
+
+
+def configure(enabled=None, sheet=None, href=None):
+    """
+    Set how sprites are drawn, see ``Config``.
+    """
+    if enabled is not None:
+        config.enabled = enabled
+    if sheet is not None:
+        config.sheet = Path(sheet)
+    if href is not None:
+        config.href = href
+
+
+# Symbols drawn by this process which have not been handed out by ``take``,
+# by id.
+_pending = {}
+_drawn = set()
+
+
+def _symbol(name, segments, scale, style):
+    # Draw the segments untransformed on a scratch figure, the <use> places
+    # them.
+    fig = Figure(BBox(0, 0, 1, 1), inches_per_unit=scale / 72)
+    for segment in segments:
+        segment.draw(fig, Transform(0, (0, 0)), **style)
+    elements = sorted(fig.svgelements, key=lambda item: item[0])
+    zorder = elements[0][0] if elements else 1
+
+    symbol = ET.Element('symbol')
+    symbol.set('overflow', 'visible')
+    for _, element in elements:
+        symbol.append(element)
+    content = ET.tostring(symbol, encoding='unicode')
+    symbol_id = f'{name}-{hashlib.sha256(content.encode()).hexdigest()[:8]}'
+    symbol.set('id', symbol_id)
+    if symbol_id not in _drawn:
+        _drawn.add(symbol_id)
+        _pending[symbol_id] = ET.tostring(symbol, encoding='unicode')
+    return symbol_id, zorder
+
+
+def _svg_transform(transform, scale):
+    # schemdraw flips the y axis when converting to SVG coordinates, which
+    # turns its counterclockwise rotation clockwise.
+    parts = []
+    x, y = transform.shift
+    if x or y:
+        parts.append(f'translate({x * scale} {-y * scale})')
+    if transform.theta:
+        parts.append(f'rotate({-transform.theta})')
+    zoom_x, zoom_y = transform.zoom
+    if (zoom_x, zoom_y) != (1, 1):
+        parts.append(f'scale({zoom_x} {zoom_y})')
+    x, y = transform.localshift
+    if x or y:
+        parts.append(f'translate({x * scale} {-y * scale})')
+    return ' '.join(parts)
+
+
+class SegmentSprite:
+    """
+    Stands in for the ``segments`` of an element, drawing them as a ``<use>``
+    of a symbol on SVG figures and as they are on anything else.
+    """
+    def __init__(self, name, segments):
+        self.name = name
+        self.segments = segments
+
+    def xform(self, transform, **style):
+        return SegmentSprite(self.name, [segment.xform(transform, **style)
+                                         for segment in self.segments])
+
+    def get_bbox(self):
+        xmin = ymin = math.inf
+        xmax = ymax = -math.inf
+        for segment in self.segments:
+            bbox = segment.get_bbox()
+            xmin = min(xmin, bbox.xmin)
+            ymin = min(ymin, bbox.ymin)
+            xmax = max(xmax, bbox.xmax)
+            ymax = max(ymax, bbox.ymax)
+        return BBox(xmin, ymin, xmax, ymax)
+
+    def doflip(self):
+        for segment in self.segments:
+            segment.doflip()
+
+    def doreverse(self, centerx):
+        for segment in self.segments:
+            segment.doreverse(centerx)
+
+    def draw(self, fig, transform, **style):
+        if not hasattr(fig, 'svgelements'):
+            for segment in self.segments:
+                segment.draw(fig, transform, **style)
+            return
+
+        symbol_id, zorder = _symbol(self.name, self.segments, fig.scale, style)
+        use = ET.Element('use')
+        use.set('xlink:href', f'{config.href}#{symbol_id}')
+        fig._need_xlink = True
+        xform = _svg_transform(transform, fig.scale)
+        if xform:
+            use.set('transform', xform)
+        fig.svgelements.append((zorder, use))
+
+
+def sprite(element, name):
+    """
+    Draw the current segments of ``element`` as the symbol ``name`` when
+    sprites are enabled. Returns ``element``.
+    """
+    if config.enabled and element.segments:
+        element.segments = [SegmentSprite(name, element.segments)]
+    return element
+
+
+def take():
+    """
+    The ``{id: markup}`` of the symbols drawn since the last call.
+    """
+    symbols = dict(_pending)
+    _pending.clear()
+    return symbols
+
+
+def update_sheet(symbols, path=None):
+    """
+    Add ``symbols``, as returned by ``take``, to the sprite sheet at ``path``,
+    keeping the symbols already in it.
+    """
+    path = Path(path or config.sheet)
+    sheet = {}
+    if path.exists():
+        for element in ET.parse(path).getroot():
+            sheet[element.get('id')] = element
+    for symbol_id, markup in symbols.items():
+        # schemdraw writes xlink:href without declaring the prefix
+        sheet[symbol_id] = ET.fromstring(
+            f'<svg xmlns="{SVG_NS}" xmlns:xlink="{XLINK_NS}">{markup}</svg>')[0]
+
+    root = ET.Element(f'{{{SVG_NS}}}svg')
+    for symbol_id in sorted(sheet):
+        root.append(sheet[symbol_id])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(ET.tostring(root, encoding='utf-8'))
@@ -0,0 +1,532 @@
+"""
+Shrink the SVG files written by schemdraw.
+
+schemdraw writes every coordinate at full float precision and repeats the
+whole style of each element on the element, and the Fritzing parts it embeds
+bring their editor metadata along. ``optimize`` rewrites an SVG without
+changing how it looks:
+
+* numbers in coordinates are rounded to ``precision`` significant digits
+* identical styles are written once, as classes in a ``<style>`` element
+* groups without attributes are unwrapped, transforms of groups with a single
+  child are moved to the child and empty groups are dropped
+* metadata, editor attributes and whitespace between elements are removed
+
+The result only depends on what is drawn, so the same drawing is always
+written byte for byte the same:
+
+* the clip paths and gradients schemdraw numbers per process are named after
+  a hash of their content, identical ones are written once
+* numbers in styles are written like those in coordinates, ``2`` not ``2.0``
+* attributes are sorted by name
+
+It can also be run on existing files:
+
+    python svgopt.py ../assets/*.svg
+"""
+import argparse
+import hashlib
+import re
+import sys
+from collections import Counter
+from io import StringIO
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+# Default number of significant digits kept in coordinates. The drawings are
+# at 36 units per inch so this is well below a pixel on any screen.
+PRECISION = 5
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Attributes which only hold numbers, lengths or transforms.
+_NUMERIC_ATTRIBUTES = {
+    'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry', 'dx', 'dy',
+    'fx', 'fy', 'width', 'height', 'points', 'viewBox', 'transform',
+    'gradientTransform', 'patternTransform', 'offset', 'stroke-width',
+}
+
+# Presentation attributes which mean the same written as CSS, so they can be
+# merged into classes along with the style attribute.
+_PRESENTATION_ATTRIBUTES = (
+    'fill', 'fill-opacity', 'stroke', 'stroke-width', 'stroke-opacity',
+    'stroke-dasharray', 'stroke-linecap', 'stroke-linejoin', 'opacity',
+    'font-family', 'font-size', 'font-weight', 'text-anchor', 'dominant-baseline',
+)
+
+# Numeric attributes which are not coordinates, scales and fractions, which
+# are always rounded to significant digits.
+_RELATIVE_ATTRIBUTES = {'transform', 'gradientTransform', 'patternTransform', 'offset'}
+
+_ABSOLUTE_UNIT = re.compile(r'\d(?:in|cm|mm|pt|pc)\b')
+
+# CSS properties which only hold numbers or lengths.
+_NUMERIC_PROPERTIES = {
+    'stroke-width', 'stroke-dasharray', 'stroke-dashoffset', 'stroke-miterlimit',
+    'stroke-opacity', 'fill-opacity', 'opacity', 'font-size',
+}
+
+# Ids schemdraw numbers in the order it draws, ``clip3``, ``grad0``.
+_GENERATED_ID = re.compile(r'(clip|grad)\d+')
+_REFERENCE = re.compile(r'#([^\s)"\']+)')
+
+# Elements which are only drawn where they are referenced, whatever their
+# display.
+_DEFINITION_TAGS = {
+    'defs', 'symbol', 'clipPath', 'mask', 'marker', 'pattern', 'filter',
+    'linearGradient', 'radialGradient',
+}
+_HIDDEN = re.compile(r'(?:^|;)\s*display\s*:\s*none\s*(?:;|$)')
+
+# Attributes only meaningful to the editors the parts were drawn with.
+_EDITOR_ATTRIBUTES = {'gorn', 'enable-background'}
+_METADATA_TAGS = {'metadata', 'desc', 'referenceFile'}
+_TEXT_TAGS = {'text', 'tspan', 'textPath', 'style', 'title'}
+# Elements a group's transform can be moved on to.
+_TRANSFORMABLE_TAGS = {
+    'g', 'path', 'rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon',
+    'text', 'image', 'use',
+}
+
+
+def _local(name):
+    return name.rpartition('}')[2]
+
+
+def _namespace(name):
+    return name[1:].partition('}')[0] if name.startswith('{') else ''
+
+
+def format_number(value, precision=PRECISION, decimals=None):
+    """
+    ``value`` rounded to ``precision`` significant digits, or to ``decimals``
+    places if given, written as short as possible.
+    """
+    if decimals is not None:
+        text = f'{value:.{decimals}f}'
+        if '.' in text:
+            text = text.rstrip('0').rstrip('.')
+    else:
+        text = f'{value:.{precision}g}'
+    if 'e' in text:
+        mantissa, _, exponent = text.partition('e')
+        text = f'{mantissa}e{int(exponent)}'
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    return '0' if text == '-0' else text
+
+
+def _join(tokens):
+    # Numbers only need a separator when the next one would otherwise read as
+    # part of the previous one.
+    out = []
+    previous = None
+    for token in tokens:
+        if previous is not None and not token[0].isalpha() and not previous[-1].isalpha():
+            if not (token[0] == '-' or (token[0] == '.' and '.' in previous
+                                        and 'e' not in previous)):
+                out.append(' ')
+        out.append(token)
+        previous = token
+    return ''.join(out)
+
+
+def _parse_path(d):
+    # [command, [number, ...]] of each command in the path data ``d``, or
+    # None if it can not be parsed.
+    commands = []
+    pos = 0
+    while pos < len(d):
+        char = d[pos]
+        if char in ' \t\r\n,':
+            pos += 1
+        elif char.isalpha():
+            commands.append([char, []])
+            pos += 1
+        elif not commands:
+            return None
+        elif commands[-1][0] in ('A', 'a') and len(commands[-1][1]) % 7 in (3, 4):
+            # Arc flags are single digits which need not be separated
+            if char not in '01':
+                return None
+            commands[-1][1].append(float(char))
+            pos += 1
+        else:
+            match = _NUMBER.match(d, pos)
+            if match is None:
+                return None
+            commands[-1][1].append(float(match.group()))
+            pos = match.end()
+    return commands
+
+
+# The axis of each argument of the path commands, None for those which are
+# not coordinates.
+_PATH_AXES = {
+    'm': (0, 1), 'l': (0, 1), 't': (0, 1), 'h': (0,), 'v': (1,),
+    'c': (0, 1) * 3, 's': (0, 1) * 2, 'q': (0, 1) * 2,
+    'a': (None,) * 5 + (0, 1), 'z': (),
+}
+
+
+def _carry_errors(commands, decimals):
+    # Rounding each relative coordinate on its own lets the errors add up
+    # along a path, so round where it should end up from where the rounded
+    # path actually is.
+    rounded = []
+    exact = [0.0, 0.0]
+    drawn = [0.0, 0.0]
+    start = (exact[:], drawn[:])
+    for command, args in commands:
+        axes = _PATH_AXES.get(command.lower())
+        if axes is None or (axes and (not args or len(args) % len(axes))) or \
+                (not axes and args):
+            return None
+        relative = command.islower()
+        values = []
+        for offset in range(0, max(len(args), 1), max(len(axes), 1)):
+            end = {}
+            for axis, value in zip(axes, args[offset:offset + len(axes)]):
+                if axis is None:
+                    values.append(format_number(value, decimals=decimals))
+                    continue
+                if relative:
+                    text = format_number(exact[axis] + value - drawn[axis], decimals=decimals)
+                    end[axis] = (exact[axis] + value, drawn[axis] + float(text))
+                else:
+                    text = format_number(value, decimals=decimals)
+                    end[axis] = (value, float(text))
+                values.append(text)
+            for axis, (exact_end, drawn_end) in end.items():
+                exact[axis], drawn[axis] = exact_end, drawn_end
+            if command in 'Mm' and offset == 0:
+                start = (exact[:], drawn[:])
+            elif command in 'Zz':
+                exact, drawn = start[0][:], start[1][:]
+        rounded.append([command, values])
+    return rounded
+
+
+def round_path(d, precision=PRECISION, decimals=None):
+    """
+    The path data ``d`` with its numbers rounded, see ``format_number``.
+    Relative coordinates rounded to ``decimals`` places are corrected for the
+    rounding of the ones before them, so long paths do not drift. Returns
+    ``d`` unchanged if it can not be parsed.
+    """
+    commands = _parse_path(d)
+    if commands is None:
+        return d
+    rounded = _carry_errors(commands, decimals) if decimals is not None else None
+    if rounded is None:
+        rounded = [[command, [format_number(value, precision, decimals) for value in args]]
+                   for command, args in commands]
+    return _join([token for command, values in rounded for token in [command, *values]])
+
+
+def round_numbers(value, precision=PRECISION, decimals=None):
+    """
+    The attribute ``value`` with the numbers in it rounded, see
+    ``format_number``, leaving units and separators alone.
+    """
+    def replace(match):
+        number = format_number(float(match.group()), precision, decimals)
+        start = match.start()
+        if start and value[start - 1] in '0123456789.' and number[0] != '-':
+            number = ' ' + number
+        return number
+    return _NUMBER.sub(replace, value)
+
+
+def _strip(element):
+    for child in list(element):
+        tag = _local(child.tag) if isinstance(child.tag, str) else None
+        if tag is None or tag in _METADATA_TAGS or _namespace(child.tag) not in ('', SVG_NS):
+            _remove(element, child)
+            continue
+        _strip(child)
+
+    for name in list(element.attrib):
+        namespace = _namespace(name)
+        if (_local(name) in _EDITOR_ATTRIBUTES and not namespace) or \
+                namespace not in ('', XLINK_NS, XML_NS):
+            del element.attrib[name]
+
+    if _local(element.tag) not in _TEXT_TAGS:
+        # Whitespace between elements is not drawn
+        if element.text is not None and not element.text.strip():
+            element.text = None
+        for child in element:
+            if child.tail is not None and not child.tail.strip():
+                child.tail = None
+
+
+def _remove(parent, child):
+    # Keep any text which followed the removed element
+    if child.tail and child.tail.strip():
+        index = list(parent).index(child)
+        if index:
+            previous = parent[index - 1]
+            previous.tail = (previous.tail or '') + child.tail
+        else:
+            parent.text = (parent.text or '') + child.tail
+    parent.remove(child)
+
+
+def _round(root, precision, decimals=None):
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            local = _local(name)
+            if local == 'd':
+                element.set(name, round_path(value, precision, decimals))
+            elif local in _RELATIVE_ATTRIBUTES:
+                element.set(name, round_numbers(value, precision))
+            elif local in _NUMERIC_ATTRIBUTES:
+                # Lengths in absolute units are scaled by the viewBox
+                places = None if _ABSOLUTE_UNIT.search(value) else decimals
+                element.set(name, round_numbers(value, precision, places))
+            elif local == 'style':
+                element.set(name, _round_style(value, precision))
+            elif local == 'href' and value.startswith('data:'):
+                # schemdraw wraps base64 at 76 characters, which is then
+                # escaped to &#10; in the attribute
+                element.set(name, ''.join(value.split()))
+
+
+def _round_style(style, precision):
+    declarations = []
+    for declaration in style.split(';'):
+        name, colon, value = declaration.partition(':')
+        if name.strip() in _NUMERIC_PROPERTIES:
+            value = round_numbers(value, precision)
+        declarations.append(name + colon + value)
+    return ';'.join(declarations)
+
+
+def _stable_ids(root):
+    # Name generated ids after what they identify, so they do not depend on
+    # what else the process drew before, and drop identical definitions.
+    renamed = {}
+    parents = {child: parent for parent in root.iter() for child in parent}
+    for element in list(root.iter()):
+        old = element.get('id')
+        if old is None or not _GENERATED_ID.fullmatch(old):
+            continue
+        del element.attrib['id']
+        digest = hashlib.sha1(ET.tostring(element)).hexdigest()[:8]
+        new = f'{_GENERATED_ID.match(old).group(1)}-{digest}'
+        if new in renamed.values():
+            _remove(parents[element], element)
+        else:
+            element.set('id', new)
+        renamed[old] = new
+    if not renamed:
+        return
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if '#' in value:
+                element.set(name, _REFERENCE.sub(
+                    lambda match: '#' + renamed.get(match.group(1), match.group(1)), value))
+
+
+def _sort_attributes(root):
+    for element in root.iter():
+        if len(element.attrib) > 1:
+            element.attrib = dict(sorted(element.attrib.items()))
+
+
+def _drop_hidden(element):
+    for child in list(element):
+        if _local(child.tag) in _DEFINITION_TAGS:
+            continue
+        if child.get('display') == 'none' or _HIDDEN.search(child.get('style', '')):
+            _remove(element, child)
+        else:
+            _drop_hidden(child)
+
+
+def _drop_unused_ids(root):
+    elements = list(root.iter())
+    if any(_local(element.tag) == 'style' for element in elements):
+        # Selectors may use them
+        return
+    used = {match for element in elements for value in element.attrib.values()
+            for match in _REFERENCE.findall(value)}
+    for element in elements:
+        if element.get('id') not in used:
+            element.attrib.pop('id', None)
+
+
+def _collapse(element):
+    for child in list(element):
+        _collapse(child)
+
+    children = list(element)
+    for index, child in reversed(list(enumerate(children))):
+        if _local(child.tag) != 'g' or child.text or child.tail:
+            continue
+        grandchildren = list(child)
+        if not grandchildren and not child.get('id'):
+            element.remove(child)
+        elif not child.attrib:
+            element.remove(child)
+            for offset, grandchild in enumerate(grandchildren):
+                element.insert(index + offset, grandchild)
+        elif (set(child.attrib) == {'transform'} and len(grandchildren) == 1
+              and _local(grandchildren[0].tag) in _TRANSFORMABLE_TAGS
+              and 'transform' not in grandchildren[0].attrib
+              and not grandchildren[0].tail):
+            grandchild = grandchildren[0]
+            grandchild.set('transform', child.get('transform'))
+            element.remove(child)
+            element.insert(index, grandchild)
+
+
+def _declarations(element):
+    declarations = {}
+    for name in _PRESENTATION_ATTRIBUTES:
+        value = element.get(name)
+        if value is None:
+            continue
+        if name == 'font-size' and _NUMBER.fullmatch(value):
+            # Unitless font sizes are only valid as an attribute
+            value += 'px'
+        declarations[name] = value
+    for declaration in element.get('style', '').split(';'):
+        name, _, value = declaration.partition(':')
+        if name.strip() and value.strip():
+            declarations[name.strip()] = value.strip()
+    return ';'.join(f'{name}:{value}' for name, value in declarations.items())
+
+
+def _class_names(taken):
+    index = 0
+    while True:
+        name, number = '', index
+        while True:
+            name = 'abcdefghijklmnopqrstuvwxyz'[number % 26] + name
+            number = number // 26 - 1
+            if number < 0:
+                break
+        index += 1
+        if name not in taken:
+            yield name
+
+
+def _merge_styles(root):
+    elements = list(root.iter())
+    if any(_local(element.tag) == 'style' for element in elements):
+        # Leave documents which already have a style sheet alone, classes
+        # could change which of its rules win.
+        return
+    styled = [(element, _declarations(element)) for element in elements
+              if 'class' not in element.attrib]
+    counts = Counter(style for _, style in styled if style)
+    shared = [style for style, count in counts.most_common() if count > 1]
+    if not shared:
+        return
+
+    taken = {name for element in elements for name in element.get('class', '').split()}
+    classes = dict(zip(shared, _class_names(taken)))
+    for element, style in styled:
+        if style in classes:
+            for name in _PRESENTATION_ATTRIBUTES + ('style',):
+                element.attrib.pop(name, None)
+            element.set('class', classes[style])
+
+    sheet = ET.Element(f'{{{SVG_NS}}}style')
+    sheet.text = ''.join(f'.{name}{{{style}}}' for style, name in classes.items())
+    root.insert(0, sheet)
+
+
+def _parse(svg):
+    namespaces = {}
+    for _, (prefix, uri) in ET.iterparse(StringIO(svg), events=('start-ns',)):
+        namespaces.setdefault(uri, prefix)
+    for uri, prefix in namespaces.items():
+        # ElementTree names unregistered namespaces ns0, ns1, ...
+        if prefix and uri not in (SVG_NS, XML_NS) and not re.fullmatch(r'ns\d+', prefix):
+            ET.register_namespace(prefix, uri)
+    ET.register_namespace('', SVG_NS)
+    ET.register_namespace('xlink', XLINK_NS)
+    return ET.fromstring(svg)
+
+
+def optimize(svg, precision=PRECISION, classes=True):
+    """
+    The optimized version of the SVG document ``svg``. Styles are only merged
+    into classes if ``classes`` is true.
+    """
+    root = _parse(svg)
+    _strip(root)
+    _round(root, precision)
+    _collapse(root)
+    if classes:
+        _merge_styles(root)
+    _stable_ids(root)
+    _sort_attributes(root)
+    return ET.tostring(root, encoding='unicode')
+
+
+def slim(svg, decimals):
+    """
+    The SVG document ``svg``, a part embedded in drawings, with only what is
+    drawn: besides what ``optimize`` strips, hidden elements and ids nothing
+    references are dropped, and coordinates are rounded to ``decimals``
+    places. Styles are left alone, ``optimize`` merges them for the whole
+    drawing.
+    """
+    root = _parse(svg)
+    _strip(root)
+    _drop_hidden(root)
+    _drop_unused_ids(root)
+    _round(root, PRECISION, decimals)
+    _collapse(root)
+    return ET.tostring(root, encoding='unicode')
+
+
+def optimize_file(path, precision=PRECISION, classes=True):
+    """
+    Optimize the SVG file at ``path`` in place, returning its size in bytes
+    before and after.
+    """
+    path = Path(path)
+    before = path.read_bytes()
+    after = optimize(before.decode('utf-8'), precision, classes).encode('utf-8')
+    path.write_bytes(after)
+    return len(before), len(after)
+
+
+def describe(before, after):
+    """
+    A short description of the size change from ``before`` to ``after`` bytes.
+    """
+    saved = 1 - after / before if before else 0
+    return f'{before / 1024:7.1f} kB -> {after / 1024:7.1f} kB ({saved:4.0%} smaller)'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='+', type=Path, metavar='SVG')
+    parser.add_argument('-p', '--precision', type=int, default=PRECISION,
+                        help=f'significant digits to keep, defaults to {PRECISION}')
+    args = parser.parse_args(argv)
+    total_before = total_after = 0
+    for path in args.files:
+        before, after = optimize_file(path, args.precision)
+        total_before += before
+        total_after += after
+        print(f'{describe(before, after)}  {path}')
+    if len(args.files) > 1:
+        print(f'{describe(total_before, total_after)}  total')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,8 @@
-import schemdraw
 import schemdraw.elements as elm
+from registry import drawing, render_all
 
-with schemdraw.Drawing(show=False, file='../assets/switched_light.svg') as d:
+@drawing('../assets/switched_light.svg')
+def switched_light(d):
     # Note: reversing battery to have + at top
     battery = elm.Battery().reverse().up().label(['$-$ ', 'Battery', ' +'])
     elm.Line().right(d.unit*.75)
@@ -11,7 +12,8 @@ with schemdraw.Drawing(show=False, file='../assets/switched_light.svg') as d:
     elm.Line().left(d.unit*.75).to(battery.start)
 
 
-with schemdraw.Drawing(show=False, file='../assets/closed_switched_light.svg') as d:
+@drawing('../assets/closed_switched_light.svg')
+def closed_switched_light(d):
     # Note: reversing battery to have + at top
     battery = elm.Battery().reverse().up().label(['$-$ ', 'Battery', ' +'])
     elm.Line().right(d.unit*.75)
@@ -19,3 +21,7 @@ with schemdraw.Drawing(show=False, file='../assets/closed_switched_light.svg') a
     elm.Line().right(d.unit*.75)
     d += elm.Lamp(filament_color='gold').down().label('Light')
     elm.Line().left(d.unit*.75).to(battery.start)
+
+
+if __name__ == '__main__':
+    render_all(__name__)
@@ -0,0 +1,81 @@
+"""
+Captures convert to the same wavejson however they are cut into chunks, and
+whether they hold a row per sample or a row per change.
+"""
+import pytest
+
+pytest.importorskip('numpy')
+
+from capture import to_wavejson, window
+
+CHUNKS = [37, 1000, 1 << 18]
+
+# Samples of the capture, a row a millisecond
+SAMPLES = 200
+
+
+def _levels(index):
+    # a toggles every 10 samples, b every 20
+    return (index // 10) % 2, (index // 20) % 2
+
+
+def _write(path, rows, header=True):
+    with open(path, 'w') as f:
+        f.write('# exported by a logic analyzer\n')
+        if header:
+            f.write('Time [s], a, b\n')
+        for time, a, b in rows:
+            f.write(f'{time},{a},{b}\n')
+    return path
+
+
+@pytest.fixture
+def samples(tmp_path):
+    return _write(tmp_path / 'samples.csv',
+                  [(index / 1000, *_levels(index)) for index in range(SAMPLES)])
+
+
+@pytest.fixture
+def changes(tmp_path):
+    return _write(tmp_path / 'changes.csv',
+                  [(index / 1000, *_levels(index)) for index in range(SAMPLES)
+                   if index == 0 or _levels(index) != _levels(index - 1)], header=False)
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_whole_capture(samples, chunk_rows):
+    assert to_wavejson(samples, chunk_rows=chunk_rows) == {'signal': [
+        {'name': 'a', 'wave': '01' * 10},
+        {'name': 'b', 'wave': '0.1.' * 5},
+    ]}
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_window(samples, chunk_rows):
+    expected = to_wavejson(samples, 0.005, 0.0325, 0.1325, ['b'])
+    # b is 1 until 0.04 and then toggles every 4 characters
+    assert expected == {'signal': [{'name': 'b', 'wave': '10...1...0...1...0..'}]}
+    assert to_wavejson(samples, 0.005, 0.0325, 0.1325, ['b'], chunk_rows) == expected
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_row_per_change(samples, changes, chunk_rows):
+    # Without a header the channels are numbered
+    converted = to_wavejson(changes, chunk_rows=chunk_rows, end=0.199)
+    assert [signal['name'] for signal in converted['signal']] == ['ch0', 'ch1']
+    assert [signal['wave'] for signal in converted['signal']] == \
+        [signal['wave'] for signal in to_wavejson(samples)['signal']]
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_window_keeps_changes(samples, chunk_rows):
+    captured = window(samples, 0.045, 0.105, chunk_rows=chunk_rows)
+    # The row in effect at the start, then the changes inside the window
+    assert captured.times.tolist() == [0.04, 0.05, 0.06, 0.07, 0.08, 0.09, 0.1]
+    assert captured.levels.tolist() == [[0, 0], [1, 0], [0, 1], [1, 1], [0, 0], [1, 0], [0, 1]]
+    assert captured.edges().tolist() == [0.05, 0.06, 0.07, 0.08, 0.09, 0.1]
+
+
+def test_empty_window(samples):
+    with pytest.raises(ValueError):
+        to_wavejson(samples, start=0.1, end=0.1)
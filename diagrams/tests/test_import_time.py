@@ -0,0 +1,67 @@
+"""
+Drawing modules import quickly, and their schematics render without the
+pictorial parts or the timing diagrams.
+"""
+import re
+import subprocess
+import sys
+
+import pytest
+
+from build import DIAGRAMS_DIR, find_drawings
+
+# Milliseconds a drawing module may take to import on top of schemdraw.
+BUDGET_MS = 25
+
+# Modules only the breadboard views and timing diagrams need.
+HEAVY = ('schemdraw.pictorial', 'schemdraw.logic', 'importlib.metadata', 'parts')
+
+RUNS = 3
+
+# Drawings made only of schematic symbols.
+SCHEMATICS = ('esp32_pmw3320db_tydu', 'esp32_pmw3320db_tydu_interrupt', 'internal_pull_up',
+              'level_shifter', 'mouse_click_diagram', 'mouse_click_pull_down_diagram',
+              'pmw3320db_tydu', 'scroll_wheel', 'switched_light', 'closed_switched_light',
+              'three_wire_spi', 'four_wire_spi_controller',
+              'three_wire_spi_multiple_peripherals')
+
+MODULES = sorted({target.module for target in find_drawings()})
+
+
+def _python(*args):
+    result = subprocess.run([sys.executable, *args], cwd=DIAGRAMS_DIR,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def _import_ms(module):
+    # Cumulative microseconds of each module, from -X importtime
+    err = _python('-X', 'importtime', '-c', f'import {module}').stderr
+    times = {}
+    for line in err.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$', line)
+        if match:
+            times[match[2]] = int(match[1])
+    return (times[module] - times.get('schemdraw', 0)) / 1000
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import_time(module):
+    # The fastest of a few runs, the others measure the machine being busy
+    elapsed = min(_import_ms(module) for _ in range(RUNS))
+    assert elapsed < BUDGET_MS, f'importing {module} took {elapsed:.1f}ms'
+
+
+@pytest.mark.parametrize('name', SCHEMATICS)
+def test_schematic_imports(name, tmp_path):
+    module, = [target.module for target in find_drawings() if target.name == name]
+    output = tmp_path / 'drawing.svg'
+    code = (
+        'import build, importlib, lazy, registry\n'
+        f'build._init_worker(build.DIAGRAMS_DIR, {{}})\n'
+        f'importlib.import_module({module!r})\n'
+        f'registry.render({name!r}, {str(output)!r})\n'
+        f'print(*[module for module in {HEAVY!r} if lazy.is_loaded(module)])\n'
+    )
+    assert _python('-c', code).stdout.split() == []
@@ -0,0 +1,72 @@
+"""
+The overlap checker finds labels, wires and parts in each other's way, and
+leaves alone what is laid out as intended.
+"""
+import schemdraw
+import schemdraw.elements as elm
+
+from layouts import populate
+from overlaps import find_overlaps, repeated, shapes
+
+
+def _overlaps(build):
+    d = schemdraw.Drawing(show=False)
+    populate(d, build)
+    return repeated(d) + find_overlaps(shapes(d))
+
+
+def test_clear_schematic():
+    def build(d):
+        d += elm.Resistor().right().label('1kΩ')
+        d += elm.Capacitor().down().label('10µF')
+        d += elm.Ground()
+    assert _overlaps(build) == []
+
+
+def test_overlapping_labels():
+    def build(d):
+        d += elm.Resistor().right().label('1kΩ')
+        d += elm.Resistor().at((0.3, 0)).right().label('2kΩ')
+    first, = [overlap for overlap in _overlaps(build)
+              if 'label' in overlap.first and 'label' in overlap.second]
+    assert "'1kΩ'" in first.first and "'2kΩ'" in first.second
+
+
+def test_wire_through_part():
+    def build(d):
+        d += elm.Resistor().right()
+        d += elm.Line().at((1.5, -2)).up().length(4)
+    overlaps = _overlaps(build)
+    assert overlaps
+    assert all(overlap.first.startswith('Resistor') and overlap.second == 'Line'
+               for overlap in overlaps)
+
+
+def test_wires_into_part_and_across_leads():
+    def build(d):
+        resistor = elm.Resistor().right()
+        d += resistor
+        d += elm.Line().at(resistor.end).right()
+        d += elm.Line().at((0.25, -1)).up().length(2)
+    assert _overlaps(build) == []
+
+
+def test_wires_crossing():
+    def build(d):
+        d += elm.Line().at((0, 0)).right().length(2)
+        d += elm.Line().at((1, -1)).up().length(2)
+        # Ending on another wire, or at the end of one, is not crossing it
+        d += elm.Line().at((0.5, -1)).up().length(1)
+        d += elm.Line().at((2, 0)).up().length(1)
+    crossing, = _overlaps(build)
+    assert crossing.crossing and crossing.box == (1, 0, 1, 0)
+    assert str(crossing) == 'Line crosses Line at (1.00, 0.00)'
+
+
+def test_added_twice():
+    def build(d):
+        resistor = elm.Resistor().right()
+        elm.Line().at((0, -2)).right()
+        d += resistor.label('1kΩ')
+    overlap, = _overlaps(build)
+    assert overlap.second.endswith(' added again')
@@ -0,0 +1,67 @@
+"""
+Quadrature captures count the same steps and find the same illegal
+transitions however they are cut into chunks.
+"""
+import pytest
+
+pytest.importorskip('numpy')
+
+from quadrature import check_file, decode
+
+CHUNKS = [37, 1000, 1 << 18]
+
+# The states a,b of a positive turn
+ORDER = [(0, 0), (0, 1), (1, 1), (1, 0)]
+
+# Samples each state is held for
+HOLD = 3
+
+
+def _capture(path, moves):
+    # Write the samples of moves, +1 or -1 for a step and 2 for skipping a
+    # state, and return the times of the skips
+    position = 0
+    rows = []
+    skips = []
+    for move in moves:
+        position += move
+        if move == 2:
+            skips.append(len(rows) * 1e-3)
+        rows.extend([ORDER[position % 4]] * HOLD)
+    with open(path, 'w') as f:
+        f.write('Time [s],a,b\n')
+        for index, (a, b) in enumerate([ORDER[0]] * HOLD + rows):
+            f.write(f'{index * 1e-3},{a},{b}\n')
+    return [time + HOLD * 1e-3 for time in skips]
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_check_file(tmp_path, chunk_rows):
+    path = tmp_path / 'wheel.csv'
+    skips = _capture(path, [1] * 30 + [-1] * 10 + [2] + [1] * 20 + [2] + [-1] * 5)
+    summary = check_file(path, chunk_rows=chunk_rows)
+    assert (summary.position, summary.forward, summary.backward, summary.illegal) == \
+        (35, 50, 15, 2)
+    assert summary.illegal_times == pytest.approx(skips)
+    assert summary.interval == pytest.approx(HOLD * 1e-3)
+    start, end = summary.window(1)
+    assert start < skips[1] < end
+
+
+def test_limit(tmp_path):
+    path = tmp_path / 'wheel.csv'
+    skips = _capture(path, [2, 1, 2, 1, 2])
+    summary = check_file(path, chunk_rows=2, limit=2)
+    assert summary.illegal == 3
+    assert summary.illegal_times == pytest.approx(skips[:2])
+
+
+def test_decode_continues_from_state():
+    first = decode([0, 1, 2], [0, 0, 1], [0, 1, 1])
+    assert first.steps.tolist() == [1, 1] and first.state == 0b11
+    # 1,1 to 0,0 skips a state
+    second = decode([3, 4], [0, 0], [0, 1], first.state)
+    assert second.times.tolist() == [3, 4]
+    assert second.steps.tolist() == [0, 1]
+    assert second.illegal.tolist() == [True, False]
+    assert second.positions(first.positions()[-1]).tolist() == [2, 3]
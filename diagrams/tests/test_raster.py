@@ -0,0 +1,38 @@
+"""
+Rasterized drawings keep their labels, set in the bundled font.
+"""
+import io
+import re
+
+import pytest
+
+pytest.importorskip('resvg_py')
+Image = pytest.importorskip('PIL.Image')
+
+import schemdraw
+import schemdraw.elements as elm
+
+from raster import _prepare, to_png
+
+
+def _dark(png):
+    image = Image.open(io.BytesIO(png)).convert('L')
+    return sum(1 for level in image.get_flattened_data() if level < 128)
+
+
+def _svg(label):
+    with schemdraw.Drawing(show=False) as d:
+        d += elm.Resistor().label(label)
+    return d.get_imagedata('svg').decode('utf-8')
+
+
+def test_labels_are_drawn():
+    assert _dark(to_png(_svg('1kΩ'), 400)) > _dark(to_png(_svg(''), 400))
+
+
+def test_families():
+    prepared = _prepare('<svg width="10pt" height="10pt"><text style="font-family:sans;">a</text>'
+                        '<text font-family="OCRA">b</text>'
+                        '<text style="font-family:monospace">c</text></svg>')
+    assert re.findall(r'font-family[:=]"?([^;"]*)', prepared) == \
+        ['sans-serif', 'OCRA, sans-serif', 'monospace']
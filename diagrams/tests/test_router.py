@@ -0,0 +1,183 @@
+"""
+Routed wires are orthogonal, stay clear of the parts and of each other, keep
+off of breadboard holes, and a breadboard full of them routes quickly.
+"""
+import random
+import time
+
+import pytest
+import schemdraw
+from schemdraw.elements import Element
+from schemdraw.segments import SegmentImage
+
+from router import Router, _Wires, bbox, segment_bbox
+from spatial import RTree
+
+# Seconds routing SEVERAL nets may take
+BUDGET_S = 1
+SEVERAL = 40
+# Seconds routing BOARD_NETS nets from the holes of a breadboard may take
+BOARD_BUDGET_S = 2
+BOARD_NETS = 24
+
+
+def _boxes(count, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 20), rng.uniform(0, 20)
+        boxes.append((x, y, x + rng.uniform(0.1, 3), y + rng.uniform(0.1, 3)))
+    return boxes
+
+
+def _inside(point, box):
+    return box[0] < point[0] < box[2] and box[1] < point[1] < box[3]
+
+
+@pytest.mark.parametrize('capacity', [2, 4, 8])
+def test_rtree_search(capacity):
+    boxes = _boxes(300)
+    tree = RTree(boxes, capacity)
+    for query in _boxes(50, seed=1):
+        expected = [index for index, box in enumerate(boxes)
+                    if box[0] <= query[2] and query[0] <= box[2]
+                    and box[1] <= query[3] and query[1] <= box[3]]
+        assert tree.search(query) == expected
+
+
+def test_turned_image_bbox():
+    # Turned about its corner at xy, as it is drawn
+    image = SegmentImage('part.png', xy=(1, 1), width=2, height=1, rotate=90)
+    assert segment_bbox(image) == pytest.approx((0, 1, 1, 3))
+
+
+def test_route_same_with_sprites():
+    # A part drawn as a sprite is in the way where it is drawn without
+    import sprites
+
+    def routed(use_sprites):
+        enabled = sprites.config.enabled
+        sprites.configure(enabled=use_sprites)
+        try:
+            # Placed but not drawn, as there is no image to draw
+            d = schemdraw.Drawing(show=False)
+            part = Element()
+            part.segments.append(SegmentImage('part.png', xy=(0, 0), width=2, height=1))
+            d += sprites.sprite(part, 'turned-part').at((2, 0)).theta(90)
+        finally:
+            sprites.configure(enabled=enabled)
+        return bbox(part), Router([part]).route((0, 0.5), (4, 0.5))
+
+    assert routed(True) == routed(False)
+
+
+def test_route_avoids_parts():
+    router = Router([(1, -1, 2, 1)])
+    points = router.route((0, 0), (3, 0))
+    assert points[0] == (0, 0) and points[-1] == (3, 0)
+    for a, b in zip(points, points[1:]):
+        assert a[0] == pytest.approx(b[0]) or a[1] == pytest.approx(b[1])
+        middle = ((a[0] + b[0]) / 2, (a[1] + b[1]) / 2)
+        assert not _inside(middle, (0.9, -1.1, 2.1, 1.1))
+
+
+def test_route_out_of_pin():
+    # A pin inside the box of its part leaves through the nearest side
+    router = Router([(0, 0, 2, 1)])
+    points = router.route((0.5, 0.9), (0.5, 3))
+    assert points == [(0.5, 0.9), (0.5, 3)]
+
+
+def test_no_route():
+    # The only way out of the pin goes through another wire's end
+    router = Router([(0, 0, 2, 2)], clearance=0)
+    with pytest.raises(ValueError):
+        router.route((1, 1), (5, 5), avoid=[(1.35, 1)])
+
+
+def test_wires_do_not_share_runs():
+    router = Router([])
+    with schemdraw.Drawing(show=False) as d:
+        first, second = router.wires(d, [((0, 0), (0, 3.5)), ((0, 0.35), (0, 3.15))])
+    # The longer net goes around the shorter one rather than along it
+    assert len(second.points) == 2
+    assert len(first.points) > 2
+    assert all(point[0] != pytest.approx(0) for point in first.points[1:-1])
+
+
+def _passes(points, point):
+    # Whether the wire through points runs over point
+    return any(min(a[0], b[0]) - 1e-6 <= point[0] <= max(a[0], b[0]) + 1e-6 and
+               min(a[1], b[1]) - 1e-6 <= point[1] <= max(a[1], b[1]) + 1e-6
+               for a, b in zip(points, points[1:]))
+
+
+@pytest.fixture
+def board():
+    from parts import Breadboard
+    with schemdraw.Drawing(show=False) as d:
+        bb = Breadboard().up()
+        d += bb
+    return bb
+
+
+def test_route_between_holes(board):
+    # Along a row the straight way runs over the holes in between
+    points = Router([], board=board).route(board.J2, board.J10)
+    holes = [point for name, point in board.absanchors.items()
+             if name[0] in 'ABCDEFGHIJ' or name[0] in 'LR' and '_' in name]
+    assert [hole for hole in holes if _passes(points, hole)] == [board.J2, board.J10]
+
+
+def test_route_around_plugged_strip(board):
+    # Another wire ends at F5, so none may cross the F-J holes of column 5
+    points = Router([], board=board).route(board.I2, board.I8, avoid=[board.F5])
+    strip = [board[f'{row}5'] for row in 'FGHIJ']
+    x = strip[0][0]
+    low, high = min(y for _, y in strip), max(y for _, y in strip)
+    for a, b in zip(points, points[1:]):
+        if min(a[0], b[0]) < x < max(a[0], b[0]):
+            assert not low - 0.1 <= a[1] <= high + 0.1
+
+
+def test_route_goes_around_rather_than_across():
+    wire = [(1, -1), (1, 1)]
+    points = Router([]).route((0, 0), (2, 0), [wire])
+    assert _Wires([wire]).crossed(points) == 0
+    # Where going around is far longer the wire crosses
+    wire = [(1, -20), (1, 20)]
+    points = Router([]).route((0, 0), (2, 0), [wire])
+    assert _Wires([wire]).crossed(points) == 1
+
+
+def test_several_nets_quickly():
+    # A breadboard's worth of nets from holes to the pins of a row of chips
+    chips = [(x * 3, 5, x * 3 + 2, 6) for x in range(SEVERAL // 8)]
+    nets = [((0.35 * index, 0), (chips[index // 8][0] + 0.25 * (index % 8) + 0.125, 5.05))
+            for index in range(SEVERAL)]
+    router = Router(chips)
+    with schemdraw.Drawing(show=False) as d:
+        start = time.perf_counter()
+        routes = router.wires(d, nets)
+        elapsed = time.perf_counter() - start
+    assert len(routes) == SEVERAL
+    assert elapsed < BUDGET_S, f'routing {SEVERAL} nets took {elapsed:.2f}s'
+
+
+def test_board_nets_quickly(board):
+    # Nets from holes either side of the middle of a breadboard to the pins
+    # of a row of chips above it
+    top = max(y for _, y in board.absanchors.values())
+    left = min(x for x, _ in board.absanchors.values())
+    chips = [(left + 1 + x * 3.5, top + 1.5, left + 3 + x * 3.5, top + 2.5)
+             for x in range(BOARD_NETS // 8)]
+    nets = [(board.absanchors[f'J{index + 3}' if index % 2 == 0 else f'A{index + 3}'],
+             (chips[index // 8][0] + 0.25 * (index % 8) + 0.125, chips[index // 8][1] + 0.05))
+            for index in range(BOARD_NETS)]
+    router = Router(chips, board=board)
+    with schemdraw.Drawing(show=False) as d:
+        start = time.perf_counter()
+        routes = router.wires(d, nets)
+        elapsed = time.perf_counter() - start
+    assert len(routes) == BOARD_NETS
+    assert elapsed < BOARD_BUDGET_S, f'routing {BOARD_NETS} nets on a board took {elapsed:.2f}s'
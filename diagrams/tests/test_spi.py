@@ -0,0 +1,92 @@
+"""
+Transactions decode the same in every SPI mode, with or without a chip
+select, however the capture is cut into chunks.
+"""
+import pytest
+
+pytest.importorskip('numpy')
+
+from spi import decode_file, sampling_level
+
+CHUNKS = [37, 1000, 1 << 18]
+
+# Samples each level of the clock is held for
+HOLD = 2
+
+# Samples of idle bus between transactions, more than eight bit periods
+IDLE = 100
+
+TRANSACTIONS = [b'\xa5\x3c', b'\x01', b'\xff\x00\x81']
+
+
+def _bits(data):
+    return [byte >> shift & 1 for byte in data for shift in range(7, -1, -1)]
+
+
+def _capture(path, transactions, mode, cs=True):
+    # Write the samples of transactions, each a list of MOSI bits with MISO
+    # their inverse, and return the times the chip select was asserted
+    cpol, cpha = divmod(mode, 2)
+    rows = []
+    asserted = []
+
+    def hold(clk, bit, select, count=HOLD):
+        for _ in range(count):
+            rows.append((len(rows) * 1e-6, clk, bit, 1 - bit, select))
+
+    hold(cpol, 0, 1, IDLE)
+    for bits in transactions:
+        asserted.append(len(rows) * 1e-6)
+        hold(cpol, 0, 0)
+        for bit in bits:
+            if cpha == 0:
+                # Data is set while the clock idles and sampled on the
+                # leading edge
+                hold(cpol, bit, 0)
+                hold(1 - cpol, bit, 0)
+            else:
+                # Data is set on the leading edge and sampled on the trailing
+                hold(1 - cpol, bit, 0)
+                hold(cpol, bit, 0)
+        hold(cpol, 0, 0)
+        hold(cpol, 0, 1, IDLE)
+    with open(path, 'w') as f:
+        f.write('Time [s],clk,mosi,miso,cs\n' if cs else 'Time [s],clk,mosi,miso\n')
+        for row in rows:
+            f.write(','.join(str(value) for value in (row if cs else row[:-1])) + '\n')
+    return asserted
+
+
+@pytest.mark.parametrize('mode', range(4))
+@pytest.mark.parametrize('cs', [True, False])
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_modes(tmp_path, mode, cs, chunk_rows):
+    path = tmp_path / 'spi.csv'
+    asserted = _capture(path, [_bits(data) for data in TRANSACTIONS], mode, cs)
+    decoded = list(decode_file(path, 'clk', ('mosi', 'miso'), 'cs' if cs else None,
+                               mode, chunk_rows=chunk_rows))
+    assert [transaction.data for transaction in decoded] == \
+        [(data, bytes(0xff ^ byte for byte in data)) for data in TRANSACTIONS]
+    assert [transaction.bits for transaction in decoded] == [8 * len(data) for data in TRANSACTIONS]
+    if cs:
+        assert [transaction.start for transaction in decoded] == pytest.approx(asserted)
+
+
+@pytest.mark.parametrize('chunk_rows', CHUNKS)
+def test_partial_byte(tmp_path, chunk_rows):
+    path = tmp_path / 'spi.csv'
+    _capture(path, [_bits(b'\x5a') + [1, 0], _bits(b'\x42')], 0)
+    first, second = decode_file(path, 'clk', ('mosi',), chunk_rows=chunk_rows)
+    assert first.data == (b'\x5a',) and first.bits == 10
+    assert second.data == (b'\x42',) and second.bits == 8
+
+
+def test_lsb_first(tmp_path):
+    path = tmp_path / 'spi.csv'
+    _capture(path, [_bits(b'\x01')], 3)
+    transaction, = decode_file(path, 'clk', ('mosi',), mode=3, lsb_first=True)
+    assert transaction.data == (b'\x80',)
+
+
+def test_sampling_level():
+    assert [sampling_level(mode) for mode in range(4)] == [1, 0, 0, 1]
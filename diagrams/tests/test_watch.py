@@ -0,0 +1,63 @@
+"""
+Watching re-renders from the files as they are now, including the parts and
+images a base layout was built from.
+"""
+import importlib
+import sys
+
+import pytest
+
+import registry
+import watch
+
+MODULE = '''
+from pathlib import Path
+
+import schemdraw.elements as elm
+
+from registry import drawing
+
+
+def labelled(d):
+    d += elm.Line()
+    return Path(__file__).with_name('label.txt').read_text()
+
+
+@drawing('watched_label.svg', base=labelled)
+def watched_label(d, text):
+    d += elm.Label().label(text)
+'''
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    directory = tmp_path.resolve()
+    (directory / 'watched_label.py').write_text(MODULE)
+    (directory / 'label.txt').write_text('before')
+    monkeypatch.syspath_prepend(str(directory))
+    importlib.import_module('watched_label')
+    yield directory
+    registry.forget('watched_label')
+    del sys.modules['watched_label']
+
+
+def _label(name):
+    d = registry.build(name)
+    return [segment.text for element in d.elements for segment in element.segments
+            if hasattr(segment, 'text')]
+
+
+def test_data_file_change_rebuilds_base(directory):
+    assert _label('watched_label') == ['before']
+    (directory / 'label.txt').write_text('after')
+    watch._release({directory / 'label.txt'}, directory)
+    assert _label('watched_label') == ['after']
+
+
+def test_other_change_keeps_base(directory):
+    assert _label('watched_label') == ['before']
+    (directory / 'other.txt').write_text('')
+    (directory / 'label.txt').write_text('after')
+    watch._release({directory / 'other.txt'}, directory)
+    # Still the layout built before
+    assert _label('watched_label') == ['before']
@@ -1,9 +1,12 @@
-import schemdraw
 import schemdraw.elements as elm
 from schemdraw.elements.intcircuits import Ic, IcPin
-import schemdraw.logic as logic
 from schemdraw.util import Point
+from geometry import cached_geometry
+from registry import drawing, render_all
+from lazy import lazy_import
+logic = lazy_import('schemdraw.logic')
 
+@cached_geometry
 class Controller(Ic):
     def __init__(self, cs_count=1, **kwargs):
 
@@ -23,6 +26,7 @@ class Controller(Ic):
         )
         super().__init__(pins=pins, botlabel='Controller')
 
+@cached_geometry
 class Controller4Wire(Ic):
     def __init__(self, cs_count=1, **kwargs):
 
@@ -36,6 +40,7 @@ class Controller4Wire(Ic):
 
         super().__init__(pins=pins, botlabel='Controller')
 
+@cached_geometry
 class Controller4WirePeripheral(Ic):
     def __init__(self, name='Peripheral', **kwargs):
         pins=[
@@ -47,6 +52,7 @@ class Controller4WirePeripheral(Ic):
         super().__init__(pins=pins, botlabel=name)
 
 
+@cached_geometry
 class Peripheral(Ic):
     def __init__(self, name='Peripheral', **kwargs):
         pins=[
@@ -57,7 +63,8 @@ class Peripheral(Ic):
         ]
         super().__init__(pins=pins, botlabel=name)
 
-with schemdraw.Drawing(show=False, file='../assets/three_wire_spi.svg') as d:
+@drawing('../assets/three_wire_spi.svg')
+def three_wire_spi(d):
     controller = Controller()
     d += controller
     d += elm.lines.Line().at(controller.CLK).right()
@@ -69,7 +76,8 @@ with schemdraw.Drawing(show=False, file='../assets/three_wire_spi.svg') as d:
     d += elm.lines.Wire('-|').at(controller.CS).to(peripheral.CS)
     d += elm.lines.Wire('-|').at(controller.GND).to(peripheral.GND)
 
-with schemdraw.Drawing(show=False, file='../assets/four_wire_spi_controller.svg') as d:
+@drawing('../assets/four_wire_spi_controller.svg')
+def four_wire_spi_controller(d):
     controller = Controller4Wire()
     d += controller
     d += elm.lines.Line().at(controller.CLK).right()
@@ -85,21 +93,24 @@ with schemdraw.Drawing(show=False, file='../assets/four_wire_spi_controller.svg'
     d +=  elm.lines.Line().at(r.end).toy(controller.MISO).dot()
 
 
-with schemdraw.Drawing(show=False, file='../assets/clock_signal.svg') as d:
+@drawing('../assets/clock_signal.svg')
+def clock_signal(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'clk', 'wave': 'p......'},  
         ]
     })
 
-with schemdraw.Drawing(show=False, file='../assets/three_wire_spi_data_signal.svg') as d:
+@drawing('../assets/three_wire_spi_data_signal.svg')
+def three_wire_spi_data_signal(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'clk', 'wave': 'p......'},  
             {'name': 'data', 'wave': 'x.==.x.', 'data': ['request', 'response']},
             {'name': 'cs', 'wave': '0.1..0.'}]})
 
-with schemdraw.Drawing(show=False, file='../assets/three_wire_spi_multiple_peripherals.svg') as d:
+@drawing('../assets/three_wire_spi_multiple_peripherals.svg')
+def three_wire_spi_multiple_peripherals(d):
     drop_offset = 0.15
     controller = Controller(cs_count=3)
     d += controller
@@ -138,7 +149,8 @@ with schemdraw.Drawing(show=False, file='../assets/three_wire_spi_multiple_perip
     d += elm.lines.Wire('|-').at(clk_drop.end).to(peripheral3.CLK)
     
 
-with schemdraw.Drawing(show=False, file='../assets/clock_polarity.svg') as d:
+@drawing('../assets/clock_polarity.svg')
+def clock_polarity(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'low_polarity', 'wave': '0.p......'},  
@@ -154,7 +166,8 @@ with schemdraw.Drawing(show=False, file='../assets/clock_polarity.svg') as d:
     ygap=0.5
     )
 
-with schemdraw.Drawing(show=False, file='../assets/low_polarity_cpha0.svg') as d:
+@drawing('../assets/low_polarity_cpha0.svg')
+def low_polarity_cpha0(d):
     logic.TimingDiagram({
         'signal': [
             {'name': 'clk', 'wave': 'p........'},  
@@ -172,4 +185,8 @@ with schemdraw.Drawing(show=False, file='../assets/low_polarity_cpha0.svg') as d
         },
         grid=False,
     ygap=0.5
-        )
\ No newline at end of file
+        )
+
+
+if __name__ == '__main__':
+    render_all(__name__)
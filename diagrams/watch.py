@@ -0,0 +1,301 @@
+"""
+Re-render drawings as their inputs are saved.
+
+Runs a single long lived process with schemdraw imported and the Fritzing
+parts parsed, so a change only pays for rendering. The directory is watched
+with inotify, or polled where inotify is not available, and when a module,
+part or image changes only the drawings depending on it, see
+``build_cache.dependencies``, are reloaded and rendered:
+
+    python watch.py                  # watch every drawing
+    python watch.py 'scroll_wheel*'  # only some of them
+
+Drawings which are out of date when it starts are rendered first. The build
+cache is kept up to date, so a later ``build.py`` skips what was rendered
+here. Meant to be left running next to ``jekyll serve``.
+"""
+import argparse
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+import svgopt
+from build import DIAGRAMS_DIR, _init_worker, cache_options, find_drawings, render_drawing
+from build import select as select_targets
+from build_cache import BuildCache, dependencies, input_hash
+
+# Changes arriving this close together are handled as one, editors often
+# write a file in several steps.
+SETTLE = 0.03
+
+# How often files are checked without inotify.
+POLL_INTERVAL = 0.25
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MOVED_FROM = 0x040
+_EVENT = struct.Struct('iIII')
+
+
+def _ignored(name):
+    # Caches, editor swap files and the like
+    return name.startswith(('.', '#')) or name.endswith(('~', '.swp', '.tmp')) \
+        or name == '__pycache__'
+
+
+class InotifyWatcher:
+    """
+    Reports the files of ``directory`` which were written, moved or deleted,
+    using inotify.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM
+        if libc.inotify_add_watch(self.fd, os.fsencode(self.directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+
+    def _read(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if name and not _ignored(name):
+                changed.add(self.directory / name)
+        return changed
+
+    def wait(self):
+        """
+        Block until files change, returning their paths.
+        """
+        changed = set()
+        while not changed:
+            changed = self._read(None)
+        while True:
+            more = self._read(SETTLE)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Reports the files of ``directory`` which changed, by comparing their
+    modification times every ``POLL_INTERVAL`` seconds.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.snapshot = self._stat()
+
+    def _stat(self):
+        found = {}
+        for path in self.directory.iterdir():
+            if _ignored(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found[path] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def wait(self):
+        """
+        Block until files change, returning their paths.
+        """
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = self._stat()
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+def watcher(directory):
+    """
+    An ``InotifyWatcher`` of ``directory``, or a ``PollingWatcher`` where
+    inotify is not available.
+    """
+    try:
+        return InotifyWatcher(directory)
+    except (OSError, AttributeError):
+        return PollingWatcher(directory)
+
+
+def _warm_up(targets):
+    # Pay for the imports and the parts before the first change
+    import importlib
+    import parts
+    for module in sorted({target.module for target in targets}):
+        try:
+            importlib.import_module(module)
+        except Exception as error:
+            print(f'Could not import {module}: {error}', file=sys.stderr)
+    for archive in sorted(DIAGRAMS_DIR.glob('*.fzpz')):
+        try:
+            parts.load_part(archive)
+        except Exception as error:
+            print(f'Could not load {archive.name}: {error}', file=sys.stderr)
+
+
+def _unload(changed):
+    # Forget every module of this directory which depends on a changed file,
+    # or was deleted, so it is imported afresh
+    import registry
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path is None or Path(path).parent != DIAGRAMS_DIR or name == '__main__':
+            continue
+        if name in ('build', 'build_cache', 'svgopt', 'watch'):
+            continue
+        if not Path(path).exists() or changed & set(dependencies(path)):
+            registry.forget(name)
+            del sys.modules[name]
+
+
+def _release(changed, directory=DIAGRAMS_DIR):
+    # Let go of the base layouts of every module of directory which depends
+    # on a changed part or image, they were built from its old contents
+    import registry
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path is None or Path(path).parent != directory:
+            continue
+        if changed & set(dependencies(path, directory)):
+            registry.release(name)
+
+
+class Session:
+    """
+    The drawings being watched and the options they are rendered with.
+    """
+    def __init__(self, patterns, precision):
+        self.patterns = patterns
+        self.precision = precision
+        self.options = cache_options({'external': False, 'reencode': None}, precision, False)
+        self.cache = BuildCache()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Find the drawings and the files each of them depends on again.
+        """
+        targets = find_drawings()
+        if self.patterns:
+            targets = select_targets(targets, self.patterns)
+        self.targets = targets
+        self.inputs = {path: set(dependencies(path))
+                       for path in {target.path for target in targets}}
+
+    def affected(self, changed):
+        """
+        The drawings depending on any of the ``changed`` files.
+        """
+        return [target for target in self.targets if changed & self.inputs[target.path]]
+
+    def stale(self):
+        return [target for target in self.targets
+                if not self.cache.is_current(target.name,
+                                             input_hash(target.path, extra=self.options),
+                                             [target.output])]
+
+    def render(self, targets):
+        """
+        Render ``targets`` in this process, printing a line per drawing.
+        """
+        for target in targets:
+            elapsed, error, sizes, _ = render_drawing(target.module, target.name,
+                                                      self.precision)
+            status = 'ok' if error is None else 'FAILED'
+            size = f'  {svgopt.describe(*sizes)}' if sizes else ''
+            print(f'{elapsed:7.2f}s  {status:6}  {target.name:40}{size}', flush=True)
+            if error is None:
+                self.cache.update(target.name, input_hash(target.path, extra=self.options),
+                                  [target.output])
+            else:
+                print(error, file=sys.stderr)
+        self.cache.save()
+
+
+def watch(patterns=(), precision=svgopt.PRECISION):
+    """
+    Render the drawings matching ``patterns`` whenever their inputs change,
+    until interrupted.
+    """
+    _init_worker(DIAGRAMS_DIR, {})
+    session = Session(patterns, precision)
+    _warm_up(session.targets)
+    session.render(session.stale())
+
+    files = watcher(DIAGRAMS_DIR)
+    print(f'Watching {len(session.targets)} drawings with {type(files).__name__}', flush=True)
+    try:
+        while True:
+            changed = {path.resolve() for path in files.wait()}
+            start = time.perf_counter()
+            if any(path.suffix == '.py' for path in changed):
+                try:
+                    _unload(changed)
+                    session.refresh()
+                except SyntaxError as error:
+                    print(f'{error.filename}:{error.lineno}: {error.msg}', file=sys.stderr)
+                    continue
+                except FileNotFoundError as error:
+                    # A module imported by a drawing was deleted
+                    print(f'{error.filename}: {error.strerror}', file=sys.stderr)
+                    continue
+            else:
+                _release(changed)
+            targets = session.affected(changed)
+            if not targets:
+                continue
+            names = ', '.join(sorted(path.name for path in changed))
+            print(f'{names} changed', flush=True)
+            session.render(targets)
+            print(f'Updated {len(targets)} drawings in {time.perf_counter() - start:.2f}s',
+                  flush=True)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        files.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', metavar='DRAWING',
+                        help='names or globs of the drawings to watch, defaults to all')
+    parser.add_argument('--precision', type=int, default=svgopt.PRECISION,
+                        help='significant digits kept in coordinates when optimizing, '
+                             f'defaults to {svgopt.PRECISION}')
+    parser.add_argument('--no-optimize', action='store_true',
+                        help='save the SVGs as schemdraw writes them')
+    args = parser.parse_args(argv)
+    return watch(args.patterns, None if args.no_optimize else args.precision)
+
+
+if __name__ == '__main__':
+    sys.exit(main())